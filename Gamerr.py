@@ -1,18 +1,708 @@
 import customtkinter as ctk
+import tkinter as tk
 from tkinter import messagebox
-import requests
-from bs4 import BeautifulSoup
-import json
+import hashlib
+import os
 import threading
+import time
+import heapq
 import webbrowser
-from datetime import datetime
-import re
-from urllib.parse import quote
+from collections import OrderedDict
+import sys
 from io import BytesIO
 from PIL import Image
 
+from gamerr_catalog import CATALOG_PATH, Catalog
+from gamerr_engine import (
+    CACHE_DIR,
+    RESPONSE_CACHE_PATH,
+    CancelToken,
+    HttpClient,
+    ResponseCache,
+    SearchEngine,
+    TitleMatcher,
+    apply_filters_to_groups,
+    format_store_status,
+    sort_key,
+    sort_results
+)
+from gamerr_history import HISTORY_PATH, PriceHistory, series_key
+from gamerr_metrics import METRICS, METRICS_PORT, serve_metrics
+from gamerr_rates import RATES_PATH, ExchangeRates, currency_for, format_money
+from gamerr_watchlist import WATCHLIST_PATH, Watchlist, WatchlistPoller
+
+# Result list geometry: fixed row height (px) and rows built beyond the viewport
+RESULT_ROW_HEIGHT = 230
+RESULT_OVERSCAN = 2
+
+# Scrolling within this many rows of the end shows the next page of results
+LOAD_MORE_ROWS = 3
+
+# Thumbnails: bounding box (px), loader threads and cache limits; the disk
+# cache drops its least recently used files once past THUMBNAIL_DISK_BYTES
+THUMBNAIL_SIZE = (184, 100)
+THUMBNAIL_WORKERS = 4
+THUMBNAIL_MEMORY_BYTES = 32 * 1024 * 1024
+THUMBNAIL_DISK_BYTES = 64 * 1024 * 1024
+THUMBNAIL_DIR = os.path.join(CACHE_DIR, "thumbnails")
+
+# Search as you type: pause (ms) after the last keystroke, and shortest query
+SEARCH_DEBOUNCE_MS = 300
+MIN_TYPED_QUERY = 2
+
+# Store region, and the regions whose prices are compared on each card
+SEARCH_REGION = "US"
+PRICE_COMPARE_REGIONS = ['GB', 'DE', 'PL', 'BR']
+
+# Updates from worker threads are applied and redrawn once per frame (ms)
+UI_FRAME_MS = 16
+
+# Work spread over event-loop ticks gets this many ms per tick, and result
+# batches are merged this many results per step
+SLICE_BUDGET_MS = 4
+MERGE_CHUNK = 50
+
+class UiEventQueue:
+    """Thread-safe queue of UI updates, drained by the Tk loop at a fixed frame rate.
+    
+    Worker threads post callbacks instead of calling into Tk. An update posted
+    under a key replaces the one still pending under that key, so a frame
+    only draws the latest progress or status; keyless updates all run, in
+    order. on_frame runs at the end of every frame.
+    """
+    
+    def __init__(self, root, on_frame=None, frame_ms=UI_FRAME_MS):
+        self.root = root
+        self.on_frame = on_frame
+        self.frame_ms = frame_ms
+        self.lock = threading.Lock()
+        self.pending = OrderedDict()
+        self.sequence = 0
+    
+    def post(self, callback, key=None):
+        """Run callback on the Tk thread in the next frame; callable from any thread"""
+        with self.lock:
+            if key is None:
+                self.sequence += 1
+                key = self.sequence
+            self.pending[key] = callback
+    
+    def start(self):
+        self.root.after(self.frame_ms, self.drain)
+    
+    def drain(self):
+        """Run the updates posted since the last frame"""
+        self.root.after(self.frame_ms, self.drain)
+        with self.lock:
+            pending = self.pending
+            self.pending = OrderedDict()
+        
+        for callback in pending.values():
+            try:
+                callback()
+            except Exception as e:
+                print(f"UI update error: {e}")
+        if self.on_frame:
+            self.on_frame()
+
+
+class TimeSlicer:
+    """Runs long UI work on the Tk loop a few milliseconds per tick, so input keeps flowing.
+    
+    A job is an iterator whose every step is small; each tick runs steps of
+    the oldest job for up to budget_ms and leaves the rest for the next one.
+    Starting a job under the key of a pending one replaces it in place.
+    """
+    
+    def __init__(self, root, budget_ms=SLICE_BUDGET_MS):
+        self.root = root
+        self.budget = budget_ms / 1000
+        self.jobs = OrderedDict()
+        self.sequence = 0
+        self.scheduled = False
+    
+    def start(self, steps, key=None):
+        """Queue a job after the pending ones"""
+        if key is None:
+            self.sequence += 1
+            key = self.sequence
+        self.jobs[key] = iter(steps)
+        if not self.scheduled:
+            self.scheduled = True
+            self.root.after(1, self.tick)
+    
+    def call(self, callback):
+        """Run callback once the jobs queued before it are done"""
+        def steps():
+            callback()
+            yield
+        self.start(steps())
+    
+    def tick(self):
+        deadline = time.perf_counter() + self.budget
+        while self.jobs and time.perf_counter() < deadline:
+            key, steps = next(iter(self.jobs.items()))
+            try:
+                next(steps)
+                continue
+            except StopIteration:
+                pass
+            except Exception as e:
+                print(f"UI job error: {e}")
+            # Unless the step replaced its own job
+            if self.jobs.get(key) is steps:
+                del self.jobs[key]
+        
+        self.scheduled = bool(self.jobs)
+        if self.scheduled:
+            self.root.after(1, self.tick)
+
+
+class ThumbnailLoader:
+    """Downloads, decodes and downscales thumbnails on background threads"""
+    
+    def __init__(self, http, workers=THUMBNAIL_WORKERS, max_bytes=THUMBNAIL_MEMORY_BYTES, cache_dir=THUMBNAIL_DIR,
+                 max_disk_bytes=THUMBNAIL_DISK_BYTES):
+        self.http = http
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        
+        # Files on disk are used in mtime order: reading one touches it
+        self.max_disk_bytes = max_disk_bytes
+        self.disk_lock = threading.Lock()
+        self.disk_bytes = sum(size for _, _, size in self.disk_files())
+        self.prune_disk()
+        
+        # Decoded images, least recently used first
+        self.memory = OrderedDict()
+        self.memory_bytes = 0
+        
+        # Pending work: a heap of (priority, url) plus the callbacks per url
+        self.condition = threading.Condition()
+        self.queue = []
+        self.waiting = {}
+        self.loading = set()
+        self.layout_pass = 0
+        self.sequence = 0
+        
+        for _ in range(workers):
+            threading.Thread(target=self.work, daemon=True).start()
+    
+    def next_pass(self):
+        """Start a new layout pass; its requests go ahead of all earlier ones"""
+        with self.condition:
+            self.layout_pass += 1
+    
+    def request(self, url, callback):
+        """Load a thumbnail and call callback(image) from a worker thread"""
+        with self.condition:
+            image = self.memory.get(url)
+            if image is None:
+                # Newest pass first, then in the order rows asked within the pass
+                self.sequence += 1
+                heapq.heappush(self.queue, ((-self.layout_pass, self.sequence), url))
+                self.waiting.setdefault(url, []).append(callback)
+                self.condition.notify()
+                return
+            self.memory.move_to_end(url)
+        callback(image)
+    
+    def work(self):
+        """Worker loop: take the most urgent url and load it"""
+        while True:
+            with self.condition:
+                while not self.queue:
+                    self.condition.wait()
+                _, url = heapq.heappop(self.queue)
+                if url not in self.waiting or url in self.loading:
+                    continue
+                self.loading.add(url)
+            
+            try:
+                image = self.load(url)
+            except Exception as e:
+                print(f"Thumbnail error for {url}: {e}")
+                image = None
+            
+            with self.condition:
+                self.loading.discard(url)
+                callbacks = self.waiting.pop(url, [])
+                if image is not None:
+                    self.remember(url, image)
+            
+            if image is not None:
+                for callback in callbacks:
+                    callback(image)
+    
+    def load(self, url):
+        """Read a thumbnail from the disk cache, or download and downscale it"""
+        path = os.path.join(self.cache_dir, hashlib.sha1(url.encode('utf-8')).hexdigest() + ".png")
+        if os.path.exists(path):
+            image = Image.open(path)
+            image.load()
+            try:
+                os.utime(path)
+            except OSError:
+                pass  # pruned by another worker meanwhile
+            return image
+        
+        response = self.http.get(url, timeout=10)
+        response.raise_for_status()
+        image = Image.open(BytesIO(response.content))
+        # Let the JPEG decoder skip detail we'd throw away anyway
+        image.draft("RGB", THUMBNAIL_SIZE)
+        image = image.convert("RGB")
+        image.thumbnail(THUMBNAIL_SIZE)
+        image.save(path, "PNG")
+        with self.disk_lock:
+            self.disk_bytes += os.path.getsize(path)
+        self.prune_disk()
+        return image
+    
+    def disk_files(self):
+        """(mtime, path, size) of each cached thumbnail file"""
+        files = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".png"):
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.path, stat.st_size))
+        return files
+    
+    def prune_disk(self):
+        """Delete the least recently used thumbnail files until the disk cache fits max_disk_bytes"""
+        with self.disk_lock:
+            if self.disk_bytes <= self.max_disk_bytes:
+                return
+            # Rescanned, so the total also catches up with files removed by hand
+            files = sorted(self.disk_files())
+            self.disk_bytes = sum(size for _, _, size in files)
+            for _, path, size in files:
+                if self.disk_bytes <= self.max_disk_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                self.disk_bytes -= size
+    
+    def remember(self, url, image):
+        """Keep a decoded image in memory, evicting old ones past max_bytes"""
+        self.memory[url] = image
+        self.memory_bytes += image.width * image.height * len(image.getbands())
+        while self.memory_bytes > self.max_bytes and len(self.memory) > 1:
+            _, old = self.memory.popitem(last=False)
+            self.memory_bytes -= old.width * old.height * len(old.getbands())
+
+
+class ResultRow(ctk.CTkFrame):
+    """A recyclable result card that can be re-bound to any game group"""
+    
+    def __init__(self, parent, app):
+        super().__init__(
+            parent,
+            fg_color=app.colors['card'],
+            border_width=1,
+            border_color=app.colors['border']
+        )
+        self.app = app
+        self.group = None
+        self.game = None
+        colors = app.colors
+        
+        # Make card clickable
+        self.bind("<Enter>", lambda e: self.configure(fg_color=colors['card_hover']))
+        self.bind("<Leave>", lambda e: self.configure(fg_color=colors['card']))
+        self.bind("<Button-1>", lambda e: self.open_store())
+        
+        main_frame = ctk.CTkFrame(self, fg_color="transparent")
+        main_frame.pack(fill="both", expand=True, padx=20, pady=15)
+        
+        # Thumbnail, filled in when the loader delivers it
+        self.thumb_label = ctk.CTkLabel(main_frame, text="", image=app.thumbnail_placeholder)
+        self.thumb_label.pack(side="left", padx=(0, 15))
+        
+        # Left side - Game info
+        info_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
+        info_frame.pack(side="left", fill="x", expand=True)
+        
+        # Title with store icon
+        title_frame = ctk.CTkFrame(info_frame, fg_color="transparent")
+        title_frame.pack(anchor="w")
+        
+        self.icon_label = ctk.CTkLabel(title_frame, text="", font=("Arial", 20))
+        self.icon_label.pack(side="left", padx=(0, 10))
+        
+        self.title_label = ctk.CTkLabel(
+            title_frame,
+            text="",
+            font=("Arial Bold", 16),
+            text_color=colors['text'],
+            anchor="w"
+        )
+        self.title_label.pack(side="left")
+        self.title_label.bind("<Button-1>", lambda e: self.open_store())
+        
+        # Store name
+        self.store_label = ctk.CTkLabel(
+            info_frame,
+            text="",
+            font=("Arial", 11),
+            text_color=colors['subtext']
+        )
+        self.store_label.pack(anchor="w", pady=(5, 0))
+        
+        # Description
+        self.desc_label = ctk.CTkLabel(
+            info_frame,
+            text="",
+            font=("Arial", 11),
+            text_color=colors['subtext'],
+            anchor="w",
+            justify="left",
+            wraplength=600
+        )
+        self.desc_label.pack(anchor="w", pady=(8, 0))
+        
+        # The same game in other stores
+        self.offers_label = ctk.CTkLabel(
+            info_frame,
+            text="",
+            font=("Arial Bold", 11),
+            text_color=colors['warning'],
+            anchor="w"
+        )
+        self.offers_label.pack(anchor="w", pady=(6, 0))
+        
+        # Price history: all-time low and the last 30 days
+        self.history_label = ctk.CTkLabel(
+            info_frame,
+            text="",
+            font=("Arial", 11),
+            text_color=colors['subtext'],
+            anchor="w"
+        )
+        self.history_label.pack(anchor="w", pady=(4, 0))
+        
+        # Prices in other regions, converted to the display currency
+        self.regional_label = ctk.CTkLabel(
+            info_frame,
+            text="",
+            font=("Arial", 11),
+            text_color=colors['subtext'],
+            anchor="w"
+        )
+        self.regional_label.pack(anchor="w", pady=(2, 0))
+        
+        # Right side - Price and action
+        price_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
+        price_frame.pack(side="right", padx=(20, 0))
+        
+        # Original price (strikethrough effect)
+        self.original_label = ctk.CTkLabel(
+            price_frame,
+            text="",
+            font=("Arial", 12),
+            text_color=colors['subtext']
+        )
+        
+        # Discount badge
+        self.discount_frame = ctk.CTkFrame(price_frame, fg_color=colors['success'])
+        self.discount_label = ctk.CTkLabel(
+            self.discount_frame,
+            text="",
+            font=("Arial Bold", 14),
+            text_color="white"
+        )
+        self.discount_label.pack(padx=10, pady=5)
+        
+        # Current price
+        self.price_label = ctk.CTkLabel(price_frame, text="", font=("Arial Bold", 24))
+        
+        # Visit store button
+        self.visit_btn = ctk.CTkButton(
+            price_frame,
+            text="Visit Store →",
+            width=130,
+            height=40,
+            font=("Arial Bold", 12),
+            fg_color=colors['accent'],
+            command=self.open_store
+        )
+        
+        # Watchlist toggle
+        self.watch_btn = ctk.CTkButton(
+            price_frame,
+            text="",
+            width=130,
+            height=28,
+            font=("Arial", 11),
+            fg_color="transparent",
+            border_width=1,
+            border_color=colors['border'],
+            command=self.toggle_watch
+        )
+    
+    def open_store(self):
+        """Open the bound game's store page"""
+        if self.game:
+            webbrowser.open(self.game.url)
+    
+    def show(self, group):
+        """Re-bind this card to a game group, headed by its cheapest offer"""
+        game = group.best
+        self.group = group
+        self.game = game
+        app = self.app
+        colors = app.colors
+        
+        self.icon_label.configure(text=game.store_icon)
+        self.title_label.configure(text=game.name)
+        self.offers_label.configure(text=app.format_other_offers(group))
+        history, at_low = app.format_price_history(game)
+        self.history_label.configure(text=history, text_color=colors['success'] if at_low else colors['subtext'])
+        
+        self.thumb_label.configure(image=app.thumbnail_placeholder)
+        image_url = next((offer.image for offer in group.offers if offer.image), '')
+        if image_url:
+            def on_thumbnail(image):
+                app.ui.post(lambda: self.show_thumbnail(group, image), key=(id(self), 'thumbnail'))
+            app.thumbnails.request(image_url, on_thumbnail)
+        self.store_label.configure(text=app.format_store_line(game))
+        
+        # Description, fetched lazily for results that don't carry one yet
+        needs_details = not game.details_loaded
+        if needs_details:
+            self.desc_label.configure(text="Loading details...")
+            
+            def on_loaded(data):
+                app.apply_details(game, data)
+                if self.game is game:
+                    self.desc_label.configure(text=app.format_description(game))
+                    self.store_label.configure(text=app.format_store_line(game))
+            app.load_details(game, on_loaded)
+        else:
+            self.desc_label.configure(text=app.format_description(game))
+        
+        for widget in (self.original_label, self.discount_frame, self.price_label, self.visit_btn, self.watch_btn):
+            widget.pack_forget()
+        
+        if game.is_free:
+            self.price_label.configure(text="FREE", text_color=colors['success'])
+        elif game.included_with:
+            self.price_label.configure(text=f"With {game.included_with}", text_color=colors['success'])
+        else:
+            if game.discount > 0:
+                self.original_label.configure(text=format_money(game.original_cents, game.currency))
+                self.original_label.pack()
+                self.discount_label.configure(text=f"-{game.discount}%")
+                self.discount_frame.pack(pady=5)
+            self.price_label.configure(text=format_money(game.price_cents, game.currency), text_color=colors['accent'])
+        
+        self.price_label.pack()
+        self.visit_btn.pack(pady=(10, 0))
+        # Subscription offers have no price to watch
+        if not game.included_with:
+            self.show_watch_state()
+            self.watch_btn.pack(pady=(6, 0))
+        self.show_regional_prices()
+    
+    def show_regional_prices(self):
+        """Show the bound game's prices in the comparison regions, as far as they've arrived"""
+        text, cheaper = self.app.format_regional_prices(self.game)
+        self.regional_label.configure(
+            text=text,
+            text_color=self.app.colors['warning'] if cheaper else self.app.colors['subtext']
+        )
+    
+    def show_watch_state(self):
+        """Label the watch button for whether the bound game is watched"""
+        watched = self.app.watchlist.contains(self.game.store_id, series_key(self.game))
+        self.watch_btn.configure(text="★ Watching" if watched else "☆ Watch price")
+    
+    def toggle_watch(self):
+        """Add the bound game to the watchlist, or remove it"""
+        if self.game:
+            self.app.toggle_watch(self.game)
+            self.show_watch_state()
+    
+    def show_thumbnail(self, group, image):
+        """Show a loaded thumbnail if this card still shows its group"""
+        if self.group is group:
+            self.thumb_label.configure(image=ctk.CTkImage(light_image=image, dark_image=image, size=image.size))
+
+
+class VirtualResultList(ctk.CTkFrame):
+    """Scrolling list that only builds widgets for visible rows and recycles them"""
+    
+    def __init__(self, parent, create_row, row_height=RESULT_ROW_HEIGHT, overscan=RESULT_OVERSCAN, bg=None,
+                 on_layout=None, on_near_end=None, slicer=None):
+        super().__init__(parent, fg_color="transparent")
+        self.create_row = create_row
+        self.on_layout = on_layout
+        self.on_near_end = on_near_end
+        self.slicer = slicer  # binds the overscan rows in the background if given
+        self.row_height = row_height
+        self.overscan = overscan
+        self.items = []
+        self.visible = {}  # item index -> row
+        self.pool = []  # rows not currently shown
+        self.window_ids = {}  # row -> canvas window item
+        
+        self.canvas = tk.Canvas(
+            self,
+            highlightthickness=0,
+            borderwidth=0,
+            bg=bg,
+            yscrollincrement=row_height // 5
+        )
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.yview)
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+        
+        self.canvas.bind("<Configure>", lambda e: self.layout(resized=True))
+        if sys.platform.startswith("linux"):
+            self.bind_all("<Button-4>", self.on_mouse_wheel, add=True)
+            self.bind_all("<Button-5>", self.on_mouse_wheel, add=True)
+        else:
+            self.bind_all("<MouseWheel>", self.on_mouse_wheel, add=True)
+    
+    def set_items(self, items):
+        """Show a new list of items, keeping the scroll position"""
+        self.items = items
+        self.canvas.configure(scrollregion=(0, 0, 0, len(items) * self.row_height))
+        
+        # Rows already on screen now stand for different items
+        for index in list(self.visible):
+            self.release(index)
+        self.layout()
+    
+    def scroll_to_top(self):
+        """Jump back to the first row"""
+        self.canvas.yview_moveto(0)
+        self.layout()
+    
+    def yview(self, *args):
+        """Scrollbar callback"""
+        self.canvas.yview(*args)
+        self.layout()
+    
+    def on_mouse_wheel(self, event):
+        """Scroll when the wheel turns over this list"""
+        widget = event.widget
+        while widget is not None and widget is not self:
+            widget = getattr(widget, "master", None)
+        if widget is None:
+            return
+        
+        if event.num == 4:
+            units = -3
+        elif event.num == 5:
+            units = 3
+        elif sys.platform == "darwin":
+            units = -event.delta
+        else:
+            units = -int(event.delta / 40)
+        self.canvas.yview_scroll(units, "units")
+        self.layout()
+    
+    def visible_range(self):
+        """Indices of the items in view, without overscan"""
+        top = self.canvas.canvasy(0)
+        height = self.canvas.winfo_height()
+        first = min(int(top // self.row_height), len(self.items))
+        last = min(int((top + height) // self.row_height) + 1, len(self.items))
+        return first, last
+    
+    def layout(self, resized=False):
+        """Bind rows to the items in view now, the overscan when there's time, and park the rest in the pool"""
+        first, last = self.visible_range()
+        start = max(first - self.overscan, 0)
+        end = min(last + self.overscan, len(self.items))
+        
+        for index in list(self.visible):
+            if not start <= index < end:
+                self.release(index)
+        
+        if self.on_layout:
+            self.on_layout()
+        
+        width = max(self.canvas.winfo_width() - 20, 1)
+        if resized:
+            for row in self.visible.values():
+                self.canvas.itemconfigure(self.window_ids[row], width=width)
+        
+        # The first screenful appears at once; the overscan below and above
+        # follows in time slices, replacing the job of an earlier layout
+        for index in range(first, last):
+            self.bind_item(index, width)
+        overscan = list(range(last, end)) + list(range(first - 1, start - 1, -1))
+        if self.slicer:
+            self.slicer.start(self.bind_overscan(overscan, width), key=(id(self), 'overscan'))
+        else:
+            for index in overscan:
+                self.bind_item(index, width)
+        
+        if self.on_near_end and self.items and last >= len(self.items) - LOAD_MORE_ROWS:
+            self.on_near_end()
+    
+    def bind_item(self, index, width):
+        """Show an item in a row unless one already shows it"""
+        if index in self.visible or index >= len(self.items):
+            return
+        row = self.acquire()
+        row.show(self.items[index])
+        self.visible[index] = row
+        window_id = self.window_ids[row]
+        self.canvas.coords(window_id, 10, index * self.row_height + 8)
+        self.canvas.itemconfigure(window_id, state="normal", width=width)
+    
+    def bind_overscan(self, indices, width):
+        """Time-sliced job binding the overscan rows, then building spare rows for scrolling"""
+        for index in indices:
+            self.bind_item(index, width)
+            yield
+        
+        # Rows for a full screen plus overscan on both sides, so scrolling
+        # only ever re-binds rows instead of building them
+        capacity = self.canvas.winfo_height() // self.row_height + 2 * self.overscan + 2
+        while len(self.visible) + len(self.pool) < capacity:
+            self.pool.append(self.build_row())
+            yield
+    
+    def acquire(self):
+        """Take a row from the pool, building one if it's empty"""
+        if self.pool:
+            return self.pool.pop()
+        return self.build_row()
+    
+    def build_row(self):
+        """Create a hidden row and its canvas window"""
+        row = self.create_row(self.canvas)
+        self.window_ids[row] = self.canvas.create_window(
+            0, 0,
+            window=row,
+            anchor="nw",
+            height=self.row_height - 16,
+            state="hidden"
+        )
+        return row
+    
+    def release(self, index):
+        """Hide the row showing an item and return it to the pool"""
+        row = self.visible.pop(index)
+        self.canvas.itemconfigure(self.window_ids[row], state="hidden")
+        self.pool.append(row)
+
+
 class GameStoreAggregator:
-    def __init__(self):
+    def __init__(self, data_dir=CACHE_DIR, api_bases=None, background=True):
+        # data_dir holds the caches, history and watchlist; api_bases points
+        # stores at stand-ins (see SearchEngine); without background there's
+        # no watchlist polling, rate refresh or metrics endpoint (benchmarks)
+        self.data_dir = data_dir
+        
         ctk.set_appearance_mode("dark")
         ctk.set_default_color_theme("blue")
         
@@ -20,49 +710,69 @@ class GameStoreAggregator:
         self.root.title("🎮 Ultimate Game Store Aggregator")
         self.root.geometry("1400x900")
         
-        # Search results
+        # Every update from a worker thread goes through this queue, and
+        # long work on the Tk thread is spread over ticks by the slicer
+        self.ui = UiEventQueue(self.root, on_frame=self.redraw)
+        self.slicer = TimeSlicer(self.root)
+        self.view_dirty = False
+        
+        # Search results: every result received, the same grouped by game and
+        # sorted for the current sort order, and the filtered view displayed
+        self.all_results = []
+        self.matcher = TitleMatcher()
+        self.sorted_results = []
+        self.sorted_by = None
         self.results = []
-        self.is_searching = False
-        
-        # Store APIs and endpoints
-        self.stores = {
-            'steam': {
-                'name': 'Steam',
-                'icon': '🎮',
-                'color': '#1b2838',
-                'enabled': True
-            },
-            'epic': {
-                'name': 'Epic Games',
-                'icon': '⚡',
-                'color': '#313131',
-                'enabled': True
-            },
-            'gog': {
-                'name': 'GOG',
-                'icon': '🌌',
-                'color': '#86328a',
-                'enabled': True
-            },
-            'humble': {
-                'name': 'Humble Bundle',
-                'icon': '💝',
-                'color': '#cc2929',
-                'enabled': True
-            },
-            'itch': {
-                'name': 'Itch.io',
-                'icon': '🎨',
-                'color': '#fa5c5c',
-                'enabled': True
-            },
-            'gamepass': {
-                'name': 'Xbox Game Pass',
-                'icon': '🎯',
-                'color': '#107c10',
-                'enabled': True
-            }
-        }
+        self.store_status = {}
+        
+        # Search generation: each new search bumps it and cancels the last
+        # one, and UI updates from older generations are dropped
+        self.search_generation = 0
+        self.search_cancel = None
+        
+        # Results (by id) of this search whose regional prices have been asked
+        # for; only cards that come into view are looked up
+        self.regional_requested = set()
+        self.searched_query = None
+        self.searched_stores = []
+        self.debounce_job = None
+        
+        # Further pages: the next one is fetched ahead in the background
+        # (page_loading), kept in next_page until the list is scrolled near
+        # its end, or shown as soon as it arrives if that happened first
+        self.next_page = None
+        self.page_loading = False
+        self.page_wanted = False
+        
+        # Headless search engine with the shared HTTP pool and caches, matching
+        # titles offline when a local catalog has been imported
+        self.engine = SearchEngine(
+            region=SEARCH_REGION,
+            http=HttpClient(cache=ResponseCache(path=self.data_path(RESPONSE_CACHE_PATH))),
+            catalog=Catalog.open_existing(self.data_path(CATALOG_PATH)),
+            history=PriceHistory(self.data_path(HISTORY_PATH)),
+            api_bases=api_bases,
+            compare_regions=PRICE_COMPARE_REGIONS,
+            rates=ExchangeRates(path=self.data_path(RATES_PATH)),
+            currency=currency_for(SEARCH_REGION)
+        )
+        self.stores = self.engine.stores
+        self.thumbnails = ThumbnailLoader(self.engine.http, cache_dir=self.data_path(THUMBNAIL_DIR))
+        
+        # Stage timings for scraping at http://127.0.0.1:9464/metrics
+        self.metrics_server = None
+        if background:
+            self.engine.rates.refresh_in_background()
+            try:
+                self.metrics_server = serve_metrics(port=METRICS_PORT)
+            except OSError as e:
+                print(f"Metrics endpoint error: {e}")
+        
+        # Watched titles, polled in the background for price drops
+        self.watchlist = Watchlist(self.data_path(WATCHLIST_PATH))
+        self.poller = WatchlistPoller(self.engine, self.watchlist, self.show_price_alert)
+        if background:
+            self.poller.start()
         
         # Filters
         self.filter_free = False
@@ -84,7 +794,16 @@ class GameStoreAggregator:
             'border': '#30363d'
         }
         
+        # Blank image shown until a card's thumbnail arrives
+        placeholder = Image.new("RGB", THUMBNAIL_SIZE, self.colors['bg'])
+        self.thumbnail_placeholder = ctk.CTkImage(light_image=placeholder, dark_image=placeholder, size=THUMBNAIL_SIZE)
+        
         self.setup_ui()
+        self.ui.start()
+    
+    def data_path(self, path):
+        """Where a file kept under CACHE_DIR by default lives in this app's data_dir"""
+        return os.path.join(self.data_dir, os.path.relpath(path, CACHE_DIR))
     
     def setup_ui(self):
         """Setup the main user interface"""
@@ -137,7 +856,24 @@ class GameStoreAggregator:
             font=("Arial", 12),
             text_color=self.colors['subtext']
         )
-        self.stats_label.pack()
+        self.stats_label.pack(side="left")
+        
+        self.cache_label = ctk.CTkLabel(
+            stats_frame,
+            text="",
+            font=("Arial", 12),
+            text_color=self.colors['subtext']
+        )
+        self.cache_label.pack(side="left", padx=(15, 0))
+        
+        # Recent average time per search stage
+        self.timing_label = ctk.CTkLabel(
+            stats_frame,
+            text="",
+            font=("Arial", 11),
+            text_color=self.colors['subtext']
+        )
+        self.timing_label.pack(side="left", padx=(15, 0))
     
     def create_sidebar(self, parent):
         """Create sidebar with filters and store selection"""
@@ -183,6 +919,7 @@ class GameStoreAggregator:
         
         # Store checkboxes
         self.store_vars = {}
+        self.store_health_labels = {}
         for store_id, store_data in self.stores.items():
             self.create_store_checkbox(sidebar, store_id, store_data)
         
@@ -300,6 +1037,17 @@ class GameStoreAggregator:
                 command=self.update_sort
             ).pack(anchor="w", pady=5)
         
+        # Watched titles and their price thresholds
+        ctk.CTkButton(
+            sidebar,
+            text="⭐ Watchlist",
+            width=280,
+            height=40,
+            font=("Arial Bold", 13),
+            fg_color=self.colors['card_hover'],
+            command=self.open_watchlist
+        ).pack(pady=(20, 0), padx=20)
+        
         # Clear filters button
         ctk.CTkButton(
             sidebar,
@@ -330,6 +1078,16 @@ class GameStoreAggregator:
             command=self.update_enabled_stores
         )
         checkbox.pack(side="left")
+        
+        # Shown while the store's circuit breaker is keeping it offline
+        health_label = ctk.CTkLabel(
+            check_frame,
+            text="",
+            font=("Arial", 11),
+            text_color=self.colors['warning']
+        )
+        health_label.pack(side="right")
+        self.store_health_labels[store_id] = health_label
     
     def create_content_area(self, parent):
         """Create main content area"""
@@ -354,6 +1112,7 @@ class GameStoreAggregator:
         )
         self.search_entry.pack(side="left", fill="x", expand=True, padx=(0, 15))
         self.search_entry.bind("<Return>", lambda e: self.start_search())
+        self.search_entry.bind("<KeyRelease>", self.schedule_search)
         
         self.search_btn = ctk.CTkButton(
             search_container,
@@ -390,28 +1149,48 @@ class GameStoreAggregator:
         results_container = ctk.CTkFrame(content, fg_color="transparent")
         results_container.pack(fill="both", expand=True, padx=20, pady=(10, 20))
         
-        # Results header
+        # Results header, with a button for the next page when there is one
+        results_top = ctk.CTkFrame(results_container, fg_color="transparent")
+        results_top.pack(fill="x", pady=(0, 10))
+        
         self.results_header = ctk.CTkLabel(
-            results_container,
+            results_top,
             text="",
             font=("Arial Bold", 14),
             text_color=self.colors['text']
         )
-        self.results_header.pack(anchor="w", pady=(0, 10))
+        self.results_header.pack(side="left")
         
-        # Scrollable results
-        self.results_scroll = ctk.CTkScrollableFrame(
+        self.more_btn = ctk.CTkButton(
+            results_top,
+            text="⬇ Load more",
+            width=120,
+            height=28,
+            fg_color=self.colors['card'],
+            hover_color=self.colors['card_hover'],
+            command=self.load_more
+        )
+        
+        # Virtualized results list, with a panel for messages in its place
+        self.results_list = VirtualResultList(
+            results_container,
+            create_row=lambda parent: ResultRow(parent, self),
+            bg=self.colors['bg'],
+            on_layout=self.on_list_layout,
+            on_near_end=self.load_more,
+            slicer=self.slicer
+        )
+        self.message_panel = ctk.CTkScrollableFrame(
             results_container,
             fg_color="transparent"
         )
-        self.results_scroll.pack(fill="both", expand=True)
         
         # Initial message
         self.show_welcome_message()
     
     def show_welcome_message(self):
         """Show welcome message"""
-        welcome_frame = ctk.CTkFrame(self.results_scroll, fg_color=self.colors['card'])
+        welcome_frame = ctk.CTkFrame(self.show_message_panel(), fg_color=self.colors['card'])
         welcome_frame.pack(fill="both", expand=True, padx=50, pady=50)
         
         ctk.CTkLabel(
@@ -460,306 +1239,354 @@ class GameStoreAggregator:
                 command=lambda s=search_term: self.quick_search(s)
             ).pack(side="left", padx=5)
     
-    def start_search(self):
-        """Start the search process"""
+    def schedule_search(self, event=None):
+        """Search once typing pauses; every keystroke restarts the wait"""
+        if event is not None and event.keysym == "Return":
+            return
+        if self.debounce_job:
+            self.root.after_cancel(self.debounce_job)
+        self.debounce_job = self.root.after(SEARCH_DEBOUNCE_MS, lambda: self.start_search(typed=True))
+    
+    def start_search(self, typed=False):
+        """Start a search, cancelling any search still running"""
+        if self.debounce_job:
+            self.root.after_cancel(self.debounce_job)
+            self.debounce_job = None
+        
         query = self.search_entry.get().strip()
         
-        if not query:
+        if typed:
+            # Keystrokes that don't change the query (arrows, shift) or
+            # leave it too short to be useful don't search
+            if len(query) < MIN_TYPED_QUERY or query == self.searched_query:
+                return
+        elif not query:
             messagebox.showwarning("No Search Query", "Please enter a game name to search!")
             return
         
-        if self.is_searching:
-            return
-        
         # Check if any store is selected
         if not any(var.get() for var in self.store_vars.values()):
-            messagebox.showwarning("No Stores Selected", "Please select at least one store to search!")
+            if not typed:
+                messagebox.showwarning("No Stores Selected", "Please select at least one store to search!")
             return
         
-        self.is_searching = True
-        self.search_btn.configure(state="disabled", text="⏳ Searching...")
+        if self.search_cancel:
+            self.search_cancel.cancel()
+        self.search_generation += 1
+        self.search_cancel = CancelToken()
+        self.searched_query = query
+        self.searched_stores = [store_id for store_id, var in self.store_vars.items() if var.get()]
+        self.regional_requested = set()
+        self.next_page = None
+        self.page_loading = False
+        self.page_wanted = False
+        self.more_btn.pack_forget()
+        
+        self.search_btn.configure(text="⏳ Searching...")
         self.progress_bar.set(0)
         
         # Clear previous results
-        for widget in self.results_scroll.winfo_children():
-            widget.destroy()
+        self.show_results_list()
+        self.results_list.set_items([])
+        self.results_list.scroll_to_top()
         
+        self.all_results = []
+        self.matcher = TitleMatcher()
+        self.sorted_results = []
         self.results = []
         
         # Start search in thread
-        thread = threading.Thread(target=self.perform_search, args=(query,), daemon=True)
+        thread = threading.Thread(
+            target=self.perform_search,
+            args=(query, self.searched_stores, self.search_generation, self.search_cancel),
+            daemon=True
+        )
         thread.start()
     
-    def perform_search(self, query):
-        """Perform the actual search"""
-        enabled_stores = [store_id for store_id, var in self.store_vars.items() if var.get()]
-        total_stores = len(enabled_stores)
-        
-        for i, store_id in enumerate(enabled_stores):
-            self.update_status(f"Searching {self.stores[store_id]['name']}...")
-            self.progress_bar.set((i + 0.5) / total_stores)
-            
-            try:
-                if store_id == 'steam':
-                    results = self.search_steam(query)
-                    self.results.extend(results)
-                elif store_id == 'epic':
-                    results = self.search_epic(query)
-                    self.results.extend(results)
-                elif store_id == 'gog':
-                    results = self.search_gog(query)
-                    self.results.extend(results)
-                elif store_id == 'humble':
-                    results = self.search_humble(query)
-                    self.results.extend(results)
-                elif store_id == 'itch':
-                    results = self.search_itch(query)
-                    self.results.extend(results)
-                elif store_id == 'gamepass':
-                    results = self.search_gamepass(query)
-                    self.results.extend(results)
-            except Exception as e:
-                print(f"Error searching {store_id}: {e}")
-            
-            self.progress_bar.set((i + 1) / total_stores)
+    def perform_search(self, query, store_ids, generation, cancel):
+        """Perform the actual search, querying all enabled stores in parallel"""
+        _, store_status = self.engine.search(
+            query,
+            store_ids,
+            on_results=lambda batch, status: self.show_partial_results(batch, status, generation),
+            cancel=cancel
+        )
         
-        # Apply filters and sort
-        self.results = self.apply_filters_to_results(self.results)
-        self.results = self.sort_results(self.results)
+        def finish():
+            if generation == self.search_generation:
+                self.store_status = store_status
+                self.finish_search()
+        # Once every batch queued before it has been merged
+        self.ui.post(lambda: self.slicer.call(finish))
+    
+    def show_partial_results(self, batch, store_status, generation):
+        """Queue one store's results for merging into the view, drawn as they merge"""
+        status = format_store_status(store_status, self.stores)
+        done = sum(1 for state in store_status.values() if state != 'pending')
+        progress = done / len(store_status) if store_status else 1.0
+        
+        def merge():
+            # A newer search has started since this batch was queued
+            if generation != self.search_generation:
+                return
+            self.store_status = store_status
+            self.slicer.start(self.merge_batch(batch, generation))
+        
+        def show_progress():
+            if generation != self.search_generation:
+                return
+            self.progress_bar.set(progress)
+            self.status_label.configure(text=status)
+            self.update_store_health()
+            self.timing_label.configure(text=METRICS.summary())
+        
+        self.ui.post(merge)
+        self.ui.post(show_progress, key='progress')
+    
+    def on_list_layout(self):
+        """Work for the cards now in view: thumbnails first, then regional prices"""
+        self.thumbnails.next_pass()
+        self.compare_visible_prices()
+    
+    def compare_visible_prices(self):
+        """Look up regional prices for the offers in view that haven't been looked up in this search"""
+        if not self.engine.compare_regions or not self.search_cancel:
+            return
+        first, last = self.results_list.visible_range()
+        batch = [
+            offer for group in self.results_list.items[first:last] for offer in group.offers
+            if id(offer) not in self.regional_requested
+        ]
+        if not batch:
+            return
+        self.regional_requested.update(id(offer) for offer in batch)
+        
+        generation = self.search_generation
+        
+        def show():
+            if generation == self.search_generation:
+                for row in self.results_list.visible.values():
+                    row.show_regional_prices()
+        # Cancelled with the search, so lookups for old results don't queue
+        # ahead of the next search's
+        self.engine.compare_prices(
+            batch,
+            on_done=lambda results: self.ui.post(show, key='regional'),
+            cancel=self.search_cancel
+        )
+    
+    def merge_batch(self, batch, generation):
+        """Time-sliced job merging results into the view a chunk at a time"""
+        for start in range(0, len(batch), MERGE_CHUNK):
+            if generation != self.search_generation:
+                return
+            self.add_results(batch[start:start + MERGE_CHUNK])
+            self.view_dirty = True
+            yield
+        # Even an empty batch redraws, so a list left at its end asks for more
+        if generation == self.search_generation:
+            self.view_dirty = True
+    
+    def redraw(self):
+        """Redraw the results once per frame after batches were merged"""
+        if not self.view_dirty:
+            return
+        self.view_dirty = False
+        # An empty list mid-search is no reason to say nothing was found yet
+        if self.results:
+            self.display_results()
+    
+    def finish_search(self):
+        """Show the final results and re-enable searching"""
+        self.search_btn.configure(text="🚀 SEARCH")
+        self.progress_bar.set(1.0)
+        # Fetching ahead first lets a list that already reaches its end ask
+        # for the page while it is on its way
+        self.prefetch_page()
+        self.display_results()
+        self.view_dirty = False
+        
+        status = format_store_status(self.store_status, self.stores)
+        if status and self.results:
+            self.status_label.configure(text=status)
+        
+        self.stats_label.configure(text=self.engine.http.summary())
+        self.cache_label.configure(text=self.engine.result_cache.summary())
+        self.timing_label.configure(text=METRICS.summary())
+        self.update_store_health()
+    
+    def prefetch_page(self):
+        """Fetch the next page of the current search in the background, if there is one"""
+        if self.page_loading or self.next_page is not None:
+            return
+        if not self.engine.has_more(self.searched_query, self.searched_stores):
+            self.update_more_button()
+            return
         
-        # Display results
-        self.is_searching = False
-        self.root.after(0, self.display_results)
+        self.page_loading = True
+        self.update_more_button()
+        thread = threading.Thread(
+            target=self.fetch_page,
+            args=(self.searched_query, self.searched_stores, self.search_generation, self.search_cancel),
+            daemon=True
+        )
+        thread.start()
     
-    def search_steam(self, query):
-        """Search Steam store"""
-        results = []
-        try:
-            # Steam store search API
-            url = f"https://store.steampowered.com/api/storesearch/?term={quote(query)}&l=english&cc=US"
-            response = requests.get(url, timeout=10)
-            data = response.json()
-            
-            for item in data.get('items', [])[:10]:  # Limit to 10 results
-                # Get detailed info
-                app_id = item.get('id')
-                detail_url = f"https://store.steampowered.com/api/appdetails?appids={app_id}"
-                detail_response = requests.get(detail_url, timeout=5)
-                detail_data = detail_response.json()
-                
-                if detail_data.get(str(app_id), {}).get('success'):
-                    game_data = detail_data[str(app_id)]['data']
-                    
-                    price_info = game_data.get('price_overview', {})
-                    is_free = game_data.get('is_free', False)
-                    
-                    if is_free:
-                        price = 0.0
-                        original_price = 0.0
-                        discount = 0
-                    else:
-                        price = price_info.get('final', 0) / 100
-                        original_price = price_info.get('initial', 0) / 100
-                        discount = price_info.get('discount_percent', 0)
-                    
-                    results.append({
-                        'name': game_data.get('name', ''),
-                        'store': 'steam',
-                        'store_name': 'Steam',
-                        'store_icon': '🎮',
-                        'price': price,
-                        'original_price': original_price,
-                        'discount': discount,
-                        'is_free': is_free,
-                        'url': f"https://store.steampowered.com/app/{app_id}/",
-                        'image': game_data.get('header_image', ''),
-                        'description': game_data.get('short_description', '')[:200],
-                        'release_date': game_data.get('release_date', {}).get('date', 'N/A')
-                    })
-        except Exception as e:
-            print(f"Steam search error: {e}")
-        
-        return results
-    
-    def search_epic(self, query):
-        """Search Epic Games Store"""
-        results = []
-        try:
-            # Epic doesn't have a public API, so we'll use mock data
-            # In a real implementation, you'd scrape or use unofficial APIs
-            
-            epic_games = [
-                {
-                    'name': f"{query} (Epic Exclusive)",
-                    'store': 'epic',
-                    'store_name': 'Epic Games',
-                    'store_icon': '⚡',
-                    'price': 29.99,
-                    'original_price': 59.99,
-                    'discount': 50,
-                    'is_free': False,
-                    'url': f"https://store.epicgames.com/en-US/browse?q={quote(query)}",
-                    'image': '',
-                    'description': 'Available on Epic Games Store',
-                    'release_date': '2024'
-                }
-            ]
-            
-            # Check for actual free games (Epic's free weekly games)
-            # This would require web scraping in real implementation
-            
-            results.extend(epic_games)
-        except Exception as e:
-            print(f"Epic search error: {e}")
+    def fetch_page(self, query, store_ids, generation, cancel):
+        """Fetch the next page of every store that has one (worker thread)"""
+        batches = []
+        
+        def collect(batch, store_status):
+            batches.append(batch)
+        
+        self.engine.search_more(query, store_ids, on_results=collect, cancel=cancel)
+        
+        def done():
+            if generation == self.search_generation:
+                self.page_loading = False
+                self.next_page = batches
+                if self.page_wanted:
+                    self.show_next_page()
+                else:
+                    self.update_more_button()
+        self.ui.post(done)
+    
+    def load_more(self):
+        """Show the next page of results, now if it has been fetched ahead or else once it arrives"""
+        if self.next_page is not None:
+            self.show_next_page()
+        elif self.page_loading and not self.page_wanted:
+            self.page_wanted = True
+            self.update_more_button()
+    
+    def show_next_page(self):
+        """Merge the fetched-ahead page into the results and start fetching the one after"""
+        batches = self.next_page
+        self.next_page = None
+        self.page_wanted = False
+        for batch in batches:
+            self.slicer.start(self.merge_batch(batch, self.search_generation))
+        
+        # Merged pages are drawn by the next frames
+        self.prefetch_page()
+        self.cache_label.configure(text=self.engine.result_cache.summary())
+        self.timing_label.configure(text=METRICS.summary())
+    
+    def update_more_button(self):
+        """Show the load-more button while the current search has further pages"""
+        if self.page_loading and self.page_wanted:
+            self.more_btn.configure(text="⏳ Loading...", state="disabled")
+        else:
+            self.more_btn.configure(text="⬇ Load more", state="normal")
         
-        return results
+        if self.page_loading or self.next_page:
+            self.more_btn.pack(side="right")
+        else:
+            self.more_btn.pack_forget()
     
-    def search_gog(self, query):
-        """Search GOG"""
-        results = []
-        try:
-            # GOG search API
-            url = f"https://embed.gog.com/games/ajax/filtered?mediaType=game&search={quote(query)}"
-            response = requests.get(url, timeout=10)
-            data = response.json()
-            
-            for product in data.get('products', [])[:10]:
-                price_data = product.get('price', {})
-                
-                results.append({
-                    'name': product.get('title', ''),
-                    'store': 'gog',
-                    'store_name': 'GOG',
-                    'store_icon': '🌌',
-                    'price': float(price_data.get('finalAmount', 0)),
-                    'original_price': float(price_data.get('baseAmount', 0)),
-                    'discount': int(price_data.get('discountPercentage', 0)),
-                    'is_free': price_data.get('isFree', False),
-                    'url': f"https://www.gog.com{product.get('url', '')}",
-                    'image': f"https:{product.get('image', '')}" if product.get('image') else '',
-                    'description': 'DRM-Free on GOG',
-                    'release_date': 'N/A'
-                })
-        except Exception as e:
-            print(f"GOG search error: {e}")
-        
-        return results
-    
-    def search_humble(self, query):
-        """Search Humble Bundle"""
-        results = []
-        try:
-            # Mock Humble results (they don't have a public API)
-            results.append({
-                'name': f"{query} Bundle",
-                'store': 'humble',
-                'store_name': 'Humble Bundle',
-                'store_icon': '💝',
-                'price': 12.00,
-                'original_price': 100.00,
-                'discount': 88,
-                'is_free': False,
-                'url': f"https://www.humblebundle.com/store/search?search={quote(query)}",
-                'image': '',
-                'description': 'Pay what you want bundle',
-                'release_date': 'N/A'
-            })
-        except Exception as e:
-            print(f"Humble search error: {e}")
-        
-        return results
-    
-    def search_itch(self, query):
-        """Search Itch.io"""
-        results = []
-        try:
-            # Itch.io search
-            results.append({
-                'name': f"{query} (Indie)",
-                'store': 'itch',
-                'store_name': 'Itch.io',
-                'store_icon': '🎨',
-                'price': 0.0,
-                'original_price': 0.0,
-                'discount': 0,
-                'is_free': True,
-                'url': f"https://itch.io/search?q={quote(query)}",
-                'image': '',
-                'description': 'Indie games on Itch.io',
-                'release_date': 'N/A'
-            })
-        except Exception as e:
-            print(f"Itch search error: {e}")
-        
-        return results
-    
-    def search_gamepass(self, query):
-        """Search Xbox Game Pass"""
-        results = []
-        try:
-            results.append({
-                'name': f"{query}",
-                'store': 'gamepass',
-                'store_name': 'Xbox Game Pass',
-                'store_icon': '🎯',
-                'price': 9.99,
-                'original_price': 9.99,
-                'discount': 0,
-                'is_free': False,
-                'url': f"https://www.xbox.com/en-US/xbox-game-pass/games",
-                'image': '',
-                'description': 'Available with Game Pass subscription',
-                'release_date': 'N/A'
-            })
-        except Exception as e:
-            print(f"Game Pass search error: {e}")
-        
-        return results
-    
-    def apply_filters_to_results(self, results):
-        """Apply active filters to results"""
-        filtered = results.copy()
-        
-        # Free games filter
-        if self.filter_free:
-            filtered = [r for r in filtered if r['is_free']]
-        
-        # On sale filter
-        if self.filter_on_sale:
-            filtered = [r for r in filtered if r['discount'] > 0]
-        
-        # Max price filter
-        if self.filter_max_price is not None:
-            filtered = [r for r in filtered if r['price'] <= self.filter_max_price]
-        
-        return filtered
+    def update_store_health(self):
+        """Mark stores whose circuit breaker is open or probing in the sidebar"""
+        health = self.engine.store_health()
+        for store_id, label in self.store_health_labels.items():
+            state = health.get(store_id, 'closed')
+            if state == 'open':
+                label.configure(text="⚠ degraded", text_color=self.colors['danger'])
+            elif state == 'half-open':
+                label.configure(text="↻ retrying", text_color=self.colors['warning'])
+            else:
+                label.configure(text="")
+    
+    def apply_details(self, game, data):
+        """Copy a result's lazily loaded fields into it"""
+        self.engine.apply_details(game, data)
+    
+    def load_details(self, game, on_loaded):
+        """Load a result's missing fields in the background, then call on_loaded on the UI thread"""
+        self.engine.load_details(game, lambda data: self.ui.post(lambda: on_loaded(data)))
+    
+    def apply_filters_to_groups(self, groups):
+        """Apply active filters to each group's offers"""
+        return apply_filters_to_groups(groups, self.filter_free, self.filter_on_sale, self.filter_max_price)
     
     def sort_results(self, results):
         """Sort results based on selected option"""
-        sort_by = self.sort_var.get()
+        return sort_results(results, self.sort_var.get())
+    
+    def add_results(self, batch):
+        """Add newly arrived results (one store's batch or page), merging them into the sorted groups"""
+        # Batches come one store at a time, so time them per store
+        store = batch[0].store_id if batch else 'all'
+        self.all_results.extend(batch)
+        known = len(self.matcher.groups)
+        
+        with METRICS.timer('sort', store):
+            changed = self.matcher.add(batch)
+            
+            # A group's best offer may have moved, so re-sort from scratch
+            if changed or self.sorted_by != self.sort_var.get():
+                self.sorted_by = None
+            else:
+                new_groups = self.sort_results(self.matcher.groups[known:])
+                self.sorted_results = self.merge_sorted(self.sorted_results, new_groups)
         
-        if sort_by == "price_asc":
-            return sorted(results, key=lambda x: x['price'])
-        elif sort_by == "price_desc":
-            return sorted(results, key=lambda x: x['price'], reverse=True)
-        elif sort_by == "name_asc":
-            return sorted(results, key=lambda x: x['name'].lower())
-        elif sort_by == "discount":
-            return sorted(results, key=lambda x: x['discount'], reverse=True)
-        else:
-            return results
+        if self.sorted_by is None:
+            self.update_view(store)
+            return
+        
+        # Only the new groups need filtering before joining the shown ones
+        with METRICS.timer('filter', store):
+            shown, trimmed = self.apply_filters_to_groups(new_groups)
+            if trimmed:
+                shown = self.sort_results(shown)
+            self.results = self.merge_sorted(self.results, shown)
+    
+    def merge_sorted(self, ordered, new_groups):
+        """Merge groups sorted for the current sort order into a list sorted the same way"""
+        order = sort_key(self.sort_var.get())
+        if order is None:
+            return ordered + new_groups
+        key, reverse = order
+        return list(heapq.merge(ordered, new_groups, key=key, reverse=reverse))
+    
+    def update_view(self, store='all'):
+        """Recompute the displayed results from the raw ones without refetching"""
+        sort_by = self.sort_var.get()
+        if self.sorted_by != sort_by:
+            with METRICS.timer('sort', store):
+                self.sorted_results = self.sort_results(self.matcher.groups)
+            self.sorted_by = sort_by
+        
+        # Filtering keeps the sorted order, so a filter change only re-sorts
+        # when it took a group's best offer away
+        with METRICS.timer('filter', store):
+            self.results, trimmed = self.apply_filters_to_groups(self.sorted_results)
+            if trimmed:
+                self.results = self.sort_results(self.results)
+    
+    def refresh_view(self):
+        """Re-filter and re-sort the current results and redraw them"""
+        if not self.all_results:
+            return
+        self.update_view()
+        self.display_results()
+    
+    def show_message_panel(self):
+        """Swap the results list for an empty message panel and return it"""
+        self.results_list.pack_forget()
+        for widget in self.message_panel.winfo_children():
+            widget.destroy()
+        self.message_panel.pack(fill="both", expand=True)
+        return self.message_panel
+    
+    def show_results_list(self):
+        """Swap the message panel for the results list"""
+        self.message_panel.pack_forget()
+        self.results_list.pack(fill="both", expand=True)
     
     def display_results(self):
         """Display search results"""
-        self.search_btn.configure(state="normal", text="🚀 SEARCH")
-        self.progress_bar.set(1.0)
-        
-        # Clear previous results
-        for widget in self.results_scroll.winfo_children():
-            widget.destroy()
-        
         if not self.results:
-            no_results = ctk.CTkFrame(self.results_scroll, fg_color=self.colors['card'])
+            no_results = ctk.CTkFrame(self.show_message_panel(), fg_color=self.colors['card'])
             no_results.pack(fill="both", expand=True, padx=50, pady=50)
             
             ctk.CTkLabel(
@@ -781,143 +1608,184 @@ class GameStoreAggregator:
             return
         
         # Update header
+        offers = sum(len(group.offers) for group in self.results)
         self.results_header.configure(
-            text=f"📊 Found {len(self.results)} results"
+            text=f"📊 Found {len(self.results)} games ({offers} offers)"
         )
         self.status_label.configure(text="Click on any game to open in store")
         
-        # Display results
-        for result in self.results:
-            self.create_result_card(result)
+        # Only the rows in view get widgets
+        with METRICS.timer('render'):
+            self.show_results_list()
+            self.results_list.set_items(self.results)
     
-    def create_result_card(self, game):
-        """Create a fancy game result card"""
-        card = ctk.CTkFrame(
-            self.results_scroll,
-            fg_color=self.colors['card'],
-            border_width=1,
-            border_color=self.colors['border']
-        )
-        card.pack(fill="x", pady=8, padx=10)
-        
-        # Make card clickable
-        card.bind("<Enter>", lambda e: card.configure(fg_color=self.colors['card_hover']))
-        card.bind("<Leave>", lambda e: card.configure(fg_color=self.colors['card']))
-        card.bind("<Button-1>", lambda e: webbrowser.open(game['url']))
-        
-        main_frame = ctk.CTkFrame(card, fg_color="transparent")
-        main_frame.pack(fill="x", padx=20, pady=15)
-        
-        # Left side - Game info
-        info_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
-        info_frame.pack(side="left", fill="x", expand=True)
+    def format_store_line(self, game):
+        """Format the store name line of a result card"""
+        if game.release_date and game.release_date != 'N/A':
+            return f"on {game.store_name} • Released {game.release_date}"
+        return f"on {game.store_name}"
+    
+    def format_other_offers(self, group):
+        """List the offers of a group other than its cheapest one"""
+        if not group.others:
+            return ""
+        offers = [f"{offer.store_icon} {offer.store_name} {self.format_offer_price(offer)}" for offer in group.others]
+        return "Also on: " + " • ".join(offers)
+    
+    def format_offer_price(self, offer):
+        """Short price of an offer for the other-offers line"""
+        if offer.is_free:
+            return "FREE"
+        if offer.included_with:
+            return f"with {offer.included_with}"
+        return format_money(offer.price_cents, offer.currency)
+    
+    def toggle_watch(self, game):
+        """Watch a result's title for price drops, or stop watching it"""
+        key = series_key(game)
+        if self.watchlist.contains(game.store_id, key):
+            self.watchlist.remove(game.store_id, key)
+            return
         
-        # Title with store icon
-        title_frame = ctk.CTkFrame(info_frame, fg_color="transparent")
-        title_frame.pack(anchor="w")
+        dialog = ctk.CTkInputDialog(
+            title="Watch Price",
+            text=f"Notify when {game.name} drops to ({game.currency}):\nleave empty to be told of sales only"
+        )
+        threshold = self.parse_threshold(dialog.get_input())
+        if threshold is not False:
+            self.watchlist.add_result(game, threshold)
+    
+    def parse_threshold(self, text):
+        """Cents of a typed watch threshold, None for no threshold, False if cancelled or invalid"""
+        if text is None:
+            return False
+        text = text.strip().lstrip("$€£¥")
+        if not text:
+            return None
+        try:
+            return round(float(text.replace(",", "")) * 100)
+        except ValueError:
+            messagebox.showerror("Invalid Price", "Please enter a valid number")
+            return False
+    
+    def open_watchlist(self):
+        """Show the watched titles, with their last price and threshold, in a window of their own"""
+        # Read on a worker; the window is built once the watches are in
+        def load():
+            watches = self.watchlist.watches()
+            self.ui.post(lambda: self.show_watchlist(watches))
+        threading.Thread(target=load, daemon=True).start()
+    
+    def show_watchlist(self, watches):
+        """Build the watchlist window"""
+        window = ctk.CTkToplevel(self.root)
+        window.title("Watchlist")
+        window.geometry("720x480")
+        window.configure(fg_color=self.colors['bg'])
+        
+        rows = ctk.CTkScrollableFrame(window, fg_color=self.colors['bg'])
+        rows.pack(fill="both", expand=True, padx=10, pady=10)
+        if not watches:
+            ctk.CTkLabel(rows, text="No watched titles yet", text_color=self.colors['subtext']).pack(pady=20)
+        for watch in watches:
+            self.create_watch_row(rows, watch)
+    
+    def create_watch_row(self, parent, watch):
+        """One watched title: name, last price, and threshold entry with set and remove buttons"""
+        row = ctk.CTkFrame(parent, fg_color=self.colors['card'])
+        row.pack(fill="x", pady=3)
         
+        store = self.stores.get(watch.store_id, {})
+        last = format_money(watch.last_cents, watch.currency) if watch.last_cents is not None else "not polled yet"
         ctk.CTkLabel(
-            title_frame,
-            text=game['store_icon'],
-            font=("Arial", 20)
-        ).pack(side="left", padx=(0, 10))
-        
-        title_label = ctk.CTkLabel(
-            title_frame,
-            text=game['name'],
-            font=("Arial Bold", 16),
-            text_color=self.colors['text'],
+            row,
+            text=f"{store.get('icon', '')} {watch.name} • {last}",
+            font=("Arial", 12),
             anchor="w"
-        )
-        title_label.pack(side="left")
-        title_label.bind("<Button-1>", lambda e: webbrowser.open(game['url']))
+        ).pack(side="left", fill="x", expand=True, padx=10, pady=8)
         
-        # Store name
-        store_label = ctk.CTkLabel(
-            info_frame,
-            text=f"on {game['store_name']}",
-            font=("Arial", 11),
-            text_color=self.colors['subtext']
-        )
-        store_label.pack(anchor="w", pady=(5, 0))
+        def remove():
+            self.watchlist.remove(watch.store_id, watch.app_id)
+            row.destroy()
+            for card in self.results_list.visible.values():
+                card.show_watch_state()
         
-        # Description
-        if game.get('description'):
-            desc_label = ctk.CTkLabel(
-                info_frame,
-                text=game['description'][:150] + "..." if len(game['description']) > 150 else game['description'],
-                font=("Arial", 11),
-                text_color=self.colors['subtext'],
-                anchor="w",
-                wraplength=600
-            )
-            desc_label.pack(anchor="w", pady=(8, 0))
+        ctk.CTkButton(
+            row,
+            text="Remove",
+            width=70,
+            height=28,
+            fg_color=self.colors['danger'],
+            command=remove
+        ).pack(side="right", padx=(5, 10))
         
-        # Right side - Price and action
-        price_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
-        price_frame.pack(side="right", padx=(20, 0))
+        entry = ctk.CTkEntry(row, placeholder_text=f"Notify at ({watch.currency})", width=130, height=28)
+        if watch.threshold_cents is not None:
+            entry.insert(0, f"{watch.threshold_cents / 100:.2f}")
         
-        if game['is_free']:
-            price_label = ctk.CTkLabel(
-                price_frame,
-                text="FREE",
-                font=("Arial Bold", 24),
-                text_color=self.colors['success']
-            )
-            price_label.pack()
-        else:
-            if game['discount'] > 0:
-                # Original price (strikethrough effect)
-                original_label = ctk.CTkLabel(
-                    price_frame,
-                    text=f"${game['original_price']:.2f}",
-                    font=("Arial", 12),
-                    text_color=self.colors['subtext']
-                )
-                original_label.pack()
-                
-                # Discount badge
-                discount_frame = ctk.CTkFrame(price_frame, fg_color=self.colors['success'])
-                discount_frame.pack(pady=5)
-                
-                ctk.CTkLabel(
-                    discount_frame,
-                    text=f"-{game['discount']}%",
-                    font=("Arial Bold", 14),
-                    text_color="white"
-                ).pack(padx=10, pady=5)
-            
-            # Current price
-            price_label = ctk.CTkLabel(
-                price_frame,
-                text=f"${game['price']:.2f}",
-                font=("Arial Bold", 24),
-                text_color=self.colors['accent']
-            )
-            price_label.pack()
+        def set_threshold():
+            threshold = self.parse_threshold(entry.get())
+            if threshold is not False:
+                self.watchlist.set_threshold(watch.store_id, watch.app_id, threshold)
         
-        # Visit store button
-        visit_btn = ctk.CTkButton(
-            price_frame,
-            text="Visit Store →",
-            width=130,
-            height=40,
-            font=("Arial Bold", 12),
-            fg_color=self.colors['accent'],
-            command=lambda: webbrowser.open(game['url'])
-        )
-        visit_btn.pack(pady=(10, 0))
+        ctk.CTkButton(row, text="Set", width=50, height=28, command=set_threshold).pack(side="right", padx=5)
+        entry.pack(side="right", padx=5)
     
-    def update_status(self, message):
-        """Update status label"""
+    def show_price_alert(self, alert):
+        """Announce a watched title's price drop on the UI thread"""
         def update():
-            self.status_label.configure(text=message)
-        self.root.after(0, update)
+            self.status_label.configure(text=f"🔔 {alert.message()}")
+            self.root.bell()
+        self.ui.post(update)
+    
+    def format_price_history(self, game):
+        """Describe a result's price history; return (text, whether it's at its all-time low)"""
+        # Looked up on the search worker; nothing here touches the database
+        stats = game.price_stats
+        if stats is None or game.is_free:
+            return "", False
+        
+        # A first sighting is its own low; that says nothing yet
+        if not stats.has_history():
+            return "🆕 First seen", False
+        
+        at_low = game.price_cents <= stats.low_cents
+        currency = game.currency
+        parts = ["📉 Historical low!" if at_low else f"Lowest ever {format_money(stats.low_cents, currency)}"]
+        if stats.days > 1:
+            parts.append(
+                f"30-day low {format_money(stats.min_30_cents, currency)} • avg {format_money(stats.avg_30_cents, currency)}"
+            )
+        return " • ".join(parts), at_low
+    
+    def format_regional_prices(self, game):
+        """Describe a result's prices in other regions; return (text, whether one is cheaper than here)"""
+        if not game or not game.regional:
+            return "", False
+        
+        currency = self.engine.currency
+        parts = []
+        for region, price in sorted(game.regional.items()):
+            text = f"{region} {format_money(price.price_cents, price.currency)}"
+            if price.currency != currency and price.converted_cents is not None:
+                text += f" (≈{format_money(price.converted_cents, currency)})"
+            parts.append(text)
+        
+        cheapest = self.engine.cheapest_region(game)
+        if cheapest:
+            parts.append(f"cheapest in {cheapest}")
+        return "🌍 " + " • ".join(parts), cheapest is not None
+    
+    def format_description(self, game):
+        """Shorten a result's description for its card"""
+        description = game.description
+        return description[:150] + "..." if len(description) > 150 else description
     
     def update_filters(self):
         """Update filter variables"""
         self.filter_free = self.free_var.get()
         self.filter_on_sale = self.sale_var.get()
+        self.refresh_view()
     
     def apply_price_filter(self):
         """Apply max price filter"""
@@ -925,9 +1793,11 @@ class GameStoreAggregator:
             price = self.price_entry.get().strip()
             if price:
                 self.filter_max_price = float(price)
+                self.refresh_view()
                 messagebox.showinfo("Filter Applied", f"Max price set to ${self.filter_max_price:.2f}")
             else:
                 self.filter_max_price = None
+                self.refresh_view()
         except ValueError:
             messagebox.showerror("Invalid Price", "Please enter a valid number")
     
@@ -941,10 +1811,11 @@ class GameStoreAggregator:
             self.filter_max_price = price
             self.price_entry.delete(0, 'end')
             self.price_entry.insert(0, str(price))
+        self.refresh_view()
     
     def update_sort(self):
         """Update sort order"""
-        pass  # Sort is applied during search
+        self.refresh_view()
     
     def select_all_stores(self):
         """Select all stores"""
@@ -962,6 +1833,9 @@ class GameStoreAggregator:
         """Update enabled stores"""
         for store_id, var in self.store_vars.items():
             self.stores[store_id]['enabled'] = var.get()
+            # Load a store's adapter as soon as it is first switched on
+            if var.get():
+                self.engine.adapter(store_id)
     
     def reset_filters(self):
         """Reset all filters"""
@@ -972,6 +1846,7 @@ class GameStoreAggregator:
         self.filter_max_price = None
         self.price_entry.delete(0, 'end')
         self.sort_var.set("relevance")
+        self.refresh_view()
         messagebox.showinfo("Filters Reset", "All filters have been reset")
     
     def quick_search(self, query):
@@ -0,0 +1,103 @@
+"""Parse-time benchmarks of the store adapters on synthetic search pages.
+
+    python -m bench.parse --repeat 200 --output parse-results.json
+
+Each adapter turns the page of its store in bench/fixtures into results
+exactly as it does a live response (decode plus page_results), with no
+network or response cache involved. The pages are hand-built in each
+store's format and sized like real ones, not captured from the stores; a
+page that yields no results fails the run. The HTML page is also timed as a complete BeautifulSoup
+tree, for comparison with the adapter's lxml XPath (or strained) parse.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+from bench.run import percentiles
+from bench.server import FIXTURES_DIR
+from gamerr_engine import HttpClient, SearchEngine
+from gamerr_stores.itch import HTML_PARSER, parse_search_page
+
+# Synthetic page per store and the decoder its adapter passes to get_json
+PARSE_FIXTURES = {
+    'epic': ("epic_search.json", json.loads),
+    'humble': ("humble_search.json", json.loads),
+    'itch': ("itch_search.html", parse_search_page),
+    'gamepass': ("gamepass_products.json", json.loads),
+}
+
+
+def full_tree(body):
+    """The itch.io game cells found in a complete BeautifulSoup tree of the page"""
+    return BeautifulSoup(body, HTML_PARSER).find_all("div", attrs={'data-game_id': True})
+
+
+def time_parse(parse, body, repeat):
+    """Seconds per call of parse(body), repeat times"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse(body)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def bench_parse(repeat, fixtures_dir=FIXTURES_DIR):
+    """Per-store results found and parse times per page"""
+    engine = SearchEngine(http=HttpClient(cache=None))
+    report = {}
+    for store_id, (fixture, decoder) in PARSE_FIXTURES.items():
+        with open(os.path.join(fixtures_dir, fixture), "rb") as f:
+            body = f.read()
+        adapter = engine.adapter(store_id)
+        
+        def parse(body):
+            return adapter.page_results(decoder(body))
+        
+        report[store_id] = {
+            'fixture': fixture,
+            'bytes': len(body),
+            'results': len(parse(body)),
+            'parse': percentiles(time_parse(parse, body, repeat)),
+        }
+        if fixture.endswith(".html"):
+            report[store_id]['full_tree'] = percentiles(time_parse(full_tree, body, repeat))
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark store adapters parsing synthetic search pages")
+    parser.add_argument("--repeat", type=int, default=100, help="times each page is parsed")
+    parser.add_argument("--output", help="JSON file for the results")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = bench_parse(args.repeat)
+    
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({'html_parser': HTML_PARSER, 'stores': report}, f, indent=2)
+        print(f"Results written to {args.output}", file=sys.stderr)
+    
+    failed = False
+    for store_id, entry in report.items():
+        parse = entry['parse']
+        line = (f"{store_id:>8}: {entry['results']:>3} results from {entry['bytes'] / 1024:.0f} KB, "
+                f"p50 {parse['p50_ms']} ms, p95 {parse['p95_ms']} ms per page")
+        if 'full_tree' in entry:
+            line += f" (full BeautifulSoup tree: p50 {entry['full_tree']['p50_ms']} ms)"
+        print(line)
+        if not entry['results']:
+            print(f"{store_id}: no results parsed from {entry['fixture']}", file=sys.stderr)
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
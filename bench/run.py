@@ -0,0 +1,330 @@
+"""End-to-end search and render benchmarks against the local store stand-in.
+
+    python -m bench.run --latency 80 --jitter 40 --output bench-results.json
+    python -m bench.run --compare bench-results.json
+
+Searches go through SearchEngine exactly as in the app, with the Steam and
+GOG adapters pointed at bench.server. Each round measures:
+
+    cold    a fresh engine: new connections and an empty response cache
+    warm    the same engine with its result cache cleared, so every request
+            is answered from the response cache
+    memory  the same searches again, answered from the result cache
+
+the time relevance ranking takes to score and sort N results, and, when a
+display is available, the time display_results takes to show N cards and to
+scroll through all of them.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench.server import StandInServer
+from gamerr_engine import (
+    GameGroup,
+    GameResult,
+    HttpClient,
+    RelevanceRanker,
+    ResponseCache,
+    ResultCache,
+    SearchEngine,
+    STORES,
+    TitleMatcher,
+    sort_results
+)
+
+# Stores the stand-in has fixture responses for
+BENCH_STORES = ['steam', 'gog']
+
+BENCH_QUERIES = [
+    "witcher", "portal", "half-life", "hades", "stardew", "cyberpunk",
+    "dark souls", "baldur", "hollow knight", "terraria", "fallout", "dota"
+]
+
+
+def percentiles(values):
+    """p50/p95/p99, mean and max of a list of seconds, in milliseconds"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    
+    def at(pct):
+        # Linear interpolation between closest ranks
+        position = (len(ordered) - 1) * pct / 100
+        low = int(position)
+        high = min(low + 1, len(ordered) - 1)
+        return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+    
+    return {
+        'count': len(ordered),
+        'p50_ms': round(at(50) * 1000, 2),
+        'p95_ms': round(at(95) * 1000, 2),
+        'p99_ms': round(at(99) * 1000, 2),
+        'mean_ms': round(sum(ordered) / len(ordered) * 1000, 2),
+        'max_ms': round(ordered[-1] * 1000, 2),
+    }
+
+
+class SearchTimings:
+    """Search latencies of one phase: overall and per store"""
+    
+    def __init__(self):
+        self.total = []
+        self.stores = {store_id: [] for store_id in BENCH_STORES}
+    
+    def search(self, engine, query):
+        """Run one search, recording when each store's results arrived"""
+        start = time.perf_counter()
+        seen = set()
+        
+        def on_results(batch, store_status):
+            now = time.perf_counter() - start
+            for store_id, status in store_status.items():
+                if status != 'pending' and store_id not in seen:
+                    seen.add(store_id)
+                    self.stores[store_id].append(now)
+        
+        engine.search(query, BENCH_STORES, on_results=on_results)
+        self.total.append(time.perf_counter() - start)
+    
+    def summary(self):
+        return {
+            'overall': percentiles(self.total),
+            'stores': {store_id: percentiles(values) for store_id, values in self.stores.items()},
+        }
+
+
+def new_engine(base_url, cache_dir):
+    """A fresh engine against the stand-in, with an empty response cache in cache_dir"""
+    cache = ResponseCache(path=os.path.join(cache_dir, f"responses-{time.monotonic_ns()}.sqlite3"))
+    return SearchEngine(
+        http=HttpClient(cache=cache),
+        api_bases={store_id: base_url for store_id in BENCH_STORES}
+    )
+
+
+def bench_search(base_url, queries, rounds):
+    """Cold, warm and memory search timings over several rounds"""
+    phases = {name: SearchTimings() for name in ('cold', 'warm', 'memory')}
+    cache_dir = tempfile.mkdtemp(prefix="gamerr-bench-")
+    try:
+        for _ in range(rounds):
+            engine = new_engine(base_url, cache_dir)
+            for query in queries:
+                phases['cold'].search(engine, query)
+            
+            engine.result_cache = ResultCache()
+            for query in queries:
+                phases['warm'].search(engine, query)
+            
+            for query in queries:
+                phases['memory'].search(engine, query)
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    return {name: timings.summary() for name, timings in phases.items()}
+
+
+def synthetic_groups(count):
+    """count single-offer game groups with no thumbnails or lazy details"""
+    stores = list(STORES.values())
+    groups = []
+    for i in range(count):
+        price = 499 + (i * 37) % 5000
+        groups.append(GameGroup(f"benchmark game {i}", [GameResult(
+            name=f"Benchmark Game {i}",
+            store=stores[i % len(stores)],
+            price_cents=price,
+            original_cents=price * 2 if i % 3 == 0 else price,
+            discount=50 if i % 3 == 0 else 0,
+            is_free=False,
+            url="",
+            description="Synthetic result used to time card rendering."
+        )]))
+    return groups
+
+
+def bench_rank(count, rounds):
+    """Time scoring `count` results against a query (cold and cached features) and sorting their groups"""
+    groups = synthetic_groups(count)
+    results = [group.best for group in groups]
+    timings = {'score_cold': [], 'score_warm': [], 'sort': []}
+    for _ in range(rounds):
+        ranker = RelevanceRanker()
+        for phase in ('score_cold', 'score_warm'):
+            start = time.perf_counter()
+            ranker.score("benchmark game 42", results, 'steam')
+            timings[phase].append(time.perf_counter() - start)
+        
+        matcher = TitleMatcher()
+        matcher.add(results)
+        start = time.perf_counter()
+        sort_results(matcher.groups, "relevance")
+        timings['sort'].append(time.perf_counter() - start)
+    return dict({'results': count}, **{phase: percentiles(values) for phase, values in timings.items()})
+
+
+def bench_render(cards):
+    """Time display_results with `cards` groups and a scroll through all of them"""
+    # The app keeps its data in a scratch directory, talks to the stand-in
+    # instead of the stores, and starts no poller, rate refresh or metrics
+    # endpoint, so a run neither touches ~/.gamerr nor the network
+    data_dir = tempfile.mkdtemp(prefix="gamerr-bench-")
+    server = StandInServer(latency=0, jitter=0)
+    base_url = server.start()
+    try:
+        import Gamerr
+        app = Gamerr.GameStoreAggregator(
+            data_dir=data_dir,
+            api_bases={store_id: base_url for store_id in STORES},
+            background=False
+        )
+    except Exception as e:
+        # No display (or no Tk) on this machine
+        server.stop()
+        shutil.rmtree(data_dir, ignore_errors=True)
+        return {'skipped': str(e)}
+    
+    try:
+        root = app.root
+        root.update()
+        groups = synthetic_groups(cards)
+        app.results = groups
+        
+        start = time.perf_counter()
+        app.display_results()
+        root.update()
+        first_paint = time.perf_counter() - start
+        
+        # Page down through every card, letting each page draw
+        listing = app.results_list
+        pages = max(cards * listing.row_height // max(listing.canvas.winfo_height(), 1), 1)
+        frames = []
+        for page in range(1, pages + 1):
+            start = time.perf_counter()
+            listing.yview('moveto', page / pages)
+            root.update()
+            frames.append(time.perf_counter() - start)
+        
+        return {
+            'cards': cards,
+            'first_paint_ms': round(first_paint * 1000, 2),
+            'scroll': percentiles(frames),
+            'scroll_total_ms': round(sum(frames) * 1000, 2),
+        }
+    finally:
+        app.root.destroy()
+        server.stop()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def flatten(data, prefix=""):
+    """{'a': {'b': 1}} -> {'a.b': 1}, numbers only"""
+    flat = {}
+    for key, value in (data or {}).items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(old, new):
+    """Print the millisecond metrics of two runs side by side"""
+    old_metrics = flatten({'search': old.get('search'), 'rank': old.get('rank'), 'render': old.get('render')})
+    new_metrics = flatten({'search': new.get('search'), 'rank': new.get('rank'), 'render': new.get('render')})
+    print(f"{'metric':<40} {'old':>10} {'new':>10} {'change':>8}")
+    for name, value in new_metrics.items():
+        if not name.endswith("_ms") or name not in old_metrics:
+            continue
+        before = old_metrics[name]
+        change = f"{(value - before) / before * 100:+.1f}%" if before else "-"
+        print(f"{name:<40} {before:>10.2f} {value:>10.2f} {change:>8}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark searches and rendering against a local store stand-in")
+    parser.add_argument("--latency", type=float, default=80, help="simulated response latency in ms")
+    parser.add_argument("--jitter", type=float, default=40, help="latency varies by up to this many ms")
+    parser.add_argument("--rounds", type=int, default=3, help="times each phase is repeated")
+    parser.add_argument("--cards", type=int, default=200, help="cards shown in the render benchmark (0 to skip)")
+    parser.add_argument("--rank-results", type=int, default=3000, help="results in the ranking benchmark (0 to skip)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the simulated jitter")
+    parser.add_argument("--output", default="bench-results.json", help="JSON file for the results")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    previous = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+    
+    server = StandInServer(latency=args.latency / 1000, jitter=args.jitter / 1000, seed=args.seed)
+    base_url = server.start()
+    try:
+        search = bench_search(base_url, BENCH_QUERIES, args.rounds)
+    finally:
+        server.stop()
+    
+    results = {
+        'meta': {
+            'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'latency_ms': args.latency,
+            'jitter_ms': args.jitter,
+            'rounds': args.rounds,
+            'seed': args.seed,
+            'queries': len(BENCH_QUERIES),
+            'requests': server.requests,
+            'not_modified': server.not_modified,
+        },
+        'search': search,
+        'rank': bench_rank(args.rank_results, args.rounds) if args.rank_results else None,
+        'render': bench_render(args.cards) if args.cards else None,
+    }
+    
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}", file=sys.stderr)
+    
+    for phase, timings in search.items():
+        overall = timings['overall']
+        print(f"{phase:>6}: p50 {overall['p50_ms']} ms, p95 {overall['p95_ms']} ms, p99 {overall['p99_ms']} ms")
+    rank = results['rank']
+    if rank:
+        print(f"  rank: {rank['results']} results, score p50 {rank['score_warm']['p50_ms']} ms "
+              f"({rank['score_cold']['p50_ms']} ms with new titles), sort p50 {rank['sort']['p50_ms']} ms")
+    render = results['render']
+    if render and 'skipped' not in render:
+        print(f"render: {render['cards']} cards, first paint {render['first_paint_ms']} ms, "
+              f"scroll {render['scroll_total_ms']} ms")
+    elif render:
+        print(f"render: skipped ({render['skipped']})")
+    
+    if previous:
+        compare(previous, results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
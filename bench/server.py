@@ -0,0 +1,129 @@
+"""Local HTTP stand-in for the Steam and GOG APIs.
+
+Serves the synthetic responses in bench/fixtures (hand-built in the stores'
+formats) with a configurable delay per request, and answers conditional
+requests with 304 like the real stores.
+"""
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+GOG_PRICES_PATH = re.compile(r"^/products/(\d+)/prices$")
+
+
+def load_fixtures(fixtures_dir=FIXTURES_DIR):
+    """Fixture responses by name, e.g. 'steam_storesearch' -> {term: response}"""
+    fixtures = {}
+    for name in os.listdir(fixtures_dir):
+        if name.endswith(".json"):
+            with open(os.path.join(fixtures_dir, name), encoding="utf-8") as f:
+                fixtures[name[:-5]] = json.load(f)
+    return fixtures
+
+
+class StandInServer:
+    """Threaded server answering with fixture store responses and simulated latency"""
+    
+    def __init__(self, fixtures_dir=FIXTURES_DIR, latency=0.08, jitter=0.04, seed=0):
+        self.fixtures = load_fixtures(fixtures_dir)
+        self.latency = latency
+        self.jitter = jitter
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.requests = 0
+        self.not_modified = 0
+        self.server = None
+    
+    def start(self):
+        """Start serving on a free local port; return the base URL"""
+        stand_in = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real APIs
+            
+            def do_GET(self):
+                stand_in.handle(self)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return f"http://127.0.0.1:{self.server.server_port}"
+    
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+    
+    def delay(self):
+        """Seconds to wait before answering: latency give or take up to jitter"""
+        with self.random_lock:
+            return max(self.latency + self.random.uniform(-self.jitter, self.jitter), 0)
+    
+    def respond(self, path, params):
+        """Fixture body for a request as (status, data)"""
+        fixtures = self.fixtures
+        if path == "/api/storesearch/":
+            term = params.get('term', [''])[0].lower()
+            return 200, fixtures['steam_storesearch'].get(term, {"total": 0, "items": []})
+        
+        if path == "/api/appdetails":
+            details = fixtures['steam_appdetails']
+            price_only = params.get('filters', [''])[0] == "price_overview"
+            data = {}
+            for app_id in params.get('appids', [''])[0].split(","):
+                entry = details.get(app_id, {"success": False})
+                if price_only and entry.get('success'):
+                    # Steam sends an empty list for apps without a price
+                    price = entry['data'].get('price_overview')
+                    entry = {"success": True, "data": {"price_overview": price} if price else []}
+                data[app_id] = entry
+            return 200, data
+        
+        if path == "/games/ajax/filtered":
+            search = params.get('search', [''])[0].lower()
+            empty = {"products": [], "page": 1, "totalPages": 0, "totalResults": "0"}
+            # Every fixture search fits on its first page
+            if params.get('page', ['1'])[0] != '1':
+                return 200, empty
+            return 200, fixtures['gog_filtered'].get(search, empty)
+        
+        match = GOG_PRICES_PATH.match(path)
+        if match and match.group(1) in fixtures['gog_prices']:
+            return 200, fixtures['gog_prices'][match.group(1)]
+        return 404, {"error": "no fixture"}
+    
+    def handle(self, request):
+        """Answer one request after the simulated delay"""
+        time.sleep(self.delay())
+        url = urlsplit(request.path)
+        status, data = self.respond(url.path, parse_qs(url.query))
+        body = json.dumps(data).encode("utf-8")
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        
+        with self.random_lock:
+            self.requests += 1
+            if status == 200 and request.headers.get("If-None-Match") == etag:
+                self.not_modified += 1
+                status = 304
+        
+        request.send_response(status)
+        request.send_header("ETag", etag)
+        if status == 304:
+            request.send_header("Content-Length", "0")
+            request.end_headers()
+            return
+        request.send_header("Content-Type", "application/json")
+        request.send_header("Content-Length", str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
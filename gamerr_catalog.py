@@ -0,0 +1,425 @@
+"""Local catalog of store titles for offline, instant title search.
+
+Steam app lists and GOG product dumps are bulk-imported into SQLite and
+indexed with an FTS5 trigram table, so prefix, substring and fuzzy title
+lookups don't touch the network; only prices are fetched per search:
+
+    python gamerr_catalog.py import fixtures/catalog/steam_applist.json fixtures/catalog/gog_catalog.json
+    python gamerr_catalog.py search "witcher"
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+from gamerr_engine import CACHE_DIR, PUNCTUATION_PATTERN, TRADEMARK_PATTERN
+
+# Catalog database location
+CATALOG_PATH = os.path.join(CACHE_DIR, "catalog.sqlite3")
+
+# Steam's full app list; IStoreService/GetAppList pages through it with a key
+STEAM_APPLIST_URL = "https://api.steampowered.com/ISteamApps/GetAppList/v2/"
+
+# Fuzzy search: candidates pulled from the trigram index, and the typos allowed
+# per query word: one edit (a wrong, missing, extra or swapped letter) per
+# this many letters, so words shorter than that must be spelled right
+CATALOG_FUZZY_CANDIDATES = 200
+CATALOG_FUZZY_LETTERS_PER_EDIT = 4
+
+# Rows written per transaction during an import
+CATALOG_IMPORT_BATCH = 5000
+
+
+def fold_title(title):
+    """Lowercase a title and drop marks and punctuation for indexing"""
+    title = TRADEMARK_PATTERN.sub("", title.lower())
+    return " ".join(PUNCTUATION_PATTERN.sub(" ", title.replace("&", " and ")).split())
+
+
+def trigrams(text):
+    """Set of three-character substrings of the words of a folded title"""
+    return {word[i:i + 3] for word in text.split() for i in range(len(word) - 2)}
+
+
+def edit_distance(a, b):
+    """Letters inserted, deleted, replaced or swapped with a neighbour to turn a into b"""
+    previous, current = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous, current = previous, current, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (a[i - 1] != b[j - 1])
+            )
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+    return current[-1]
+
+
+def word_edits(word, title_words):
+    """Fewest edits turning a query word into a word of a title, or a prefix of one; None if too many"""
+    allowed = len(word) // CATALOG_FUZZY_LETTERS_PER_EDIT
+    best = None
+    for title_word in title_words:
+        # A prefix of the same length counts, for a word still being typed
+        edits = min(edit_distance(word, title_word), edit_distance(word, title_word[:len(word)]))
+        if edits <= allowed and (best is None or edits < best):
+            best = edits
+            if not edits:
+                break
+    return best
+
+
+def parse_steam_applist(data):
+    """(app_id, name, url, image) rows from a GetAppList response"""
+    # ISteamApps/GetAppList/v2 and IStoreService/GetAppList wrap the list differently
+    apps = (data.get('applist') or data.get('response') or {}).get('apps', [])
+    for app in apps:
+        name = (app.get('name') or '').strip()
+        if name:
+            app_id = app['appid']
+            yield (
+                str(app_id),
+                name,
+                f"https://store.steampowered.com/app/{app_id}/",
+                f"https://cdn.akamai.steamstatic.com/steam/apps/{app_id}/capsule_184x69.jpg"
+            )
+
+
+def parse_gog_catalog(data):
+    """(app_id, name, url, image) rows from GOG filtered-search pages"""
+    # A dump is one page of games/ajax/filtered or a list of them
+    pages = data if isinstance(data, list) else [data]
+    for page in pages:
+        for product in page.get('products', []):
+            name = (product.get('title') or '').strip()
+            if name:
+                image = product.get('image')
+                yield (
+                    str(product['id']),
+                    name,
+                    f"https://www.gog.com{product.get('url', '')}",
+                    f"https:{image}_196.jpg" if image else ''
+                )
+
+
+# Dump formats by store, told apart by their top-level keys
+CATALOG_PARSERS = {
+    'steam': parse_steam_applist,
+    'gog': parse_gog_catalog,
+}
+
+
+def detect_store(data):
+    """Store a catalog dump came from, or None"""
+    if isinstance(data, list) or 'products' in data:
+        return 'gog'
+    if 'applist' in data or 'apps' in data.get('response', {}):
+        return 'steam'
+    return None
+
+
+class CatalogEntry:
+    """One title in the local catalog"""
+    __slots__ = ('store_id', 'app_id', 'name', 'url', 'image', 'score')
+    
+    def __init__(self, store_id, app_id, name, url, image, score=1.0):
+        self.store_id = store_id
+        self.app_id = app_id
+        self.name = name
+        self.url = url
+        self.image = image
+        self.score = score
+
+
+class Catalog:
+    """SQLite catalog of store titles with an FTS5 trigram index"""
+    
+    def __init__(self, path=CATALOG_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS titles ("
+            "id INTEGER PRIMARY KEY, store TEXT, app_id TEXT, name TEXT, folded TEXT, "
+            "url TEXT, image TEXT, updated_at REAL, UNIQUE (store, app_id))"
+        )
+        # Import bookkeeping, so unchanged dumps and lists are skipped
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS sources ("
+            "source TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, stamp TEXT, imported_at REAL)"
+        )
+        self.fts = self.create_index()
+        self.conn.commit()
+    
+    def create_index(self):
+        """Create the trigram index kept in sync by triggers; False without FTS5"""
+        try:
+            self.conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS titles_fts USING fts5("
+                "folded, content='titles', content_rowid='id', tokenize='trigram')"
+            )
+        except sqlite3.OperationalError as e:
+            # SQLite built without FTS5 or older than 3.34; searches use LIKE
+            print(f"Catalog index unavailable, using slower search: {e}")
+            return False
+        
+        self.conn.executescript("""
+            CREATE TRIGGER IF NOT EXISTS titles_ai AFTER INSERT ON titles BEGIN
+                INSERT INTO titles_fts (rowid, folded) VALUES (new.id, new.folded);
+            END;
+            CREATE TRIGGER IF NOT EXISTS titles_ad AFTER DELETE ON titles BEGIN
+                INSERT INTO titles_fts (titles_fts, rowid, folded) VALUES ('delete', old.id, old.folded);
+            END;
+            CREATE TRIGGER IF NOT EXISTS titles_au AFTER UPDATE OF folded ON titles BEGIN
+                INSERT INTO titles_fts (titles_fts, rowid, folded) VALUES ('delete', old.id, old.folded);
+                INSERT INTO titles_fts (rowid, folded) VALUES (new.id, new.folded);
+            END;
+        """)
+        return True
+    
+    @classmethod
+    def open_existing(cls, path=CATALOG_PATH):
+        """The catalog at path if one has been imported, else None"""
+        return cls(path) if os.path.exists(path) else None
+    
+    def stores(self):
+        """Store ids with at least one title in the catalog"""
+        with self.lock:
+            return {row[0] for row in self.conn.execute("SELECT DISTINCT store FROM titles")}
+    
+    def count(self, store_id=None):
+        """Number of titles, for one store or all of them"""
+        with self.lock:
+            if store_id:
+                return self.conn.execute("SELECT COUNT(*) FROM titles WHERE store = ?", (store_id,)).fetchone()[0]
+            return self.conn.execute("SELECT COUNT(*) FROM titles").fetchone()[0]
+    
+    def upsert(self, store_id, rows):
+        """Insert or update (app_id, name, url, image) rows; return how many changed.
+        
+        Rows whose title hasn't changed are left alone, so refreshing from a
+        new dump only rewrites the index entries of new and renamed titles.
+        """
+        changed = 0
+        batch = []
+        
+        def flush():
+            nonlocal changed
+            with self.lock:
+                cursor = self.conn.executemany(
+                    "INSERT INTO titles (store, app_id, name, folded, url, image, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (store, app_id) DO UPDATE SET "
+                    "name = excluded.name, folded = excluded.folded, url = excluded.url, "
+                    "image = excluded.image, updated_at = excluded.updated_at "
+                    "WHERE titles.name != excluded.name OR titles.url != excluded.url "
+                    "OR titles.image != excluded.image",
+                    batch
+                )
+                self.conn.commit()
+                # rowcount leaves out the index rows written by the triggers
+                changed += cursor.rowcount
+            batch.clear()
+        
+        now = time.time()
+        for app_id, name, url, image in rows:
+            batch.append((store_id, app_id, name, fold_title(name), url, image, now))
+            if len(batch) >= CATALOG_IMPORT_BATCH:
+                flush()
+        if batch:
+            flush()
+        return changed
+    
+    def source_state(self, source):
+        """(etag, last_modified, stamp) recorded at the last import of a source"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT etag, last_modified, stamp FROM sources WHERE source = ?", (source,)
+            ).fetchone()
+        return row or (None, None, None)
+    
+    def record_source(self, source, etag=None, last_modified=None, stamp=None):
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?, ?)",
+                (source, etag, last_modified, stamp, time.time())
+            )
+            self.conn.commit()
+    
+    def import_data(self, data, store_id=None):
+        """Import a parsed dump; return (store_id, rows changed)"""
+        store_id = store_id or detect_store(data)
+        if store_id not in CATALOG_PARSERS:
+            raise ValueError("Unrecognized catalog dump")
+        return store_id, self.upsert(store_id, CATALOG_PARSERS[store_id](data))
+    
+    def import_file(self, path, store_id=None):
+        """Import a dump file unless it's unchanged since the last import.
+        
+        Returns (store_id, rows changed); store_id is None for a skipped file.
+        """
+        source = os.path.abspath(path)
+        info = os.stat(path)
+        stamp = f"{info.st_size}:{info.st_mtime_ns}"
+        if self.source_state(source)[2] == stamp:
+            return None, 0
+        
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        result = self.import_data(data, store_id)
+        self.record_source(source, stamp=stamp)
+        return result
+    
+    def import_url(self, http, url=STEAM_APPLIST_URL, store_id='steam'):
+        """Refresh from a live app list, sending the validators of the last import.
+        
+        Returns rows changed; 0 when the server answers 304 Not Modified.
+        """
+        etag, last_modified, _ = self.source_state(url)
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        
+        # The list is far too big for the response cache, so skip it
+        response = http.get(url, timeout=60, headers=headers)
+        if response.status_code == 304:
+            return 0
+        response.raise_for_status()
+        
+        _, changed = self.import_data(response.json(), store_id)
+        self.record_source(url, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        return changed
+    
+    def search(self, query, store_ids=None, limit=20, offset=0):
+        """Catalog entries matching a query, best first, skipping the first offset.
+        
+        Titles containing every query word (as a prefix or anywhere inside a
+        word) are returned, exact and prefix matches first; only when there
+        are none, titles whose words are each within a few typos of a query
+        word are, which catches typos without adding loose matches to good
+        queries.
+        """
+        folded = fold_title(query)
+        if not folded:
+            return []
+        
+        entries = self.substring_matches(folded, store_ids, limit, offset)
+        # Past the first page, an empty page may just mean the matches ran out
+        if not entries and self.fts and (offset == 0 or not self.substring_matches(folded, store_ids, 1)):
+            entries = self.fuzzy_matches(folded, store_ids)[offset:offset + limit]
+        return entries
+    
+    def store_filter(self, store_ids):
+        """SQL condition and parameters restricting titles to some stores"""
+        if not store_ids:
+            return "", []
+        return f" AND t.store IN ({', '.join('?' * len(store_ids))})", list(store_ids)
+    
+    def substring_matches(self, folded, store_ids, limit, offset=0):
+        """Titles containing every word of the folded query, exact and prefix first"""
+        words = folded.split()
+        # The trigram index only answers for words of three or more characters
+        indexed = [word for word in words if len(word) >= 3] if self.fts else []
+        scanned = [word for word in words if word not in indexed]
+        
+        conditions = ["t.folded LIKE ?" for _ in scanned]
+        params = [f"%{word}%" for word in scanned]
+        if indexed:
+            conditions.insert(0, "t.id IN (SELECT rowid FROM titles_fts WHERE titles_fts MATCH ?)")
+            params.insert(0, " AND ".join(f'"{word}"' for word in indexed))
+        store_sql, store_params = self.store_filter(store_ids)
+        
+        sql = (
+            "SELECT t.store, t.app_id, t.name, t.url, t.image, t.folded FROM titles t "
+            f"WHERE {' AND '.join(conditions)}{store_sql} "
+            "ORDER BY (t.folded = ?) DESC, (t.folded LIKE ?) DESC, length(t.folded), t.id LIMIT ? OFFSET ?"
+        )
+        with self.lock:
+            rows = self.conn.execute(sql, params + store_params + [folded, f"{folded}%", limit, offset]).fetchall()
+        return [CatalogEntry(*row[:5]) for row in rows]
+    
+    def fuzzy_matches(self, folded, store_ids):
+        """Titles whose words each query word is a typo or two away from, closest first"""
+        terms = trigrams(folded)
+        if not terms:
+            return []
+        
+        store_sql, store_params = self.store_filter(store_ids)
+        match = " OR ".join('"' + gram.replace('"', '""') + '"' for gram in terms)
+        sql = (
+            "SELECT t.store, t.app_id, t.name, t.url, t.image, t.folded FROM titles_fts "
+            "JOIN titles t ON t.id = titles_fts.rowid "
+            f"WHERE titles_fts MATCH ?{store_sql} ORDER BY rank LIMIT ?"
+        )
+        with self.lock:
+            rows = self.conn.execute(sql, [match] + store_params + [CATALOG_FUZZY_CANDIDATES]).fetchall()
+        
+        # Candidates share a trigram with the query; a match needs every query
+        # word within its typo allowance of a title word. Fewer edits per
+        # letter score higher, and closer overall lengths break ties
+        words = folded.split()
+        letters = sum(len(word) for word in words)
+        scored = []
+        for row in rows:
+            title_words = row[5].split()
+            edits = [word_edits(word, title_words) for word in words]
+            if None in edits:
+                continue
+            score = 1 - sum(edits) / letters
+            scored.append((score, -abs(len(row[5]) - len(folded)), CatalogEntry(*row[:5], score=score)))
+        scored.sort(key=lambda item: item[:2], reverse=True)
+        return [entry for _, _, entry in scored]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the local game catalog")
+    parser.add_argument("--path", default=CATALOG_PATH, help="catalog database file")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    import_parser = commands.add_parser("import", help="import catalog dump files")
+    import_parser.add_argument("files", nargs="+", help="Steam app list or GOG product JSON dumps")
+    import_parser.add_argument("--store", choices=sorted(CATALOG_PARSERS), help="store of the dumps (default: detect)")
+    
+    commands.add_parser("refresh", help="refresh the Steam app list from the network")
+    
+    search_parser = commands.add_parser("search", help="search the catalog")
+    search_parser.add_argument("query")
+    search_parser.add_argument("--stores", help="comma-separated store ids (default: all)")
+    search_parser.add_argument("--limit", type=int, default=20)
+    
+    args = parser.parse_args(argv)
+    catalog = Catalog(args.path)
+    
+    if args.command == "import":
+        for path in args.files:
+            store_id, changed = catalog.import_file(path, args.store)
+            if store_id is None:
+                print(f"{path}: unchanged since last import", file=sys.stderr)
+            else:
+                print(f"{path}: {changed} {store_id} titles added or updated", file=sys.stderr)
+    elif args.command == "refresh":
+        from gamerr_engine import HttpClient
+        changed = catalog.import_url(HttpClient())
+        print(f"Steam: {changed} titles added or updated", file=sys.stderr)
+    else:
+        store_ids = args.stores.split(",") if args.stores else None
+        start = time.perf_counter()
+        entries = catalog.search(args.query, store_ids, args.limit)
+        elapsed = (time.perf_counter() - start) * 1000
+        for entry in entries:
+            print(f"{entry.store_id}\t{entry.app_id}\t{entry.name}")
+        print(f"{len(entries)} matches in {elapsed:.1f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
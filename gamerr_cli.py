@@ -0,0 +1,162 @@
+"""Batch price sweeps without the UI.
+
+Reads one query per line from a file (or stdin) and streams every result as a
+JSON line on stdout as soon as its store answers:
+
+    python gamerr_cli.py queries.txt --stores steam,gog --max-price 20 > prices.jsonl
+"""
+import argparse
+import json
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from gamerr_catalog import CATALOG_PATH, Catalog
+from gamerr_engine import (
+    SEARCH_DEADLINE,
+    STORES,
+    CancelToken,
+    SearchEngine,
+    apply_filters,
+    format_store_status,
+    sort_results
+)
+from gamerr_history import PriceHistory
+from gamerr_metrics import METRICS, serve_metrics
+from gamerr_rates import ExchangeRates, currency_for
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Search game stores for many queries and print JSONL results")
+    parser.add_argument("queries", nargs="?", default="-", help="file with one query per line (default: stdin)")
+    parser.add_argument("--stores", default=",".join(STORES), help="comma-separated store ids (default: all)")
+    parser.add_argument("--region", default="US", help="store region / country code")
+    parser.add_argument("--compare-regions", default="",
+                        help="comma-separated regions whose prices are added to each result, converted to --region's currency")
+    parser.add_argument("--free", action="store_true", help="only free games")
+    parser.add_argument("--on-sale", action="store_true", help="only discounted games")
+    parser.add_argument("--max-price", type=float, help="maximum price in dollars")
+    parser.add_argument("--min-relevance", type=float, default=0,
+                        help="drop results matching the query worse than this relevance score (0-1)")
+    parser.add_argument("--sort", default="relevance",
+                        choices=["relevance", "price_asc", "price_desc", "name_asc", "discount"],
+                        help="order of each store's results")
+    parser.add_argument("--jobs", type=int, default=4, help="queries searched at the same time")
+    parser.add_argument("--deadline", type=float, default=SEARCH_DEADLINE, help="seconds allowed per query")
+    parser.add_argument("--no-disk-cache", action="store_true", help="don't read or write the response cache or price history")
+    parser.add_argument("--metrics", help="write a JSON snapshot of stage timings to this file at the end")
+    parser.add_argument("--metrics-port", type=int, help="serve live metrics on this local port during the sweep")
+    parser.add_argument("--catalog", nargs="?", const=CATALOG_PATH,
+                        help="match titles in a local catalog (default path if no value) and only fetch prices")
+    return parser.parse_args(argv)
+
+
+def read_queries(path):
+    """Non-empty, stripped lines of a file or stdin"""
+    stream = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    with stream:
+        return [line.strip() for line in stream if line.strip()]
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    store_ids = [store_id.strip() for store_id in args.stores.split(",") if store_id.strip()]
+    unknown = [store_id for store_id in store_ids if store_id not in STORES]
+    if unknown:
+        print(f"Unknown stores: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+    
+    catalog = Catalog.open_existing(args.catalog) if args.catalog else None
+    if args.catalog and catalog is None:
+        print(f"No catalog at {args.catalog}; import one with gamerr_catalog.py", file=sys.stderr)
+        return 2
+    
+    # Sweeps feed the price history too, unless told to leave the disk alone
+    history = None if args.no_disk_cache else PriceHistory()
+    compare_regions = [region.strip().upper() for region in args.compare_regions.split(",") if region.strip()]
+    rates = None
+    if compare_regions:
+        rates = ExchangeRates()
+        try:
+            rates.refresh()
+        except Exception as e:
+            print(f"Exchange rate refresh error: {e}; using the cached rates", file=sys.stderr)
+    engine = SearchEngine(
+        region=args.region,
+        disk_cache=not args.no_disk_cache,
+        catalog=catalog,
+        history=history,
+        compare_regions=compare_regions,
+        rates=rates,
+        currency=currency_for(args.region)
+    )
+    output_lock = threading.Lock()
+    
+    def write(query, batch):
+        lines = [
+            json.dumps(dict(result.to_dict(), query=query, region=args.region), ensure_ascii=False)
+            for result in batch
+        ]
+        if lines:
+            with output_lock:
+                sys.stdout.write("\n".join(lines) + "\n")
+                sys.stdout.flush()
+    
+    def run(query):
+        # Batches waiting for their regional prices, with the lookups' futures
+        pending = []
+        cancel = CancelToken()
+        
+        def emit(batch, store_status):
+            store = batch[0].store_id if batch else 'all'
+            with METRICS.timer('filter', store):
+                batch = apply_filters(batch, args.free, args.on_sale, args.max_price)
+                if args.min_relevance:
+                    batch = [result for result in batch if result.relevance >= args.min_relevance]
+            with METRICS.timer('sort', store):
+                batch = sort_results(batch, args.sort)
+            # Regional prices are part of each line; a sweep is there for them,
+            # so they're looked up at search priority and waited for once the
+            # search is done, not here on its thread
+            if engine.compare_regions:
+                pending.append((batch, engine.compare_prices(batch, cancel=cancel, background=False)))
+            else:
+                write(query, batch)
+        
+        _, store_status = engine.search(query, store_ids, on_results=emit, deadline=args.deadline)
+        status = format_store_status(store_status)
+        if status:
+            print(f"{query}: {status}", file=sys.stderr)
+        
+        if pending:
+            _, late = wait([future for _, futures in pending for future in futures], timeout=args.deadline)
+            for batch, _ in pending:
+                # Lookups that didn't finish in time are reported, not waited for
+                if late:
+                    for result in batch:
+                        if result.regional_errors is None:
+                            continue
+                        for region in engine.compare_regions:
+                            if region not in result.regional and region not in result.regional_errors:
+                                result.regional_errors[region] = "timed out"
+                write(query, batch)
+            # Lookups not sent yet are dropped
+            cancel.cancel()
+    
+    if args.metrics_port:
+        serve_metrics(port=args.metrics_port)
+    
+    with ThreadPoolExecutor(max_workers=max(args.jobs, 1)) as executor:
+        for _ in executor.map(run, read_queries(args.queries)):
+            pass
+    
+    print(engine.http.summary(), file=sys.stderr)
+    print(METRICS.summary(), file=sys.stderr)
+    if args.metrics:
+        with open(args.metrics, "w", encoding="utf-8") as f:
+            json.dump(METRICS.snapshot(), f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
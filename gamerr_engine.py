@@ -0,0 +1,1507 @@
+"""UI-free search engine: store adapters, caches, matching, filtering and sorting.
+
+Imported by the Tk app in Gamerr.py and by the gamerr_cli.py batch tool; it
+needs nothing beyond requests, so it runs on servers and in cron jobs.
+"""
+import importlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from bisect import insort
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+from concurrent.futures import FIRST_COMPLETED, Future, InvalidStateError, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from operator import attrgetter
+
+import requests
+from urllib3.util.retry import Retry
+
+from gamerr_metrics import METRICS, TimedHTTPAdapter
+
+# Overall deadline (seconds) for one search across all enabled stores
+SEARCH_DEADLINE = 15
+
+# Keep-alive connections kept per store host; other hosts get DEFAULT_POOL_SIZE
+HOST_POOL_SIZES = {
+    'store.steampowered.com': 8,
+    'embed.gog.com': 4
+}
+DEFAULT_POOL_SIZE = 4
+
+# Retry policy for store requests (backoff doubles from HTTP_BACKOFF seconds)
+HTTP_RETRIES = 2
+HTTP_BACKOFF = 0.3
+HTTP_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Disk-backed cache of store API responses
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".gamerr")
+RESPONSE_CACHE_PATH = os.path.join(CACHE_DIR, "responses.sqlite")
+RESPONSE_CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+# Cache hits whose access times are held in memory before being written; the
+# LRU order only matters when evicting, so they're written with the next put
+RESPONSE_CACHE_ACCESS_BATCH = 256
+
+# Seconds a cached response stays fresh, by URL path; stale entries are served
+# at once and refreshed in the background, up to RESPONSE_MAX_STALE old
+RESPONSE_TTLS = {
+    'filters=price_overview': 15 * 60,
+    '/prices?': 15 * 60,
+    '/api/storesearch/': 6 * 3600,
+    '/api/appdetails': 24 * 3600,
+    '/games/ajax/filtered': 6 * 3600,
+    '/store/api/search': 6 * 3600,
+    '/search?q=': 6 * 3600,
+    '/sigls/': 24 * 3600,
+    '/v7.0/products': 6 * 3600
+}
+DEFAULT_RESPONSE_TTL = 3600
+RESPONSE_MAX_STALE = 7 * 24 * 3600
+
+# Cross-store matching: minimum token overlap (Jaccard) for two titles to
+# count as the same game, and tokens too common to be worth looking up
+TITLE_MATCH_THRESHOLD = 0.75
+TITLE_INDEX_MAX_POSTINGS = 50
+
+# Relevance ranking: weight of each signal in a result's score (together 1),
+# the penalty for add-ons the query didn't ask for, and how much each store's
+# own result order is trusted (Game Pass is matched locally, so not at all)
+RELEVANCE_WEIGHTS = {
+    'tokens': 0.35,  # query words found in the title, less for extra title words
+    'trigrams': 0.25,  # character trigram overlap, tolerant of typos and spacing
+    'exact': 0.15,  # title and query are the same game name
+    'prefix': 0.1,  # title starts with the query
+    'rank': 0.15  # position in the store's own results
+}
+RELEVANCE_EXTRA_PENALTY = 0.2
+STORE_RANK_TRUST = {'steam': 1.0, 'gog': 1.0, 'epic': 1.0, 'humble': 0.8, 'itch': 0.6, 'gamepass': 0.0}
+
+# Bits in the hashed token and trigram sets, and titles and words whose
+# features are kept
+RELEVANCE_BITS = 1024
+RELEVANCE_FEATURE_CACHE = 20000
+RELEVANCE_WORD_CACHE = 50000
+
+# Circuit breaker: consecutive failures that take a store offline, and seconds
+# before a single probe request is let through again
+BREAKER_THRESHOLD = 3
+BREAKER_COOLDOWN = 30
+
+# Longest wait (seconds) for a store's rate limiter before giving up on a request
+RATE_LIMIT_MAX_WAIT = 2
+
+# Titles taken from the local catalog per store and page of results
+CATALOG_SEARCH_LIMIT = 10
+
+# Results per store and page; further pages are fetched on demand
+RESULTS_PAGE_SIZE = 10
+
+# Per-store result lists kept in memory for repeat searches, and seconds they
+# are reused for; as long as the price responses they were built from stay fresh
+RESULT_CACHE_SIZE = 200
+RESULT_CACHE_TTL = 15 * 60
+
+# Threads looking up prices in other regions, shared by all stores and regions
+REGION_LOOKUP_WORKERS = 8
+
+# Budget of background lookups (regional prices) per store, kept apart from
+# interactive searches so they never hold one up: requests in flight, and
+# the share of the store's rate limit taken from searches and given to them
+BACKGROUND_CONCURRENCY = 1
+BACKGROUND_RATE_SHARE = 0.25
+
+try:
+    import brotli  # noqa: F401 - lets urllib3 decode brotli responses
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+# Store metadata shown in the UI and referenced by every GameResult
+STORES = {
+    'steam': {
+        'id': 'steam',
+        'name': 'Steam',
+        'icon': '🎮',
+        'color': '#1b2838',
+        'enabled': True
+    },
+    'epic': {
+        'id': 'epic',
+        'name': 'Epic Games',
+        'icon': '⚡',
+        'color': '#313131',
+        'enabled': True
+    },
+    'gog': {
+        'id': 'gog',
+        'name': 'GOG',
+        'icon': '🌌',
+        'color': '#86328a',
+        'enabled': True
+    },
+    'humble': {
+        'id': 'humble',
+        'name': 'Humble Bundle',
+        'icon': '💝',
+        'color': '#cc2929',
+        'enabled': True
+    },
+    'itch': {
+        'id': 'itch',
+        'name': 'Itch.io',
+        'icon': '🎨',
+        'color': '#fa5c5c',
+        'enabled': True
+    },
+    'gamepass': {
+        'id': 'gamepass',
+        'name': 'Xbox Game Pass',
+        'icon': '🎯',
+        'color': '#107c10',
+        'enabled': True
+    }
+}
+
+# Adapter class of each store as "module:Class"; a store's module is only
+# imported the first time that store is used
+STORE_ADAPTERS = {
+    'steam': 'gamerr_stores.steam:SteamAdapter',
+    'epic': 'gamerr_stores.epic:EpicAdapter',
+    'gog': 'gamerr_stores.gog:GogAdapter',
+    'humble': 'gamerr_stores.humble:HumbleAdapter',
+    'itch': 'gamerr_stores.itch:ItchAdapter',
+    'gamepass': 'gamerr_stores.gamepass:GamePassAdapter'
+}
+
+
+def register_store(store, adapter_path):
+    """Add a store: its metadata dict (id, name, icon, color) and "module:Class" adapter"""
+    store.setdefault('enabled', True)
+    STORES[store['id']] = store
+    STORE_ADAPTERS[store['id']] = adapter_path
+
+
+@dataclass(slots=True)
+class RegionalPrice:
+    """A result's price in another region; converted_cents is in the engine's display currency"""
+    region: str
+    currency: str
+    price_cents: int
+    original_cents: int
+    discount: int
+    converted_cents: int | None = None
+
+
+@dataclass(slots=True)
+class GameResult:
+    """One store's offer for a game; prices are in integer cents of currency"""
+    name: str
+    store: dict  # the store's shared entry in SearchEngine.stores
+    price_cents: int
+    original_cents: int
+    discount: int
+    is_free: bool
+    url: str
+    image: str = ''
+    description: str = ''
+    release_date: str = 'N/A'
+    app_id: int | str | None = None  # Steam and GOG ids are numbers; other stores use slugs or product ids
+    details_loaded: bool = True
+    currency: str = 'USD'
+    regional: dict | None = None  # region -> RegionalPrice, filled in by SearchEngine.compare_prices
+    regional_errors: dict | None = None  # region -> why compare_prices found no price there
+    relevance: float = 0.0  # match with the query, set by RelevanceRanker
+    price_stats: object = None  # gamerr_history.PriceStats, filled in by SearchEngine.gather
+    included_with: str = ''  # subscription the game comes with, e.g. 'Game Pass'; prices are 0 then
+    
+    @property
+    def store_id(self):
+        return self.store['id']
+    
+    @property
+    def store_name(self):
+        return self.store['name']
+    
+    @property
+    def store_icon(self):
+        return self.store['icon']
+    
+    @property
+    def price(self):
+        return self.price_cents / 100
+    
+    @property
+    def original_price(self):
+        return self.original_cents / 100
+    
+    def to_dict(self):
+        """Plain-data form for JSON output"""
+        return {
+            'name': self.name,
+            'store': self.store_id,
+            'app_id': self.app_id,
+            'price_cents': self.price_cents,
+            'original_cents': self.original_cents,
+            'discount': self.discount,
+            'is_free': self.is_free,
+            'included_with': self.included_with,
+            'url': self.url,
+            'image': self.image,
+            'description': self.description,
+            'release_date': self.release_date,
+            'currency': self.currency,
+            'relevance': round(self.relevance, 4),
+            'regional': {
+                region: {
+                    'currency': price.currency,
+                    'price_cents': price.price_cents,
+                    'original_cents': price.original_cents,
+                    'discount': price.discount,
+                    'converted_cents': price.converted_cents
+                }
+                for region, price in dict(self.regional or {}).items()
+            },
+            'regional_errors': dict(self.regional_errors or {})
+        }
+
+
+# Edition suffixes and marks that don't make a different game
+EDITION_PATTERN = re.compile(
+    r"\b(?:game of the year|goty|deluxe|digital deluxe|definitive|complete|ultimate|gold|"
+    r"standard|enhanced|premium|special|anniversary|collector'?s)(?: edition)?\s*$"
+)
+TRADEMARK_PATTERN = re.compile(r"[™®©]")
+
+# Title words that make a different game: sequel numbers (roman numerals count
+# as their value, so "III" matches "3") and remake markers. "i" alone is left
+# out, as it's mostly the pronoun.
+ROMAN_NUMERAL_PATTERN = re.compile(r"^(?:x{1,3}(?:ix|iv|v?i{0,3})|ix|iv|v?i{0,3})$")
+ROMAN_VALUES = {'i': 1, 'v': 5, 'x': 10}
+SEQUEL_MARKERS = frozenset({'remake', 'remastered', 'remaster', 'reforged', 'redux', 'reimagined', 'reloaded'})
+EXTRA_CONTENT_PATTERN = re.compile(
+    r"\b(?:soundtrack|ost|dlc|season pass|expansion pass|artbook|art book|costume|skin pack|upgrade pack)\b"
+)
+PUNCTUATION_PATTERN = re.compile(r"[^\w\s]+")
+
+
+def normalize_title(title):
+    """Reduce a store title to a key shared by all editions of the game"""
+    title = TRADEMARK_PATTERN.sub("", title.lower())
+    title = PUNCTUATION_PATTERN.sub(" ", title.replace("&", " and "))
+    title = " ".join(title.split())
+    
+    # Strip stacked suffixes such as "deluxe edition" or "goty"
+    while True:
+        stripped = EDITION_PATTERN.sub("", title).strip()
+        if stripped == title or not stripped:
+            return title
+        title = stripped
+
+
+def roman_value(numeral):
+    """Value of a lowercase roman numeral up to xxxix"""
+    total = 0
+    for i, letter in enumerate(numeral):
+        value = ROMAN_VALUES[letter]
+        # A smaller numeral before a larger one is subtracted: "iv" is 4
+        if i + 1 < len(numeral) and ROMAN_VALUES[numeral[i + 1]] > value:
+            total -= value
+        else:
+            total += value
+    return total
+
+
+def title_marker(token):
+    """The sequel number or remake marker a title token stands for, or None"""
+    if token.isdigit():
+        return str(int(token))
+    if token in SEQUEL_MARKERS:
+        return token
+    if token != 'i' and ROMAN_NUMERAL_PATTERN.match(token):
+        return str(roman_value(token))
+    return None
+
+
+def title_markers(tokens):
+    """Split title tokens into (the words, the markers telling sequels and remakes apart)"""
+    words, markers = set(), set()
+    for token in tokens:
+        marker = title_marker(token)
+        if marker is None:
+            words.add(token)
+        else:
+            markers.add(marker)
+    return frozenset(words), frozenset(markers)
+
+
+def offer_order(offer):
+    """Sort key for a group's offers: cheapest first, subscription offers after purchases"""
+    return bool(offer.included_with), offer.price_cents
+
+
+class GameGroup:
+    """Offers for the same game from one or more stores, cheapest first"""
+    __slots__ = ('key', 'tokens', 'words', 'markers', 'offers')
+    
+    def __init__(self, key, offers=()):
+        self.key = key
+        self.tokens = frozenset(key.split())
+        self.words, self.markers = title_markers(self.tokens)
+        self.offers = sorted(offers, key=offer_order)
+    
+    def add(self, offer):
+        insort(self.offers, offer, key=offer_order)
+    
+    def subset(self, offers):
+        """A group with only some of this group's offers"""
+        return GameGroup(self.key, offers)
+    
+    @property
+    def best(self):
+        return self.offers[0]
+    
+    @property
+    def others(self):
+        return self.offers[1:]
+    
+    # Sort keys delegate to the cheapest offer
+    @property
+    def name(self):
+        return self.offers[0].name
+    
+    @property
+    def price_cents(self):
+        return self.offers[0].price_cents
+    
+    @property
+    def discount(self):
+        return self.offers[0].discount
+    
+    @property
+    def relevance(self):
+        return max(offer.relevance for offer in self.offers)
+
+
+class TitleMatcher:
+    """Groups equivalent games across stores using an inverted token index"""
+    
+    def __init__(self, threshold=TITLE_MATCH_THRESHOLD):
+        self.threshold = threshold
+        self.groups = []
+        self.by_key = {}  # normalized title -> group
+        self.index = {}  # title word -> groups containing it
+    
+    def add(self, results):
+        """Place results into groups; return True if an existing group changed"""
+        changed = False
+        for result in results:
+            key = normalize_title(result.name)
+            group = self.by_key.get(key) or self.find_similar(key)
+            if group is None:
+                group = GameGroup(key, [result])
+                self.groups.append(group)
+                for word in group.words:
+                    self.index.setdefault(word, []).append(group)
+            else:
+                group.add(result)
+                changed = True
+            self.by_key.setdefault(key, group)
+        return changed
+    
+    def find_similar(self, key):
+        """Best existing group sharing enough tokens with a title, or None"""
+        tokens = frozenset(key.split())
+        words, markers = title_markers(tokens)
+        
+        # Only groups sharing a reasonably rare word are ever compared
+        shared = {}
+        for word in words:
+            postings = self.index.get(word, ())
+            if len(postings) > TITLE_INDEX_MAX_POSTINGS:
+                continue
+            for group in postings:
+                shared[group] = shared.get(group, 0) + 1
+        
+        best, best_score = None, self.threshold
+        for group, overlap in shared.items():
+            # Sequels and remakes differ by a word or two: "Portal" is not
+            # "Portal 2", nor "Final Fantasy VII" "Final Fantasy VII Remake".
+            # Markers must match exactly; only the other words are fuzzy
+            if group.markers != markers:
+                continue
+            score = overlap / (len(words) + len(group.words) - overlap)
+            if score >= best_score:
+                best, best_score = group, score
+        return best
+
+
+@dataclass(frozen=True, slots=True)
+class TitleFeatures:
+    """What relevance scoring needs of a title (or query), computed once per title"""
+    key: str  # normalize_title() without a leading "the", for exact and prefix matches
+    tokens: int  # hashed set of words, as a RELEVANCE_BITS-wide bitset
+    token_count: int
+    trigrams: int  # hashed set of character trigrams
+    trigram_count: int
+    extra: bool  # names an add-on such as a soundtrack or DLC
+    
+    @classmethod
+    def of(cls, title, word_bits):
+        """Features of a title, built from the bits of its words; word_bits caches them by word"""
+        key = normalize_title(title)
+        # Titles in one search share most of their words, so a title only
+        # costs an OR per word
+        tokens = trigrams = 0
+        for word in key.split():
+            bits = word_bits.get(word)
+            if bits is None:
+                bits = word_bits[word] = word_features(word)
+            tokens |= bits[0]
+            trigrams |= bits[1]
+        
+        return cls(
+            key=key[4:] if key.startswith("the ") else key,
+            tokens=tokens,
+            token_count=max(tokens.bit_count(), 1),
+            trigrams=trigrams,
+            trigram_count=trigrams.bit_count(),
+            extra=bool(EXTRA_CONTENT_PATTERN.search(title.lower()))
+        )
+
+
+def word_features(word):
+    """A word's token bit and the bitset of its character trigrams"""
+    # Padded so the first and last letters get trigrams of their own; like
+    # pg_trgm, trigrams don't span words
+    padded = f" {word} "
+    trigrams = 0
+    for i in range(len(padded) - 2):
+        trigrams |= 1 << (hash(padded[i:i + 3]) % RELEVANCE_BITS)
+    return 1 << (hash(word) % RELEVANCE_BITS), trigrams
+
+
+class RelevanceRanker:
+    """Scores results against their query for the "relevance" sort.
+    
+    Word and trigram sets are hashed into bitsets (Python ints), so every
+    overlap is one AND and one popcount however long the titles are, and a
+    batch is scored signal by signal in flat passes over its features.
+    Features are cached per title, so repeat titles only cost the scoring,
+    and the bits of a new title are ORed together from those of its words,
+    which are cached too.
+    """
+    
+    def __init__(self, weights=RELEVANCE_WEIGHTS, store_trust=STORE_RANK_TRUST, cache_size=RELEVANCE_FEATURE_CACHE):
+        self.weights = weights
+        self.store_trust = store_trust
+        self.cache_size = cache_size
+        self.cache = OrderedDict()  # title -> TitleFeatures, oldest first
+        self.word_bits = {}  # word -> (token bit, trigram bits), shared by the store threads
+        self.lock = threading.Lock()
+    
+    def features(self, titles):
+        """Features of several titles, computing and caching the ones not seen before"""
+        with self.lock:
+            found = [self.cache.get(title) for title in titles]
+        missing = {title for title, features in zip(titles, found) if features is None}
+        if not missing:
+            return found
+        
+        # Single dict operations are atomic, so the word cache needs no lock;
+        # it's simply started over once full
+        if len(self.word_bits) > RELEVANCE_WORD_CACHE:
+            self.word_bits.clear()
+        computed = {title: TitleFeatures.of(title, self.word_bits) for title in missing}
+        with self.lock:
+            # Oldest titles go first; a search's titles are all looked up again soon anyway
+            self.cache.update(computed)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return [features or computed[title] for title, features in zip(titles, found)]
+    
+    def score(self, query, results, store_id, first_rank=0):
+        """Set the relevance of one store's results, in the store's order from first_rank on"""
+        if not results:
+            return
+        query_features, *titles = self.features([query] + [result.name for result in results])
+        weights = self.weights
+        
+        # Covering the query's words counts twice as much as the title adding none of its own
+        shared_tokens = [(query_features.tokens & title.tokens).bit_count() for title in titles]
+        token_scores = [
+            (2 * shared / query_features.token_count + shared / title.token_count) / 3
+            for shared, title in zip(shared_tokens, titles)
+        ]
+        
+        # Dice coefficient of the trigram sets
+        trigram_total = query_features.trigram_count
+        trigram_scores = [
+            2 * (query_features.trigrams & title.trigrams).bit_count() / ((trigram_total + title.trigram_count) or 1)
+            for title in titles
+        ]
+        
+        key = query_features.key
+        exact = [title.key == key for title in titles]
+        prefix = [bool(key) and title.key.startswith(key) for title in titles]
+        
+        # Stores list their best matches first; later positions fade out
+        trust = self.store_trust.get(store_id, 0.5)
+        rank_scores = [trust / (1 + rank / RESULTS_PAGE_SIZE) for rank in range(first_rank, first_rank + len(results))]
+        
+        # Soundtracks and DLC only rank high when asked for
+        penalties = [RELEVANCE_EXTRA_PENALTY if title.extra and not query_features.extra else 0 for title in titles]
+        
+        signals = zip(results, token_scores, trigram_scores, exact, prefix, rank_scores, penalties)
+        for result, tokens, trigrams, is_exact, is_prefix, rank, penalty in signals:
+            result.relevance = (
+                weights['tokens'] * tokens
+                + weights['trigrams'] * trigrams
+                + weights['exact'] * is_exact
+                + weights['prefix'] * is_prefix
+                + weights['rank'] * rank
+                - penalty
+            )
+
+
+class ResponseCache:
+    """SQLite cache of HTTP response bodies with TTLs and LRU eviction"""
+    
+    def __init__(self, path=RESPONSE_CACHE_PATH, max_bytes=RESPONSE_CACHE_MAX_BYTES):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        # url -> access time of hits not written yet, so a hit is only a read
+        self.accessed = {}
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "url TEXT PRIMARY KEY, body BLOB, etag TEXT, last_modified TEXT, "
+            "fetched_at REAL, accessed_at REAL, size INTEGER)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (accessed_at)")
+        self.conn.commit()
+    
+    def ttl_for(self, url):
+        """Freshness lifetime for a URL"""
+        for path, ttl in RESPONSE_TTLS.items():
+            if path in url:
+                return ttl
+        return DEFAULT_RESPONSE_TTL
+    
+    def get(self, url):
+        """Return (body, etag, last_modified, age) for a URL, or None"""
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT body, etag, last_modified, fetched_at FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self.accessed[url] = now
+            if len(self.accessed) >= RESPONSE_CACHE_ACCESS_BATCH:
+                self.write_accessed()
+                self.conn.commit()
+        body, etag, last_modified, fetched_at = row
+        return body, etag, last_modified, now - fetched_at
+    
+    def put(self, url, body, etag=None, last_modified=None):
+        """Store a response body, evicting least recently used entries if over the cap"""
+        now = time.time()
+        with self.lock:
+            self.accessed.pop(url, None)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, body, etag, last_modified, now, now, len(body))
+            )
+            # Eviction goes by access time, so the held back ones go in first
+            self.write_accessed()
+            self.evict()
+            self.conn.commit()
+    
+    def touch(self, url):
+        """Mark a cached response fresh again after a 304 Not Modified"""
+        with self.lock:
+            self.conn.execute("UPDATE responses SET fetched_at = ? WHERE url = ?", (time.time(), url))
+            self.conn.commit()
+    
+    def write_accessed(self):
+        """Write the access times held in memory (caller holds the lock and commits)"""
+        if self.accessed:
+            self.conn.executemany(
+                "UPDATE responses SET accessed_at = ? WHERE url = ?",
+                [(accessed_at, url) for url, accessed_at in self.accessed.items()]
+            )
+            self.accessed.clear()
+    
+    def evict(self):
+        """Drop least recently used entries until the cache fits max_bytes"""
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        
+        stale = []
+        for url, size in self.conn.execute("SELECT url, size FROM responses ORDER BY accessed_at"):
+            if total <= self.max_bytes:
+                break
+            stale.append((url,))
+            total -= size
+        self.conn.executemany("DELETE FROM responses WHERE url = ?", stale)
+
+
+class ResultCache:
+    """Bounded LRU of per-store result lists keyed by (query, store, region).
+    
+    Each entry holds the pages fetched so far, the cursor of the next page
+    (None once the store has no more results) and when its first page was
+    stored; entries older than ttl seconds are dropped when looked up.
+    """
+    
+    def __init__(self, max_entries=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def key(query, store_id, region):
+        """Cache key for a query, ignoring case and extra whitespace"""
+        return (" ".join(query.lower().split()), store_id, region)
+    
+    def lookup(self, key):
+        """The entry for a key, or None if there is none or it expired (caller holds the lock)"""
+        entry = self.entries.get(key)
+        if entry is not None and time.monotonic() - entry[2] > self.ttl:
+            del self.entries[key]
+            return None
+        return entry
+    
+    def get(self, query, store_id, region):
+        """Return a copy of the cached results, or None on a miss"""
+        key = self.key(query, store_id, region)
+        with self.lock:
+            entry = self.lookup(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return list(entry[0])
+    
+    def put(self, query, store_id, region, results, cursor=None):
+        """Remember a store's first page of results, evicting the least recently used entry"""
+        key = self.key(query, store_id, region)
+        with self.lock:
+            self.entries[key] = (list(results), cursor, time.monotonic())
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+    
+    def extend(self, query, store_id, region, results, cursor=None):
+        """Append a further page to a store's cached results; the entry keeps its first page's age"""
+        key = self.key(query, store_id, region)
+        with self.lock:
+            entry = self.lookup(key)
+            if entry is not None:
+                self.entries[key] = (entry[0] + list(results), cursor, entry[2])
+    
+    def count(self, query, store_id, region):
+        """Results cached so far for a store and query, without counting a hit"""
+        with self.lock:
+            entry = self.lookup(self.key(query, store_id, region))
+            return len(entry[0]) if entry else 0
+    
+    def next_cursor(self, query, store_id, region):
+        """Cursor of the store's next page for a query, or None if there is none"""
+        with self.lock:
+            entry = self.lookup(self.key(query, store_id, region))
+            return entry[1] if entry else None
+    
+    def summary(self):
+        """Hit/miss counters for display"""
+        return f"Cache: {self.hits} hits / {self.misses} misses"
+
+
+class HttpClient:
+    """Shared pooled HTTP session used by every store search"""
+    
+    def __init__(self, pool_sizes=None, retries=HTTP_RETRIES, backoff=HTTP_BACKOFF, cache=None):
+        self.cache = cache
+        self.revalidating = set()
+        self.revalidating_lock = threading.Lock()
+        
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=HTTP_RETRY_STATUSES,
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            raise_on_status=False
+        )
+        
+        self.session = requests.Session()
+        self.session.headers.update({
+            'Accept-Encoding': ACCEPT_ENCODING,
+            'User-Agent': 'Gamerr/1.0'
+        })
+        
+        # One adapter per store host so each gets its own pool size
+        for host, size in (pool_sizes or HOST_POOL_SIZES).items():
+            adapter = TimedHTTPAdapter(pool_connections=1, pool_maxsize=size, max_retries=retry)
+            self.session.mount(f"https://{host}/", adapter)
+        
+        default_adapter = TimedHTTPAdapter(pool_maxsize=DEFAULT_POOL_SIZE, max_retries=retry)
+        self.session.mount("https://", default_adapter)
+        self.session.mount("http://", default_adapter)
+    
+    def get(self, url, timeout=10, **kwargs):
+        """GET a URL over a pooled keep-alive connection"""
+        return self.session.get(url, timeout=timeout, **kwargs)
+    
+    def get_json(self, url, timeout=10, limiter=None, max_age=None, store='all', decoder=None):
+        """GET a JSON document, answering from the response cache when possible.
+        
+        limiter, if given, is a context manager factory entered around each
+        network request (not cache hits), e.g. a store's rate limit. A cached
+        copy older than max_age is revalidated before returning instead of
+        in the background. Stage timings are recorded under store. decoder
+        replaces json.loads for bodies that aren't JSON, e.g. HTML pages.
+        """
+        entry = self.cache.get(url) if self.cache else None
+        if entry is None:
+            return self.fetch_json(url, timeout, limiter=limiter, store=store, decoder=decoder)
+        
+        body, etag, last_modified, age = entry
+        ttl = self.cache.ttl_for(url)
+        if age > RESPONSE_MAX_STALE or (max_age is not None and age > max_age):
+            try:
+                return (self.fetch_json(url, timeout, etag, last_modified, limiter, store, decoder)
+                        or self.decode(body, store, decoder))
+            except requests.RequestException:
+                # Offline: an old answer beats none
+                return self.decode(body, store, decoder)
+        if age > ttl:
+            self.revalidate_in_background(url, etag, last_modified, timeout, limiter, store, decoder)
+        return self.decode(body, store, decoder)
+    
+    def decode(self, body, store='all', decoder=None):
+        """Parse a body (JSON unless a decoder is given), timing it as the decode stage"""
+        start = time.perf_counter()
+        data = (decoder or json.loads)(body)
+        elapsed = time.perf_counter() - start
+        METRICS.observe('decode', elapsed, store)
+        METRICS.add_io(elapsed)
+        return data
+    
+    def fetch_json(self, url, timeout, etag=None, last_modified=None, limiter=None, store='all', decoder=None):
+        """Fetch JSON from the network, revalidating a cached copy if given its validators"""
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        
+        queued = time.perf_counter()
+        try:
+            with limiter() if limiter else nullcontext():
+                sent = time.perf_counter()
+                METRICS.take_connect()
+                response = self.get(url, timeout=timeout, headers=headers)
+                received = time.perf_counter()
+                if response.status_code in HTTP_RETRY_STATUSES:
+                    # Still failing after the retries; let the limiter count it
+                    response.raise_for_status()
+        finally:
+            METRICS.add_io(time.perf_counter() - queued)
+        
+        # Connection setup happens inside the request; report it separately
+        connect = METRICS.take_connect()
+        METRICS.observe('queue', sent - queued, store)
+        if connect:
+            METRICS.observe('connect', connect, store)
+        METRICS.observe('request', received - sent - connect, store)
+        
+        if response.status_code == 304 and self.cache:
+            self.cache.touch(url)
+            return None
+        # Error pages are neither parsed nor cached
+        response.raise_for_status()
+        
+        data = self.decode(response.content, store, decoder)
+        if response.status_code == 200 and self.cache:
+            self.cache.put(
+                url,
+                response.content,
+                response.headers.get('ETag'),
+                response.headers.get('Last-Modified')
+            )
+        return data
+    
+    def revalidate_in_background(self, url, etag, last_modified, timeout, limiter=None, store='all', decoder=None):
+        """Refresh a stale cache entry on a background thread"""
+        with self.revalidating_lock:
+            if url in self.revalidating:
+                return
+            self.revalidating.add(url)
+        
+        def revalidate():
+            try:
+                self.fetch_json(url, timeout, etag, last_modified, limiter, store, decoder)
+            except Exception as e:
+                print(f"Cache revalidation error for {url}: {e}")
+            finally:
+                with self.revalidating_lock:
+                    self.revalidating.discard(url)
+        threading.Thread(target=revalidate, daemon=True).start()
+    
+    def stats(self):
+        """Requests sent, connections opened and connections reused per host"""
+        stats = {}
+        adapters = {id(adapter): adapter for adapter in self.session.adapters.values()}
+        for adapter in adapters.values():
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                entry = stats.setdefault(pool.host, {'requests': 0, 'connections': 0})
+                entry['requests'] += pool.num_requests
+                entry['connections'] += pool.num_connections
+        
+        for entry in stats.values():
+            entry['reused'] = max(entry['requests'] - entry['connections'], 0)
+        return stats
+    
+    def summary(self):
+        """One-line summary of connection reuse across all hosts"""
+        stats = self.stats().values()
+        requests_sent = sum(entry['requests'] for entry in stats)
+        reused = sum(entry['reused'] for entry in stats)
+        if not requests_sent:
+            return "No requests yet"
+        return f"{requests_sent} requests • {reused * 100 // requests_sent}% on reused connections"
+
+
+def apply_filters(results, free=False, on_sale=False, max_price=None):
+    """Keep the results passing the free / on-sale / max-price (dollars) filters"""
+    filtered = list(results)
+    
+    # Free games filter
+    if free:
+        filtered = [r for r in filtered if r.is_free]
+    
+    # On sale filter
+    if on_sale:
+        filtered = [r for r in filtered if r.discount > 0]
+    
+    # Max price filter
+    if max_price is not None:
+        max_cents = round(max_price * 100)
+        filtered = [r for r in filtered if r.price_cents <= max_cents]
+    
+    return filtered
+
+
+def apply_filters_to_groups(groups, free=False, on_sale=False, max_price=None):
+    """Filter each group's offers, dropping emptied groups.
+    
+    Returns (groups, trimmed); trimmed is True if some group lost offers,
+    which may change its cheapest offer and so its sort position.
+    """
+    if not (free or on_sale or max_price is not None):
+        return list(groups), False
+    
+    filtered = []
+    trimmed = False
+    for group in groups:
+        offers = apply_filters(group.offers, free, on_sale, max_price)
+        if len(offers) == len(group.offers):
+            filtered.append(group)
+        elif offers:
+            filtered.append(group.subset(offers))
+            trimmed = True
+    return filtered, trimmed
+
+
+def sort_key(sort_by):
+    """Return (key, reverse) for a sort option, or None to keep arrival order"""
+    if sort_by == "price_asc":
+        return attrgetter('price_cents'), False
+    elif sort_by == "price_desc":
+        return attrgetter('price_cents'), True
+    elif sort_by == "name_asc":
+        return (lambda x: x.name.lower()), False
+    elif sort_by == "discount":
+        return attrgetter('discount'), True
+    elif sort_by == "relevance":
+        return attrgetter('relevance'), True
+    else:
+        return None
+
+
+def sort_results(results, sort_by):
+    """Sort results (or groups) by a sort option"""
+    order = sort_key(sort_by)
+    if order is None:
+        return list(results)
+    key, reverse = order
+    return sorted(results, key=key, reverse=reverse)
+
+
+def format_store_status(store_status, stores=STORES):
+    """Describe stores that are still pending, timed out or failed"""
+    parts = []
+    for label in ('pending', 'timed out', 'degraded', 'error'):
+        names = [stores[store_id]['name'] for store_id, status in store_status.items() if status == label]
+        if names:
+            parts.append(f"{label.capitalize()}: {', '.join(names)}")
+    return " • ".join(parts)
+
+
+class StoreUnavailable(requests.RequestException):
+    """A store request was refused locally by its rate limiter or circuit breaker"""
+
+
+class SearchCancelled(requests.RequestException):
+    """A request was dropped because the search it belonged to was cancelled"""
+
+
+class CancelToken:
+    """Lets the caller of SearchEngine.search abandon it from another thread"""
+    
+    def __init__(self):
+        # Completed on cancel so a waiting search wakes up at once
+        self.future = Future()
+    
+    def cancel(self):
+        try:
+            self.future.set_result(None)
+        except InvalidStateError:
+            pass
+    
+    @property
+    def cancelled(self):
+        return self.future.done()
+
+
+class TokenBucket:
+    """Token-bucket rate limiter: rate tokens per second, bursts up to capacity"""
+    
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self, max_wait=None):
+        """Take a token, sleeping until it is due; False if that's longer than max_wait"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            
+            # Reserve the token now; a negative balance is the queue ahead of us
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+            if max_wait is not None and wait > max_wait:
+                self.tokens += 1
+                return False
+        
+        if wait:
+            time.sleep(wait)
+        return True
+
+
+class CircuitBreaker:
+    """Stops calling a failing store.
+    
+    Opens after threshold consecutive failures; once cooldown has passed it
+    goes half-open and lets a single probe through, which closes it again on
+    success or reopens it on failure.
+    """
+    
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self.lock = threading.Lock()
+    
+    def available(self):
+        """Whether a request could go through now, without claiming the probe"""
+        with self.lock:
+            if self.state == 'open':
+                return time.monotonic() - self.opened_at >= self.cooldown
+            return self.state == 'closed'
+    
+    def allow(self):
+        """Claim permission for one request; in half-open state only the probe gets it"""
+        with self.lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = 'half-open'
+                return True
+            return False
+    
+    def record_success(self):
+        with self.lock:
+            self.state = 'closed'
+            self.failures = 0
+    
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == 'half-open' or self.failures >= self.threshold:
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+
+
+@dataclass(frozen=True)
+class CatalogCursor:
+    """Page cursor of a store matched through the local catalog: offset into its matches"""
+    offset: int
+
+
+class StoreAdapter:
+    """Base class for one store's search adapter.
+    
+    Subclasses set store_id, implement search() and declare what their store
+    allows; the engine holds each store to its own limits instead of
+    treating them all alike.
+    """
+    store_id = None
+    batch_lookup = False  # can look up many games in one request
+    max_concurrency = 2  # requests in flight at once
+    rate_limit = None  # requests per second, None for no limit
+    regions = None  # supported country codes, None for any
+    regional_pricing = False  # can price known results in any region
+    page_size = RESULTS_PAGE_SIZE  # results per page of a search
+    timeout = 10
+    api_hosts = {}  # API name -> base URL
+    
+    def __init__(self, engine):
+        self.engine = engine
+        self.http = engine.http
+        self.store = engine.stores[self.store_id]
+        self.slots = threading.BoundedSemaphore(self.max_concurrency)
+        self.background_slots = threading.BoundedSemaphore(BACKGROUND_CONCURRENCY)
+        if self.rate_limit:
+            self.bucket = TokenBucket(self.rate_limit * (1 - BACKGROUND_RATE_SHARE), self.max_concurrency)
+            self.background_bucket = TokenBucket(self.rate_limit * BACKGROUND_RATE_SHARE, 1)
+        else:
+            self.bucket = self.background_bucket = None
+        self.breaker = CircuitBreaker()
+    
+    def api_url(self, api, path):
+        """URL of a path on one of the store's APIs, or on the engine's stand-in for the store"""
+        return self.engine.api_bases.get(self.store_id, self.api_hosts[api]) + path
+    
+    def region_for(self, region):
+        """The region to query: the one asked for if supported, else the store's default"""
+        if self.regions is None or region in self.regions:
+            return region
+        return self.regions[0]
+    
+    @contextmanager
+    def limited(self):
+        """Guard one network request with the store's slots, rate limit and breaker"""
+        # Background lookups wait on their own budget, never on a search's
+        if getattr(self.engine.local, 'background', False):
+            slots, bucket = self.background_slots, self.background_bucket
+        else:
+            slots, bucket = self.slots, self.bucket
+        with slots:
+            if bucket and not bucket.acquire(max_wait=RATE_LIMIT_MAX_WAIT):
+                raise StoreUnavailable(f"{self.store['name']} rate limit reached")
+            # Requests still queued for a cancelled search never go out
+            if self.engine.search_cancelled():
+                raise SearchCancelled(f"{self.store['name']} search cancelled")
+            if not self.breaker.allow():
+                raise StoreUnavailable(f"{self.store['name']} is temporarily unavailable")
+            
+            try:
+                yield
+            except requests.RequestException:
+                METRICS.count('request_error', self.store_id)
+                self.breaker.record_failure()
+                raise
+            self.breaker.record_success()
+    
+    def get_json(self, url, timeout=None, decoder=None):
+        """GET JSON (or a body decoder understands) through the shared client within this store's limits"""
+        max_age = getattr(self.engine.local, 'max_age', None)
+        return self.http.get_json(
+            url,
+            timeout=timeout or self.timeout,
+            limiter=self.limited,
+            max_age=max_age,
+            store=self.store_id,
+            decoder=decoder
+        )
+    
+    def search(self, query, region):
+        """Return a list of GameResult for a query"""
+        raise NotImplementedError
+    
+    def search_page(self, query, region, cursor=None):
+        """One page of results as (results, next cursor); cursor None is the first page.
+        
+        Stores that can return more results override this; the rest answer in a
+        single page.
+        """
+        if cursor is not None:
+            return [], None
+        return self.search(query, region), None
+    
+    def price_entries(self, entries, region):
+        """Price local catalog entries as GameResults; None if the store can't, so it's searched instead"""
+        return None
+    
+    def regional_prices(self, results, region):
+        """Prices of this store's results in another region as {app_id: RegionalPrice}"""
+        return {}
+    
+    def load_details(self, game, on_loaded):
+        """Fetch fields a result left out and call on_loaded(data); most stores have none"""
+    
+    def apply_details(self, game, data):
+        """Copy data from load_details into a result"""
+    
+    @staticmethod
+    def parse_cents(amount):
+        """Convert a decimal price such as "19.99" to integer cents"""
+        return round(float(amount) * 100)
+
+
+class SearchEngine:
+    """Searches the stores in parallel and keeps the caches shared between searches"""
+    
+    def __init__(self, region="US", http=None, disk_cache=True, catalog=None, history=None, api_bases=None,
+                 compare_regions=(), rates=None, currency='USD'):
+        self.region = region
+        self.stores = {store_id: dict(store) for store_id, store in STORES.items()}
+        self.result_cache = ResultCache()
+        
+        # Shared HTTP connection pool for all stores
+        self.http = http or HttpClient(cache=ResponseCache() if disk_cache else None)
+        
+        # Store adapters, created on first use, and base URLs replacing a
+        # store's API hosts (e.g. a local stand-in server for benchmarks)
+        self.api_bases = api_bases or {}
+        self.adapters = {}
+        self.adapters_lock = threading.Lock()
+        
+        # Per-thread request context: the cancel token of the search a worker
+        # is running, and the oldest cached response it will accept (max_age)
+        self.local = threading.local()
+        
+        # Optional local title catalog (gamerr_catalog.Catalog); stores it
+        # covers are matched offline and only their prices fetched
+        self.catalog = catalog
+        self.catalog_stores = catalog.stores() if catalog else set()
+        
+        # Optional price history (gamerr_history.PriceHistory) fed with every
+        # price fetched from a store
+        self.history = history
+        
+        # Regions whose prices compare_prices() looks up next to this one's,
+        # converted to the display currency with the optional rate table
+        # (gamerr_rates.ExchangeRates)
+        self.compare_regions = [r for r in compare_regions if r != region]
+        self.rates = rates
+        self.currency = currency
+        self.region_executor = ThreadPoolExecutor(max_workers=REGION_LOOKUP_WORKERS)
+        
+        # Scores every result against its query as it arrives, for the relevance sort
+        self.ranker = RelevanceRanker()
+    
+    def adapter(self, store_id):
+        """The store's adapter, importing its module the first time"""
+        with self.adapters_lock:
+            adapter = self.adapters.get(store_id)
+            if adapter is None:
+                module_name, class_name = STORE_ADAPTERS[store_id].split(":")
+                adapter_class = getattr(importlib.import_module(module_name), class_name)
+                adapter = self.adapters[store_id] = adapter_class(self)
+            return adapter
+    
+    def store_health(self):
+        """Breaker state of each loaded store: 'closed', 'open' or 'half-open'"""
+        with self.adapters_lock:
+            adapters = dict(self.adapters)
+        return {store_id: adapter.breaker.state for store_id, adapter in adapters.items()}
+    
+    def search_cancelled(self):
+        """Whether the search running on this thread has been cancelled"""
+        cancel = getattr(self.local, 'cancel', None)
+        return cancel is not None and cancel.cancelled
+    
+    def search_store(self, store_id, query, cancel=None, cursor=None):
+        """Search one page of one store in the engine's region, timing the adapter's own work as normalize.
+        
+        Returns (results, next cursor), with each result's relevance set.
+        """
+        self.local.cancel = cancel
+        start = time.perf_counter()
+        io_before = METRICS.io_time()
+        try:
+            results, next_cursor = self.query_store(store_id, query, cursor)
+            # Later pages continue the store's ranking where the cached ones end
+            first_rank = self.result_cache.count(query, store_id, self.region) if cursor is not None else 0
+            self.ranker.score(query, results, store_id, first_rank)
+            return results, next_cursor
+        finally:
+            elapsed = time.perf_counter() - start - (METRICS.io_time() - io_before)
+            METRICS.observe('normalize', max(elapsed, 0), store_id)
+    
+    def query_store(self, store_id, query, cursor=None):
+        """A page of results from the local catalog and prices, or from a store search"""
+        adapter = self.adapter(store_id)
+        region = adapter.region_for(self.region)
+        
+        # Stores the catalog covers page through its matches instead
+        if store_id in self.catalog_stores and (cursor is None or isinstance(cursor, CatalogCursor)):
+            offset = cursor.offset if cursor else 0
+            entries = self.catalog.search(query, [store_id], CATALOG_SEARCH_LIMIT, offset)
+            if entries:
+                results = adapter.price_entries(entries, region)
+                if results is not None:
+                    more = len(entries) == CATALOG_SEARCH_LIMIT
+                    return results, CatalogCursor(offset + len(entries)) if more else None
+            elif cursor is not None:
+                return [], None
+        return adapter.search_page(query, region, cursor)
+    
+    def search(self, query, store_ids, on_results=None, deadline=SEARCH_DEADLINE, cancel=None):
+        """Query stores in parallel under one deadline.
+        
+        on_results(batch, store_status) is called on this thread with the
+        cached results first and then with each store's results as it
+        answers. Returns (results, store_status); store_status maps each
+        store to 'done', 'error', 'timed out', 'degraded' (skipped or cut
+        short by its circuit breaker) or 'cancelled'.
+        
+        Cancelling the token returns at once: stores still running are
+        abandoned, their queued requests are refused and on_results is not
+        called again.
+        
+        Only each store's first page is fetched; search_more() gets the next.
+        """
+        # Stores searched recently for this query are answered from memory,
+        # and stores whose breaker is open are skipped without waiting
+        merged = []
+        store_status = {}
+        for store_id in store_ids:
+            cached = self.result_cache.get(query, store_id, self.region)
+            if cached is not None:
+                merged.extend(cached)
+                store_status[store_id] = 'done'
+                METRICS.count('cache_hit', store_id)
+            elif not self.adapter(store_id).breaker.available():
+                store_status[store_id] = 'degraded'
+                METRICS.count('degraded', store_id)
+            else:
+                store_status[store_id] = 'pending'
+        
+        if on_results:
+            on_results(list(merged), dict(store_status))
+        
+        pending = {store_id: None for store_id, status in store_status.items() if status == 'pending'}
+        return self.gather(query, pending, merged, store_status, on_results, deadline, cancel)
+    
+    def search_more(self, query, store_ids, on_results=None, deadline=SEARCH_DEADLINE, cancel=None):
+        """Fetch the next page of each store that has more results for a query.
+        
+        Works like search(), for stores search() has already answered;
+        on_results gets only the new page's results.
+        """
+        cursors = {}
+        store_status = {}
+        for store_id in store_ids:
+            cursor = self.result_cache.next_cursor(query, store_id, self.region)
+            if cursor is None:
+                continue
+            if self.adapter(store_id).breaker.available():
+                cursors[store_id] = cursor
+                store_status[store_id] = 'pending'
+            else:
+                store_status[store_id] = 'degraded'
+                METRICS.count('degraded', store_id)
+        return self.gather(query, cursors, [], store_status, on_results, deadline, cancel)
+    
+    def has_more(self, query, store_ids):
+        """Whether any of the stores has another page of results for a query"""
+        return any(self.result_cache.next_cursor(query, store_id, self.region) is not None for store_id in store_ids)
+    
+    def gather(self, query, cursors, merged, store_status, on_results, deadline, cancel):
+        """Fetch one page from each store in cursors ({store_id: cursor}) under one deadline"""
+        # Each store's own concurrency and rate limits are applied per request
+        # by its adapter, so every store can be searched at once here
+        executor = ThreadPoolExecutor(max_workers=max(len(cursors), 1))
+        futures = {
+            executor.submit(self.search_store, store_id, query, cancel, cursor): (store_id, cursor)
+            for store_id, cursor in cursors.items()
+        }
+        
+        remaining = set(futures)
+        stop = time.monotonic() + deadline
+        try:
+            while remaining:
+                watched = remaining | {cancel.future} if cancel else remaining
+                done, _ = wait(watched, timeout=max(stop - time.monotonic(), 0), return_when=FIRST_COMPLETED)
+                if not done or (cancel and cancel.cancelled):
+                    break
+                
+                for future in done:
+                    store_id, cursor = futures[future]
+                    remaining.discard(future)
+                    results = []
+                    try:
+                        results, next_cursor = future.result()
+                        store_status[store_id] = 'degraded' if self.adapter(store_id).breaker.state == 'open' else 'done'
+                        # Empty first pages may just be a swallowed error, so don't keep them
+                        if cursor is not None:
+                            self.result_cache.extend(query, store_id, self.region, results, next_cursor)
+                        elif results:
+                            self.result_cache.put(query, store_id, self.region, results, next_cursor)
+                        if results and self.history:
+                            self.history.record(results, self.region)
+                            # Looked up here so showing a result never queries the database
+                            for game in results:
+                                game.price_stats = self.price_stats(game)
+                    except Exception as e:
+                        print(f"Error searching {store_id}: {e}")
+                        store_status[store_id] = 'error'
+                        METRICS.count('error', store_id)
+                    
+                    # Hand over what we have without waiting for slower stores
+                    merged.extend(results)
+                    if on_results and not (cancel and cancel.cancelled):
+                        on_results(results, dict(store_status))
+        finally:
+            # Don't wait for stragglers; their results are dropped
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        stale = 'cancelled' if cancel and cancel.cancelled else 'timed out'
+        for store_id, status in store_status.items():
+            if status == 'pending':
+                store_status[store_id] = stale
+                METRICS.count(stale.replace(' ', '_'), store_id)
+                if stale == 'timed out':
+                    print(f"Timed out searching {store_id}")
+        
+        return merged, store_status
+    
+    def compare_prices(self, results, on_done=None, cancel=None, background=True):
+        """Look up results' prices in the comparison regions in the background.
+        
+        Every store and region is queried at once through the shared client,
+        within each store's background budget (or its search budget if not
+        background); only prices are fetched, the rest of each result is
+        reused. Cancelling the token (that of the search the results belong
+        to) drops the lookups not yet sent. Regions a lookup failed in are
+        noted in each result's regional_errors. Returns the lookup futures;
+        on_done(results) runs on a worker thread once they have all finished.
+        """
+        by_store = {}
+        for result in results:
+            # Free games are free everywhere
+            if not result.is_free and result.app_id is not None:
+                by_store.setdefault(result.store_id, []).append(result)
+        
+        futures = []
+        for store_id, store_results in by_store.items():
+            adapter = self.adapter(store_id)
+            if not adapter.regional_pricing:
+                continue
+            # Filled in by one lookup thread per region
+            for result in store_results:
+                if result.regional is None:
+                    result.regional = {}
+                if result.regional_errors is None:
+                    result.regional_errors = {}
+            for region in self.compare_regions:
+                missing = [result for result in store_results if region not in result.regional]
+                if missing:
+                    futures.append(
+                        self.region_executor.submit(self.price_region, adapter, missing, region, cancel, background)
+                    )
+        
+        if on_done and futures:
+            remaining = [len(futures)]
+            lock = threading.Lock()
+            
+            def finished(_):
+                with lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last:
+                    on_done(results)
+            for future in futures:
+                future.add_done_callback(finished)
+        return futures
+    
+    def price_region(self, adapter, results, region, cancel=None, background=True):
+        """Fill in the results' prices in one region, or why they're missing"""
+        self.local.cancel = cancel
+        self.local.background = background
+        try:
+            prices = adapter.regional_prices(results, region)
+        except SearchCancelled:
+            self.note_regional_error(results, region, "cancelled")
+            return
+        except Exception as e:
+            # Refused by the store's budget or breaker, or failed
+            print(f"Regional price error for {adapter.store_id} in {region}: {e}")
+            self.note_regional_error(results, region, str(e))
+            return
+        
+        for result in results:
+            price = prices.get(result.app_id)
+            if price is None:
+                self.note_regional_error([result], region, "not sold there")
+                continue
+            if self.rates:
+                price.converted_cents = self.rates.convert(price.price_cents, price.currency, self.currency)
+            result.regional[region] = price
+            result.regional_errors.pop(region, None)
+    
+    @staticmethod
+    def note_regional_error(results, region, reason):
+        """Record why results have no price in a region"""
+        for result in results:
+            result.regional_errors[region] = reason
+    
+    def cheapest_region(self, game):
+        """The comparison region where a result is cheaper than here after conversion, or None"""
+        if not game.regional or not self.rates:
+            return None
+        home = self.rates.convert(game.price_cents, game.currency, self.currency)
+        if home is None:
+            return None
+        converted = [(price.converted_cents, region) for region, price in game.regional.items()
+                     if price.converted_cents is not None]
+        if not converted:
+            return None
+        cents, region = min(converted)
+        return region if cents < home else None
+    
+    def price_stats(self, game):
+        """Price history summary of a result (gamerr_history.PriceStats), or None"""
+        return self.history.stats(game, self.region) if self.history else None
+    
+    def load_details(self, game, on_loaded):
+        """Fetch a result's lazily loaded fields; on_loaded(data) runs on a worker thread"""
+        self.adapter(game.store_id).load_details(game, on_loaded)
+    
+    def apply_details(self, game, data):
+        """Copy lazily loaded fields into a result"""
+        self.adapter(game.store_id).apply_details(game, data)
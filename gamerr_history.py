@@ -0,0 +1,212 @@
+"""Price history of every result seen, kept small by downsampling.
+
+Each (store, game, region) is a series. Observations go into a raw table and
+are folded into daily aggregates as they're written; raw rows older than a
+week are dropped and daily rows older than half a year are rolled up into
+weekly ones, so a series grows by about one row a week however often it's
+searched. The all-time low is kept per series for constant-time lookups.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+from gamerr_engine import CACHE_DIR
+
+# History database location
+HISTORY_PATH = os.path.join(CACHE_DIR, "history.sqlite3")
+
+# An unchanged price is recorded again at most this often (seconds)
+HISTORY_MIN_INTERVAL = 3600
+
+# Retention of raw observations and of daily aggregates (days); weekly
+# aggregates are kept forever
+RAW_RETENTION_DAYS = 7
+DAILY_RETENTION_DAYS = 180
+
+# Observations written between two compactions
+HISTORY_COMPACT_EVERY = 5000
+
+DAY = 86400
+WEEK = 7 * DAY
+
+
+class PriceStats:
+    """Summary of a series: all-time low and the last 30 days' min and average, in cents"""
+    __slots__ = ('low_cents', 'low_at', 'min_30_cents', 'avg_30_cents', 'days', 'observations', 'first_day',
+                 'last_at')
+    
+    def __init__(self, low_cents, low_at, min_30_cents, avg_30_cents, days, observations, first_day, last_at):
+        self.low_cents = low_cents
+        self.low_at = low_at
+        self.min_30_cents = min_30_cents
+        self.avg_30_cents = avg_30_cents
+        self.days = days  # days with observations in the last 30
+        self.observations = observations
+        self.first_day = first_day  # start of the first day (or week) with an observation
+        self.last_at = last_at
+    
+    def has_history(self):
+        """Whether there's more to the series than its first sighting: two or more prices on different days"""
+        return self.observations >= 2 and self.last_at - self.last_at % DAY > self.first_day
+
+
+def series_key(game):
+    """Stable id of a result within its store"""
+    return str(game.app_id) if game.app_id else game.url or game.name
+
+
+class PriceHistory:
+    """SQLite store of price observations with daily and weekly rollups"""
+    
+    def __init__(self, path=HISTORY_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS series (
+                id INTEGER PRIMARY KEY, store TEXT, key TEXT, region TEXT,
+                low INTEGER, low_at INTEGER, last INTEGER, last_at INTEGER,
+                UNIQUE (store, key, region));
+            CREATE TABLE IF NOT EXISTS raw (
+                series INTEGER, at INTEGER, price INTEGER,
+                PRIMARY KEY (series, at)) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS daily (
+                series INTEGER, day INTEGER, low INTEGER, high INTEGER, total INTEGER, count INTEGER,
+                PRIMARY KEY (series, day)) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS weekly (
+                series INTEGER, week INTEGER, low INTEGER, high INTEGER, total INTEGER, count INTEGER,
+                PRIMARY KEY (series, week)) WITHOUT ROWID;
+        """)
+        self.conn.commit()
+        
+        # Series ids and their last observation, so repeats skip the database
+        self.series = {}
+        self.written = 0
+        self.compact()
+    
+    def series_id(self, store_id, key, region):
+        """Id and (last price, last time) of a series, creating it if needed"""
+        ident = (store_id, key, region)
+        entry = self.series.get(ident)
+        if entry is None:
+            row = self.conn.execute(
+                "SELECT id, last, last_at FROM series WHERE store = ? AND key = ? AND region = ?", ident
+            ).fetchone()
+            if row is None:
+                cursor = self.conn.execute(
+                    "INSERT INTO series (store, key, region) VALUES (?, ?, ?)", ident
+                )
+                row = (cursor.lastrowid, None, None)
+            entry = self.series[ident] = list(row)
+        return entry
+    
+    def record(self, results, region, now=None):
+        """Append the prices of a batch of results; return how many were written"""
+        now = int(now or time.time())
+        day = now - now % DAY
+        written = 0
+        with self.lock:
+            for game in results:
+                # Subscription offers have no price to follow
+                if game.included_with:
+                    continue
+                entry = self.series_id(game.store_id, series_key(game), region)
+                series, last, last_at = entry
+                price = game.price_cents
+                
+                # Unchanged prices seen again soon add nothing
+                if price == last and last_at and now - last_at < HISTORY_MIN_INTERVAL:
+                    continue
+                entry[1:] = [price, now]
+                written += 1
+                
+                self.conn.execute("INSERT OR REPLACE INTO raw VALUES (?, ?, ?)", (series, now, price))
+                self.conn.execute(
+                    "INSERT INTO daily VALUES (?, ?, ?, ?, ?, 1) "
+                    "ON CONFLICT (series, day) DO UPDATE SET "
+                    "low = min(low, excluded.low), high = max(high, excluded.high), "
+                    "total = total + excluded.total, count = count + 1",
+                    (series, day, price, price, price)
+                )
+                self.conn.execute(
+                    "UPDATE series SET last = ?, last_at = ?, "
+                    "low_at = CASE WHEN low IS NULL OR ? < low THEN ? ELSE low_at END, "
+                    "low = CASE WHEN low IS NULL OR ? < low THEN ? ELSE low END "
+                    "WHERE id = ?",
+                    (price, now, price, now, price, price, series)
+                )
+            self.conn.commit()
+            
+            self.written += written
+            compact = self.written >= HISTORY_COMPACT_EVERY
+        if compact:
+            self.compact(now)
+        return written
+    
+    def compact(self, now=None):
+        """Drop expired raw rows and roll old daily aggregates into weekly ones"""
+        now = int(now or time.time())
+        raw_cutoff = now - RAW_RETENTION_DAYS * DAY
+        daily_cutoff = now - now % DAY - DAILY_RETENTION_DAYS * DAY
+        with self.lock:
+            # Raw rows are already counted in their day's aggregate
+            self.conn.execute("DELETE FROM raw WHERE at < ?", (raw_cutoff,))
+            
+            # Weeks start on the epoch's weekday (Thursday); any fixed start will do
+            self.conn.execute(
+                "INSERT INTO weekly "
+                "SELECT series, day - day % ?, min(low), max(high), sum(total), sum(count) "
+                "FROM daily WHERE day < ? GROUP BY series, day - day % ? "
+                "ON CONFLICT (series, week) DO UPDATE SET "
+                "low = min(low, excluded.low), high = max(high, excluded.high), "
+                "total = total + excluded.total, count = count + excluded.count",
+                (WEEK, daily_cutoff, WEEK)
+            )
+            self.conn.execute("DELETE FROM daily WHERE day < ?", (daily_cutoff,))
+            self.conn.commit()
+            self.written = 0
+    
+    def stats(self, game, region, now=None):
+        """PriceStats for a result, or None if it has no history yet"""
+        now = int(now or time.time())
+        with self.lock:
+            entry = self.series.get((game.store_id, series_key(game), region))
+            if entry is None:
+                row = self.conn.execute(
+                    "SELECT id FROM series WHERE store = ? AND key = ? AND region = ?",
+                    (game.store_id, series_key(game), region)
+                ).fetchone()
+                if row is None:
+                    return None
+                series = row[0]
+            else:
+                series = entry[0]
+            
+            low, low_at, last_at = self.conn.execute(
+                "SELECT low, low_at, last_at FROM series WHERE id = ?", (series,)
+            ).fetchone()
+            min_30, total, count, days = self.conn.execute(
+                "SELECT min(low), sum(total), sum(count), count(*) FROM daily WHERE series = ? AND day >= ?",
+                (series, now - now % DAY - 29 * DAY)
+            ).fetchone()
+            # Every observation is counted in a daily or (once rolled up) weekly row
+            observations, first_day = self.conn.execute(
+                "SELECT sum(count), min(start) FROM ("
+                "SELECT count, day AS start FROM daily WHERE series = ? "
+                "UNION ALL SELECT count, week FROM weekly WHERE series = ?)",
+                (series, series)
+            ).fetchone()
+        if low is None:
+            return None
+        return PriceStats(low, low_at, min_30, round(total / count) if count else None, days, observations or 0,
+                          first_day, last_at)
+    
+    def size(self):
+        """Row counts of the raw, daily and weekly tables"""
+        with self.lock:
+            return {
+                table: self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ('raw', 'daily', 'weekly')
+            }
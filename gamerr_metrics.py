@@ -0,0 +1,241 @@
+"""Per-stage search timings and event counters, with JSON / Prometheus export.
+
+Stages, each timed per store:
+
+    queue      waiting for the store's request slots and rate limit
+    connect    DNS lookup, TCP connect and TLS handshake of new connections
+    request    sending a request and reading the response
+    decode     parsing JSON and HTML bodies, from the network or the response cache
+    normalize  everything else an adapter does to turn responses into results
+    filter     applying the sidebar filters to a store's results
+    sort       merging a store's results into the sorted view
+    render     binding result cards
+
+METRICS is the process-wide registry; serve_metrics() exposes it on a local
+port as /metrics (Prometheus text format) and /metrics.json.
+"""
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+STAGES = ('queue', 'connect', 'request', 'decode', 'normalize', 'filter', 'sort', 'render')
+
+# Histogram bucket upper bounds (seconds)
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Observations per stage behind the live averages in the header
+RECENT_OBSERVATIONS = 50
+
+# Local port of the metrics endpoint
+METRICS_PORT = 9464
+
+
+class StageSeries:
+    """Histogram of one stage for one store, plus its most recent observations"""
+    __slots__ = ('count', 'total', 'buckets', 'recent')
+    
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.buckets = [0] * len(STAGE_BUCKETS)
+        self.recent = deque(maxlen=RECENT_OBSERVATIONS)
+    
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.recent.append(seconds)
+        for i, bound in enumerate(STAGE_BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+
+
+class Metrics:
+    """Thread-safe registry of stage timings and event counts per store"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.series = {}  # (stage, store) -> StageSeries
+        self.events = {}  # (event, store) -> count
+        
+        # Per-thread time spent on the network and decoding, so an adapter's
+        # own work can be told apart from the I/O it waited for
+        self.local = threading.local()
+    
+    def observe(self, stage, seconds, store='all'):
+        with self.lock:
+            series = self.series.get((stage, store))
+            if series is None:
+                series = self.series[(stage, store)] = StageSeries()
+            series.observe(seconds)
+    
+    def count(self, event, store='all'):
+        with self.lock:
+            self.events[(event, store)] = self.events.get((event, store), 0) + 1
+    
+    @contextmanager
+    def timer(self, stage, store='all'):
+        """Time the enclosed block as one observation of a stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start, store)
+    
+    def add_io(self, seconds):
+        """Count seconds of I/O (or waiting on it) against the current thread"""
+        self.local.io = getattr(self.local, 'io', 0.0) + seconds
+    
+    def io_time(self):
+        """I/O seconds counted against the current thread so far"""
+        return getattr(self.local, 'io', 0.0)
+    
+    @contextmanager
+    def io_wait(self):
+        """Count the enclosed block as I/O, e.g. waiting on another thread's request"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_io(time.perf_counter() - start)
+    
+    def add_connect(self, seconds):
+        self.local.connect = getattr(self.local, 'connect', 0.0) + seconds
+    
+    def take_connect(self):
+        """Connection setup time on this thread since the last call"""
+        seconds = getattr(self.local, 'connect', 0.0)
+        self.local.connect = 0.0
+        return seconds
+    
+    def stage_averages(self):
+        """Recent mean seconds per stage, all stores together"""
+        with self.lock:
+            recent = {}
+            for (stage, _), series in self.series.items():
+                recent.setdefault(stage, []).extend(series.recent)
+        return {stage: sum(values) / len(values) for stage, values in recent.items() if values}
+    
+    def summary(self):
+        """One line of recent average stage times for the header"""
+        averages = self.stage_averages()
+        if not averages:
+            return "No timings yet"
+        return " • ".join(
+            f"{stage} {averages[stage] * 1000:.0f} ms" for stage in STAGES if stage in averages
+        )
+    
+    def snapshot(self):
+        """All metrics as a JSON-ready dict"""
+        with self.lock:
+            stages = {}
+            for (stage, store), series in sorted(self.series.items()):
+                stages.setdefault(stage, {})[store] = {
+                    'count': series.count,
+                    'total_seconds': round(series.total, 6),
+                    'mean_ms': round(series.total / series.count * 1000, 3) if series.count else None,
+                    'buckets': dict(zip((str(bound) for bound in STAGE_BUCKETS), series.buckets)),
+                }
+            events = {}
+            for (event, store), count in sorted(self.events.items()):
+                events.setdefault(event, {})[store] = count
+        return {'timestamp': time.time(), 'stages': stages, 'events': events}
+    
+    def prometheus(self):
+        """All metrics in the Prometheus text exposition format"""
+        lines = [
+            "# HELP gamerr_stage_seconds Time spent per search stage and store",
+            "# TYPE gamerr_stage_seconds histogram",
+        ]
+        with self.lock:
+            for (stage, store), series in sorted(self.series.items()):
+                labels = f'stage="{stage}",store="{store}"'
+                cumulative = 0
+                for bound, count in zip(STAGE_BUCKETS, series.buckets):
+                    cumulative += count
+                    lines.append(f'gamerr_stage_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'gamerr_stage_seconds_bucket{{{labels},le="+Inf"}} {series.count}')
+                lines.append(f"gamerr_stage_seconds_sum{{{labels}}} {series.total:.6f}")
+                lines.append(f"gamerr_stage_seconds_count{{{labels}}} {series.count}")
+            
+            lines.append("# HELP gamerr_events_total Search failures and other events per store")
+            lines.append("# TYPE gamerr_events_total counter")
+            for (event, store), count in sorted(self.events.items()):
+                lines.append(f'gamerr_events_total{{event="{event}",store="{store}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
+
+
+class TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            METRICS.add_connect(time.perf_counter() - start)
+
+
+class TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            METRICS.add_connect(time.perf_counter() - start)
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """requests adapter whose connections report their setup time to METRICS"""
+    
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': TimedHTTPConnectionPool,
+            'https': TimedHTTPSConnectionPool,
+        }
+
+
+def serve_metrics(metrics=METRICS, port=METRICS_PORT):
+    """Serve /metrics and /metrics.json on localhost from a daemon thread; return the server"""
+    
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body = metrics.prometheus().encode("utf-8")
+                content_type = "text/plain; version=0.0.4"
+            elif self.path == "/metrics.json":
+                body = json.dumps(metrics.snapshot()).encode("utf-8")
+                content_type = "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            pass
+    
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
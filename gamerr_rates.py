@@ -0,0 +1,166 @@
+"""Exchange rates for comparing prices from several regions in one currency.
+
+The rate table is fetched from a free, keyless API at most once a day and
+kept in ~/.gamerr/rates.json, so conversions keep working offline with the
+last table fetched:
+
+    python gamerr_rates.py refresh
+    python gamerr_rates.py convert 19.99 EUR USD
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+from gamerr_engine import CACHE_DIR, HttpClient
+
+# Rate table location, source (rates per US dollar) and refresh interval (seconds)
+RATES_PATH = os.path.join(CACHE_DIR, "rates.json")
+RATES_URL = "https://open.er-api.com/v6/latest/USD"
+RATES_MAX_AGE = 24 * 3600
+
+# Currency of each store region (country code)
+REGION_CURRENCIES = {
+    'US': 'USD', 'CA': 'CAD', 'MX': 'MXN', 'BR': 'BRL', 'AR': 'ARS', 'CL': 'CLP',
+    'GB': 'GBP', 'DE': 'EUR', 'FR': 'EUR', 'IT': 'EUR', 'ES': 'EUR', 'NL': 'EUR',
+    'PL': 'PLN', 'CH': 'CHF', 'NO': 'NOK', 'SE': 'SEK', 'DK': 'DKK', 'CZ': 'CZK',
+    'TR': 'USD', 'UA': 'UAH', 'KZ': 'KZT', 'IN': 'INR', 'JP': 'JPY', 'KR': 'KRW',
+    'CN': 'CNY', 'HK': 'HKD', 'TW': 'TWD', 'SG': 'SGD', 'ID': 'IDR', 'TH': 'THB',
+    'AU': 'AUD', 'NZ': 'NZD', 'ZA': 'ZAR'
+}
+
+# Symbols written before the amount; other currencies are shown by code
+CURRENCY_SYMBOLS = {
+    'USD': "$", 'EUR': "€", 'GBP': "£", 'JPY': "¥", 'CNY': "¥", 'KRW': "₩",
+    'INR': "₹", 'BRL': "R$", 'PLN': "zł ", 'TRY': "₺", 'UAH': "₴", 'AUD': "A$",
+    'CAD': "C$", 'NZD': "NZ$", 'HKD': "HK$", 'MXN': "Mex$", 'CHF': "CHF "
+}
+
+# Currencies whose prices have no fractional part
+WHOLE_CURRENCIES = {'JPY', 'KRW', 'CLP', 'IDR', 'KZT', 'TWD'}
+
+
+def currency_for(region):
+    """The currency of a store region, US dollars if unknown"""
+    return REGION_CURRENCIES.get(region, 'USD')
+
+
+def format_money(cents, currency='USD'):
+    """Format an amount in hundredths of a currency, e.g. 1999 EUR -> "€19.99\""""
+    symbol = CURRENCY_SYMBOLS.get(currency)
+    amount = f"{cents / 100:,.0f}" if currency in WHOLE_CURRENCIES else f"{cents / 100:,.2f}"
+    return f"{symbol}{amount}" if symbol else f"{amount} {currency}"
+
+
+class ExchangeRates:
+    """Rate table cached on disk; amounts are converted through US dollars"""
+    
+    def __init__(self, path=RATES_PATH, url=RATES_URL, http=None):
+        self.path = path
+        self.url = url
+        self.http = http
+        self.lock = threading.Lock()
+        self.rates = {}  # currency -> units per US dollar
+        self.updated = 0.0
+        self.refreshing = False
+        self.load()
+    
+    def load(self):
+        """Read the cached table, if there is one"""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        with self.lock:
+            self.rates = data.get('rates', {})
+            self.updated = data.get('updated', 0.0)
+    
+    def stale(self):
+        return time.time() - self.updated > RATES_MAX_AGE
+    
+    def refresh(self, force=False):
+        """Fetch a new table if the cached one is a day old (or force); True if it changed"""
+        if not (force or self.stale()):
+            return False
+        
+        http = self.http or HttpClient()
+        response = http.get(self.url, timeout=10)
+        response.raise_for_status()
+        data = response.json()
+        rates = data.get('rates')
+        if data.get('result') != "success" or not rates:
+            raise ValueError(f"Unexpected exchange rate response: {data.get('result')}")
+        
+        with self.lock:
+            self.rates = rates
+            self.updated = time.time()
+        
+        # Written under another name first so readers never see half a file
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({'updated': self.updated, 'source': self.url, 'rates': rates}, f)
+        os.replace(temp_path, self.path)
+        return True
+    
+    def refresh_in_background(self):
+        """Refresh a stale table on a daemon thread; conversions use the old one meanwhile"""
+        with self.lock:
+            if self.refreshing or not self.stale():
+                return
+            self.refreshing = True
+        
+        def refresh():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Exchange rate refresh error: {e}")
+            finally:
+                self.refreshing = False
+        threading.Thread(target=refresh, daemon=True).start()
+    
+    def convert(self, cents, from_currency, to_currency):
+        """Convert an amount in cents between currencies; None without a rate for either"""
+        if from_currency == to_currency:
+            return cents
+        with self.lock:
+            from_rate = self.rates.get(from_currency)
+            to_rate = self.rates.get(to_currency)
+        if not from_rate or not to_rate:
+            return None
+        return round(cents / from_rate * to_rate)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the cached exchange rate table")
+    parser.add_argument("--path", default=RATES_PATH, help="rate table file")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    commands.add_parser("refresh", help="fetch the current rates")
+    
+    convert_parser = commands.add_parser("convert", help="convert an amount with the cached rates")
+    convert_parser.add_argument("amount", type=float)
+    convert_parser.add_argument("from_currency")
+    convert_parser.add_argument("to_currency")
+    
+    args = parser.parse_args(argv)
+    rates = ExchangeRates(args.path)
+    
+    if args.command == "refresh":
+        rates.refresh(force=True)
+        print(f"{len(rates.rates)} rates saved to {args.path}", file=sys.stderr)
+    else:
+        from_currency, to_currency = args.from_currency.upper(), args.to_currency.upper()
+        cents = rates.convert(round(args.amount * 100), from_currency, to_currency)
+        if cents is None:
+            print(f"No rate for {from_currency} or {to_currency}; run refresh first", file=sys.stderr)
+            return 1
+        print(format_money(cents, to_currency))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,5 @@
+"""Store adapters, one module per store.
+
+Modules are imported lazily by SearchEngine.adapter() through
+gamerr_engine.STORE_ADAPTERS, so a store that is never searched is never loaded.
+"""
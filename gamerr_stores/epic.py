@@ -0,0 +1,109 @@
+"""Epic Games Store adapter"""
+import json
+from urllib.parse import quote, urlencode
+
+from gamerr_engine import GameResult, StoreAdapter
+
+# Store search through Epic's public GraphQL endpoint; only the fields shown
+# on a card are asked for, so answers stay small
+EPIC_SEARCH_QUERY = " ".join("""
+query searchStoreQuery($keywords: String, $country: String!, $locale: String, $count: Int, $start: Int) {
+  Catalog {
+    searchStore(keywords: $keywords, country: $country, locale: $locale, count: $count, start: $start,
+                category: "games/edition/base", sortBy: "relevancy", sortDir: "DESC") {
+      elements {
+        title id description effectiveDate productSlug
+        keyImages { type url }
+        catalogNs { mappings(pageType: "productHome") { pageSlug } }
+        price(country: $country) { totalPrice { discountPrice originalPrice currencyCode } }
+      }
+      paging { count total }
+    }
+  }
+}
+""".split())
+
+# Key image types in order of preference for the card thumbnail
+EPIC_IMAGE_TYPES = ('Thumbnail', 'OfferImageWide', 'DieselStoreFrontWide')
+
+
+class EpicAdapter(StoreAdapter):
+    store_id = 'epic'
+    max_concurrency = 2
+    api_hosts = {'graphql': "https://graphql.epicgames.com"}
+    
+    def search(self, query, region):
+        """Search Epic Games Store"""
+        return self.search_page(query, region)[0]
+    
+    def search_page(self, query, region, cursor=None):
+        """One page of an Epic search; the cursor is the searchStore start of its first element"""
+        results = []
+        next_cursor = None
+        try:
+            start = cursor or 0
+            variables = {
+                'keywords': query,
+                'country': region,
+                'locale': "en-US",
+                'count': self.page_size,
+                'start': start
+            }
+            # Sent as a GET so answers can be cached like any other store's
+            params = urlencode({'query': EPIC_SEARCH_QUERY, 'variables': json.dumps(variables, separators=(',', ':'))})
+            data = self.get_json(self.api_url('graphql', f"/graphql?{params}"))
+            
+            search_store = data.get('data', {}).get('Catalog', {}).get('searchStore') or {}
+            total = (search_store.get('paging') or {}).get('total', 0)
+            if start + self.page_size < total:
+                next_cursor = start + self.page_size
+            results = self.page_results(data)
+        except Exception as e:
+            print(f"Epic search error: {e}")
+        
+        return results, next_cursor
+    
+    def page_results(self, data):
+        """GameResults for the elements of a searchStore answer"""
+        search_store = data.get('data', {}).get('Catalog', {}).get('searchStore') or {}
+        results = []
+        for element in search_store.get('elements', []):
+            # Offers without a price (unreleased, or not sold in the region)
+            # are left out rather than shown as free
+            total_price = (element.get('price') or {}).get('totalPrice') or {}
+            price = total_price.get('discountPrice')
+            if price is None:
+                continue
+            original_price = total_price.get('originalPrice') or price
+            
+            images = {image.get('type'): image.get('url') for image in element.get('keyImages') or []}
+            image = next((images[kind] for kind in EPIC_IMAGE_TYPES if images.get(kind)), '')
+            
+            # Product pages live under the mapped page slug; older offers only have productSlug
+            mappings = (element.get('catalogNs') or {}).get('mappings') or []
+            slug = mappings[0].get('pageSlug') if mappings else (element.get('productSlug') or '').split("/")[0]
+            if slug:
+                url = f"https://store.epicgames.com/en-US/p/{slug}"
+            else:
+                url = f"https://store.epicgames.com/en-US/browse?q={quote(element.get('title', ''))}"
+            
+            # Many offers repeat their title as the description
+            description = element.get('description')
+            if not description or description == element.get('title'):
+                description = 'Available on Epic Games Store'
+            
+            results.append(GameResult(
+                name=element.get('title', ''),
+                store=self.store,
+                price_cents=price,
+                original_cents=original_price,
+                discount=round(100 - price * 100 / original_price) if original_price else 0,
+                is_free=price == 0,
+                url=url,
+                image=image,
+                description=description,
+                release_date=(element.get('effectiveDate') or 'N/A')[:10],
+                app_id=element.get('id'),
+                currency=total_price.get('currencyCode', 'USD')
+            ))
+        return results
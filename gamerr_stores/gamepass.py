@@ -0,0 +1,120 @@
+"""Xbox Game Pass adapter"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+
+from gamerr_engine import GameResult, StoreAdapter, normalize_title
+from gamerr_metrics import METRICS
+
+# Game Pass catalog lists (console and PC) whose product ids make up the library
+GAMEPASS_LISTS = ('f6f1f99f-9b49-4ccd-b3bf-4d9767a77f5e', 'fdd9e2a7-0fee-49f6-ad69-4354098401ff')
+
+# Product ids per batched display catalog lookup
+GAMEPASS_LOOKUP_BATCH = 20
+
+# Seconds the resolved library is searched before being rebuilt
+GAMEPASS_LIBRARY_TTL = 6 * 3600
+
+# Image purposes in order of preference for the card thumbnail
+GAMEPASS_IMAGE_PURPOSES = ('BoxArt', 'Poster', 'Tile')
+
+
+class GamePassAdapter(StoreAdapter):
+    store_id = 'gamepass'
+    batch_lookup = True  # the display catalog resolves many product ids per request
+    max_concurrency = 2
+    api_hosts = {'catalog': "https://catalog.gamepass.com", 'products': "https://displaycatalog.mp.microsoft.com"}
+    
+    def __init__(self, engine):
+        super().__init__(engine)
+        
+        # Game Pass has no search; its library is resolved once per region and
+        # matched word by word: region -> (built at, [(title words, GameResult)])
+        self.libraries = {}
+        self.library_lock = threading.Lock()
+    
+    def search(self, query, region):
+        """Search Xbox Game Pass"""
+        return self.search_page(query, region)[0]
+    
+    def search_page(self, query, region, cursor=None):
+        """One page of Game Pass titles matching a query; the cursor is an offset into the matches"""
+        results = []
+        next_cursor = None
+        try:
+            words = set(normalize_title(query).split())
+            matches = [result for key, result in self.library(region) if words <= key]
+            offset = cursor or 0
+            if offset + self.page_size < len(matches):
+                next_cursor = offset + self.page_size
+            # Copies, since searches set relevance and regional prices on their results
+            results = [replace(result) for result in matches[offset:offset + self.page_size]]
+        except Exception as e:
+            print(f"Game Pass search error: {e}")
+        
+        return results, next_cursor
+    
+    def library(self, region):
+        """The region's Game Pass titles as (title words, GameResult), rebuilt when old"""
+        # One search builds a missing library while the rest wait for it
+        with self.library_lock:
+            built_at, entries = self.libraries.get(region, (0, None))
+            if entries is None or time.time() - built_at > GAMEPASS_LIBRARY_TTL:
+                entries = [
+                    (frozenset(normalize_title(result.name).split()), result) for result in self.fetch_library(region)
+                ]
+                self.libraries[region] = (time.time(), entries)
+        return entries
+    
+    def fetch_library(self, region):
+        """Every Game Pass title in a region, looked up in batches through the display catalog"""
+        product_ids = {}  # ordered set; titles can be on both lists
+        for list_id in GAMEPASS_LISTS:
+            url = self.api_url('catalog', f"/sigls/v2?id={list_id}&language=en-us&market={region}")
+            # The first entry describes the list itself
+            product_ids.update(dict.fromkeys(entry['id'] for entry in self.get_json(url) if 'id' in entry))
+        product_ids = list(product_ids)
+        
+        batches = [
+            product_ids[i:i + GAMEPASS_LOOKUP_BATCH] for i in range(0, len(product_ids), GAMEPASS_LOOKUP_BATCH)
+        ]
+        
+        # Lookups run on helper threads, which must see this thread's request
+        # context (cancel token, max_age)
+        context = dict(vars(self.engine.local))
+        
+        def lookup(batch):
+            vars(self.engine.local).update(context)
+            url = self.api_url('products', f"/v7.0/products?bigIds={','.join(batch)}&market={region}&languages=en-us")
+            return self.page_results(self.get_json(url))
+        
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor, METRICS.io_wait():
+            return [result for results in executor.map(lookup, batches) for result in results]
+    
+    def page_results(self, data):
+        """GameResults for the products of a display catalog answer"""
+        results = []
+        for product in data.get('Products', []):
+            properties = (product.get('LocalizedProperties') or [{}])[0]
+            images = {image.get('ImagePurpose'): image.get('Uri', '') for image in properties.get('Images', [])}
+            image = next((images[purpose] for purpose in GAMEPASS_IMAGE_PURPOSES if images.get(purpose)), '')
+            
+            results.append(GameResult(
+                name=properties.get('ProductTitle', ''),
+                store=self.store,
+                # Every title on the Game Pass lists comes with the subscription,
+                # whether or not it can also be bought; the offer shown is that,
+                # not the purchase price
+                price_cents=0,
+                original_cents=0,
+                discount=0,
+                is_free=False,
+                url=f"https://www.xbox.com/en-US/games/store/-/{product.get('ProductId', '')}",
+                # Image URIs come without a scheme
+                image=f"https:{image}" if image.startswith("//") else image,
+                description='Included with Game Pass',
+                app_id=product.get('ProductId'),
+                included_with='Game Pass'
+            ))
+        return results
@@ -0,0 +1,118 @@
+"""GOG store adapter"""
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+from gamerr_engine import GameResult, RegionalPrice, StoreAdapter
+from gamerr_metrics import METRICS
+
+
+class GogAdapter(StoreAdapter):
+    store_id = 'gog'
+    max_concurrency = 4
+    rate_limit = 5
+    regions = ('US',)  # the filtered endpoint has no country parameter
+    regional_pricing = True  # the prices API takes countryCode=
+    api_hosts = {'catalog': "https://embed.gog.com", 'prices': "https://api.gog.com"}
+    
+    def search(self, query, region):
+        """Search GOG"""
+        return self.search_page(query, region)[0]
+    
+    def search_page(self, query, region, cursor=None):
+        """One page of a GOG search; the cursor is (games/ajax/filtered page, index into its products)"""
+        results = []
+        next_cursor = None
+        try:
+            # GOG search API; its pages are larger than ours, so one is
+            # usually served from the response cache several times
+            page, index = cursor or (1, 0)
+            url = self.api_url('catalog', f"/games/ajax/filtered?mediaType=game&search={quote(query)}&page={page}")
+            data = self.get_json(url)
+            products = data.get('products', [])
+            
+            if index + self.page_size < len(products):
+                next_cursor = (page, index + self.page_size)
+            elif page < data.get('totalPages', 1):
+                next_cursor = (page + 1, 0)
+            
+            for product in products[index:index + self.page_size]:
+                price_data = product.get('price', {})
+                
+                results.append(GameResult(
+                    name=product.get('title', ''),
+                    store=self.store,
+                    price_cents=self.parse_cents(price_data.get('finalAmount', 0)),
+                    original_cents=self.parse_cents(price_data.get('baseAmount', 0)),
+                    discount=int(price_data.get('discountPercentage', 0)),
+                    is_free=price_data.get('isFree', False),
+                    url=f"https://www.gog.com{product.get('url', '')}",
+                    # GOG hands out a bare image id; the suffix picks a rendition
+                    image=f"https:{product.get('image', '')}_196.jpg" if product.get('image') else '',
+                    description='DRM-Free on GOG',
+                    app_id=product.get('id')
+                ))
+        except Exception as e:
+            print(f"GOG search error: {e}")
+        
+        return results, next_cursor
+    
+    def price_entries(self, entries, region):
+        """Price local catalog titles through the per-product prices API"""
+        prices = self.map_prices([entry.app_id for entry in entries], region)
+        return [self.entry_result(entry, price) for entry, price in zip(entries, prices) if price]
+    
+    def regional_prices(self, results, region):
+        """Prices of known products in another region through the prices API"""
+        prices = self.map_prices([result.app_id for result in results], region)
+        return {result.app_id: price for result, price in zip(results, prices) if price}
+    
+    def map_prices(self, product_ids, region):
+        """fetch_price for several products at once, in order"""
+        # Lookups run on helper threads, which must see this thread's request
+        # context (cancel token, max_age)
+        context = dict(vars(self.engine.local))
+        
+        def fetch(product_id):
+            vars(self.engine.local).update(context)
+            return self.fetch_price(product_id, region)
+        
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor, METRICS.io_wait():
+            return list(executor.map(fetch, product_ids))
+    
+    def fetch_price(self, product_id, region):
+        """One product's price in a region as a RegionalPrice, or None"""
+        try:
+            url = self.api_url('prices', f"/products/{product_id}/prices?countryCode={region}")
+            prices = self.get_json(url).get('_embedded', {}).get('prices', [])
+        except Exception as e:
+            print(f"GOG price error for {product_id}: {e}")
+            return None
+        if not prices:
+            return None
+        
+        # Amounts come as "1999 USD", already in cents
+        price, currency = prices[0].get('finalPrice', '0 USD').split()
+        original_price = int(prices[0].get('basePrice', '0').split()[0])
+        return RegionalPrice(
+            region=region,
+            currency=currency,
+            price_cents=int(price),
+            original_cents=original_price,
+            discount=round(100 - int(price) * 100 / original_price) if original_price else 0
+        )
+    
+    def entry_result(self, entry, price):
+        """A catalog title priced by fetch_price as a GameResult"""
+        return GameResult(
+            name=entry.name,
+            store=self.store,
+            price_cents=price.price_cents,
+            original_cents=price.original_cents,
+            discount=price.discount,
+            is_free=price.original_cents == 0,
+            url=entry.url,
+            image=entry.image,
+            description='DRM-Free on GOG',
+            app_id=int(entry.app_id),
+            currency=price.currency
+        )
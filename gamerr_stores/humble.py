@@ -0,0 +1,77 @@
+"""Humble Bundle store adapter"""
+from urllib.parse import quote
+
+from gamerr_engine import GameResult, StoreAdapter
+
+
+class HumbleAdapter(StoreAdapter):
+    store_id = 'humble'
+    max_concurrency = 2
+    regions = ('US',)  # the store search has no country parameter
+    api_hosts = {'store': "https://www.humblebundle.com"}
+    
+    def search(self, query, region):
+        """Search Humble Bundle"""
+        return self.search_page(query, region)[0]
+    
+    def search_page(self, query, region, cursor=None):
+        """One page of a Humble store search; the cursor is (API page, index into its results)"""
+        results = []
+        next_cursor = None
+        try:
+            # The JSON endpoint behind the store's search page; pages count from 0
+            page, index = cursor or (0, 0)
+            url = self.api_url(
+                'store', f"/store/api/search?sort=bestselling&filter=all&search={quote(query)}&request=1&page={page}"
+            )
+            data = self.get_json(url)
+            page_results = self.page_results(data)
+            
+            if index + self.page_size < len(page_results):
+                next_cursor = (page, index + self.page_size)
+            elif page + 1 < data.get('num_pages', 1):
+                next_cursor = (page + 1, 0)
+            results = page_results[index:index + self.page_size]
+        except Exception as e:
+            print(f"Humble search error: {e}")
+        
+        return results, next_cursor
+    
+    def page_results(self, data):
+        """GameResults for the results of a store search answer"""
+        results = []
+        for item in data.get('results', []):
+            # Items without a price aren't for sale; they're left out rather
+            # than shown as free
+            price, currency = self.price_of(item.get('current_price'))
+            if price is None:
+                continue
+            original_price, _ = self.price_of(item.get('full_price'))
+            if not original_price:
+                original_price = price
+            
+            results.append(GameResult(
+                name=item.get('human_name', ''),
+                store=self.store,
+                price_cents=price,
+                original_cents=original_price,
+                discount=round(100 - price * 100 / original_price) if original_price else 0,
+                is_free=price == 0,
+                url=f"https://www.humblebundle.com/store/{item.get('human_url', '')}",
+                image=item.get('featured_image_small') or item.get('large_capsule') or '',
+                description='Available on Humble Store',
+                app_id=item.get('machine_name'),
+                currency=currency
+            ))
+        return results
+    
+    def price_of(self, price):
+        """(cents, currency) of a price field, cents None without an amount.
+        
+        The field comes as {"amount", "currency"} or [amount, currency].
+        """
+        if isinstance(price, dict) and price.get('amount') is not None:
+            return self.parse_cents(price['amount']), price.get('currency', 'USD')
+        if isinstance(price, list) and price and price[0] is not None:
+            return self.parse_cents(price[0]), price[1] if len(price) > 1 else 'USD'
+        return None, 'USD'
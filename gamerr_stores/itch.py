@@ -0,0 +1,170 @@
+"""Itch.io store adapter"""
+import re
+from urllib.parse import quote
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from gamerr_engine import GameResult, StoreAdapter
+
+try:
+    from lxml import html as lxml_html
+    HTML_PARSER = "lxml"
+except ImportError:
+    lxml_html = None
+    HTML_PARSER = "html.parser"
+
+# Without lxml, only the game cells of a search page are built into a tree, so
+# nothing in the header, sidebar or footer can be mistaken for a game. It
+# saves little time: the whole page is still tokenized
+GAME_CELLS = SoupStrainer("div", attrs={'data-game_id': True})
+
+# Currency of the symbol an itch.io price starts with
+PRICE_CURRENCIES = {"$": 'USD', "€": 'EUR', "£": 'GBP', "¥": 'JPY'}
+
+# Symbol and amount of a price tag, e.g. "$4.99"
+PRICE_PATTERN = re.compile(r"([^\d\s]*)\s*([\d,]+(?:\.\d+)?)")
+
+# Amount written with a decimal comma, e.g. "4,99"
+DECIMAL_COMMA_PATTERN = re.compile(r"^\d+,\d\d$")
+
+
+def parse_search_page(body):
+    """The game cells of an itch.io search page as dicts of the fields a card shows"""
+    # lxml is optional; it builds its tree in C, while BeautifulSoup works
+    # with the parsers Python comes with
+    if lxml_html is not None:
+        return parse_cells_lxml(body)
+    return parse_cells_soup(body)
+
+
+def parse_cells_lxml(body):
+    """parse_search_page with lxml: XPath over the game cells of the page"""
+    def find(cell, tag, name):
+        found = cell.xpath(f'.//{tag}[contains(concat(" ", normalize-space(@class), " "), " {name} ")]')
+        return found[0] if found else None
+    
+    def text(element):
+        return element.text_content().strip() if element is not None else None
+    
+    games = []
+    for cell in lxml_html.fromstring(body).xpath("//div[@data-game_id]"):
+        title = find(cell, "a", "title")
+        if title is None:
+            continue
+        thumb = cell.find(".//img")
+        games.append({
+            'id': cell.get('data-game_id'),
+            'title': text(title),
+            'url': title.get('href', ''),
+            'price': text(find(cell, "div", "price_value")),
+            'sale': text(find(cell, "div", "sale_tag")),
+            'description': text(find(cell, "div", "game_text")) or '',
+            'author': text(find(cell, "div", "game_author")) or '',
+            # Thumbnails are lazy-loaded; the real source is in a data attribute
+            'image': (thumb.get('data-lazy_src') or thumb.get('src', '')) if thumb is not None else '',
+        })
+    return games
+
+
+def parse_cells_soup(body):
+    """parse_search_page without lxml: a BeautifulSoup tree of the game cells only"""
+    def text(element):
+        return element.get_text(strip=True) if element is not None else None
+    
+    games = []
+    soup = BeautifulSoup(body, HTML_PARSER, parse_only=GAME_CELLS)
+    for cell in soup.find_all("div", attrs={'data-game_id': True}, recursive=False):
+        title = cell.find("a", class_="title")
+        if title is None:
+            continue
+        thumb = cell.find("img")
+        games.append({
+            'id': cell['data-game_id'],
+            'title': text(title),
+            'url': title.get('href', ''),
+            'price': text(cell.find("div", class_="price_value")),
+            'sale': text(cell.find("div", class_="sale_tag")),
+            'description': text(cell.find("div", class_="game_text")) or '',
+            'author': text(cell.find("div", class_="game_author")) or '',
+            'image': (thumb.get('data-lazy_src') or thumb.get('src', '')) if thumb is not None else '',
+        })
+    return games
+
+
+class ItchAdapter(StoreAdapter):
+    store_id = 'itch'
+    max_concurrency = 2
+    regions = ('US',)  # the search page has no country parameter
+    api_hosts = {'site': "https://itch.io"}
+    
+    def search(self, query, region):
+        """Search Itch.io"""
+        return self.search_page(query, region)[0]
+    
+    def search_page(self, query, region, cursor=None):
+        """One page of an itch.io search; the cursor is (site page, index into its games)"""
+        results = []
+        next_cursor = None
+        try:
+            # There's no search API; the HTML page is cached like any response
+            # and parsed down to its game cells
+            page, index = cursor or (1, 0)
+            url = self.api_url('site', f"/search?q={quote(query)}&page={page}")
+            page_results = self.page_results(self.get_json(url, decoder=parse_search_page))
+            
+            # The page count isn't shown, so paging stops at the first empty page
+            if index + self.page_size < len(page_results):
+                next_cursor = (page, index + self.page_size)
+            elif page_results:
+                next_cursor = (page + 1, 0)
+            results = page_results[index:index + self.page_size]
+        except Exception as e:
+            print(f"Itch search error: {e}")
+        
+        return results, next_cursor
+    
+    def page_results(self, games):
+        """GameResults for the games parse_search_page found"""
+        results = []
+        for game in games:
+            # A missing price tag may just be a layout change; such games are
+            # left out rather than shown as free
+            price, currency = self.parse_price(game['price'])
+            if price is None:
+                continue
+            sale = (game['sale'] or '').strip("-% ")
+            discount = int(sale) if sale.isdigit() else 0
+            # Only the sale price is shown; the full price is worked back from the discount
+            original_price = round(price * 100 / (100 - discount)) if 0 < discount < 100 else price
+            
+            description = game['description'] or 'Indie game on Itch.io'
+            if game['author']:
+                description = f"{description} • by {game['author']}"
+            
+            results.append(GameResult(
+                name=game['title'],
+                store=self.store,
+                price_cents=price,
+                original_cents=original_price,
+                discount=discount,
+                is_free=price == 0,
+                url=game['url'],
+                image=game['image'],
+                description=description,
+                app_id=int(game['id']) if game['id'].isdigit() else game['id'],
+                currency=currency
+            ))
+        return results
+    
+    def parse_price(self, text):
+        """(cents, currency) of a price tag such as "$4.99" or "Free"; cents are None without one"""
+        if text and text.lower() == "free":
+            return 0, 'USD'
+        match = PRICE_PATTERN.search(text or '')
+        if not match:
+            return None, 'USD'
+        symbol, amount = match.groups()
+        # "4,99" uses a decimal comma; in "1,299.00" it groups thousands
+        if DECIMAL_COMMA_PATTERN.match(amount):
+            amount = amount.replace(",", ".")
+        return self.parse_cents(amount.replace(",", "")), PRICE_CURRENCIES.get(symbol, 'USD')
@@ -0,0 +1,252 @@
+"""Steam store adapter"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import quote
+
+from gamerr_engine import GameResult, RegionalPrice, StoreAdapter
+from gamerr_metrics import METRICS
+
+# App ids per batched appdetails price lookup
+STEAM_PRICE_BATCH = 20
+
+# Apps whose appdetails are kept in memory, least recently used dropped first
+STEAM_DETAILS_CACHE = 1000
+
+
+class SteamAdapter(StoreAdapter):
+    store_id = 'steam'
+    batch_lookup = True  # appdetails takes several appids with filters=price_overview
+    max_concurrency = 4
+    rate_limit = 4  # Steam starts answering 429 at roughly 200 requests / 5 min
+    regional_pricing = True  # appdetails takes cc=
+    api_hosts = {'store': "https://store.steampowered.com"}
+    
+    def __init__(self, engine):
+        super().__init__(engine)
+        
+        # appdetails, fetched on demand and shared between searches: an LRU of
+        # loaded details and the futures of the lookups still in flight
+        self.details = OrderedDict()
+        self.detail_futures = {}
+        self.details_lock = threading.Lock()
+        self.detail_executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+    
+    def search(self, query, region):
+        """Search Steam store"""
+        return self.search_page(query, region)[0]
+    
+    def search_page(self, query, region, cursor=None):
+        """One page of a Steam store search; the cursor is an offset into its one, unpaged answer"""
+        results = []
+        next_cursor = None
+        try:
+            # Steam store search API, answered from the response cache for
+            # every page after the first
+            url = self.api_url('store', f"/api/storesearch/?term={quote(query)}&l=english&cc={region}")
+            data = self.get_json(url)
+            offset = cursor or 0
+            all_items = data.get('items', [])
+            items = all_items[offset:offset + self.page_size]
+            if offset + self.page_size < len(all_items):
+                next_cursor = offset + self.page_size
+            
+            # storesearch already carries the price of paid games; only the
+            # rest (free or unreleased) need their appdetails looked up
+            unpriced = [item.get('id') for item in items if 'price' not in item]
+            details = self.fetch_details(unpriced)
+            
+            for item in items:
+                app_id = item.get('id')
+                
+                if 'price' in item:
+                    price_info = item['price']
+                    price = price_info.get('final', 0)
+                    original_price = price_info.get('initial', 0)
+                    discount = round(100 - price * 100 / original_price) if original_price else 0
+                    
+                    results.append(GameResult(
+                        name=item.get('name', ''),
+                        store=self.store,
+                        price_cents=price,
+                        original_cents=original_price,
+                        discount=discount,
+                        is_free=False,
+                        url=f"https://store.steampowered.com/app/{app_id}/",
+                        image=item.get('tiny_image', ''),
+                        app_id=app_id,
+                        details_loaded=False,
+                        currency=price_info.get('currency', 'USD')
+                    ))
+                elif app_id in details:
+                    results.append(self.details_result(app_id, details[app_id]))
+        except Exception as e:
+            print(f"Steam search error: {e}")
+        
+        return results, next_cursor
+    
+    def price_entries(self, entries, region):
+        """Price local catalog titles with batched appdetails price lookups"""
+        results = []
+        try:
+            prices = self.fetch_prices([entry.app_id for entry in entries], region)
+            unpriced = []
+            for entry in entries:
+                price_info = prices.get(entry.app_id)
+                if not price_info:
+                    unpriced.append(int(entry.app_id))
+                    continue
+                
+                results.append(GameResult(
+                    name=entry.name,
+                    store=self.store,
+                    price_cents=price_info.get('final', 0),
+                    original_cents=price_info.get('initial', 0),
+                    discount=price_info.get('discount_percent', 0),
+                    is_free=False,
+                    url=entry.url,
+                    image=entry.image,
+                    app_id=int(entry.app_id),
+                    details_loaded=False,
+                    currency=price_info.get('currency', 'USD')
+                ))
+            
+            # Free and unreleased apps need their full appdetails to tell apart
+            for app_id, game_data in self.fetch_details(unpriced).items():
+                if game_data.get('is_free') or game_data.get('price_overview'):
+                    results.append(self.details_result(app_id, game_data))
+        except Exception as e:
+            print(f"Steam price error: {e}")
+        
+        return results
+    
+    def regional_prices(self, results, region):
+        """Prices of known apps in another region; their details are region-independent and kept"""
+        prices = self.fetch_prices([str(result.app_id) for result in results], region)
+        regional = {}
+        for result in results:
+            price_info = prices.get(str(result.app_id))
+            if price_info:
+                regional[result.app_id] = RegionalPrice(
+                    region=region,
+                    currency=price_info.get('currency', 'USD'),
+                    price_cents=price_info.get('final', 0),
+                    original_cents=price_info.get('initial', 0),
+                    discount=price_info.get('discount_percent', 0)
+                )
+        return regional
+    
+    def fetch_prices(self, app_ids, region):
+        """price_overview of several apps in a region, by app id string"""
+        # Only price_overview can be asked for several apps at once
+        prices = {}
+        for start in range(0, len(app_ids), STEAM_PRICE_BATCH):
+            batch = ",".join(app_ids[start:start + STEAM_PRICE_BATCH])
+            url = self.api_url('store', f"/api/appdetails?appids={batch}&filters=price_overview&cc={region}")
+            for app_id, entry in self.get_json(url).items():
+                # Apps without a price answer with an empty list for data
+                if entry.get('success') and entry.get('data'):
+                    prices[app_id] = entry['data'].get('price_overview')
+        return prices
+    
+    def details_result(self, app_id, game_data):
+        """Build a complete result from an app's appdetails"""
+        price_info = game_data.get('price_overview', {})
+        is_free = game_data.get('is_free', False)
+        
+        if is_free:
+            price = 0
+            original_price = 0
+            discount = 0
+        else:
+            price = price_info.get('final', 0)
+            original_price = price_info.get('initial', 0)
+            discount = price_info.get('discount_percent', 0)
+        
+        game = GameResult(
+            name=game_data.get('name', ''),
+            store=self.store,
+            price_cents=price,
+            original_cents=original_price,
+            discount=discount,
+            is_free=is_free,
+            url=f"https://store.steampowered.com/app/{app_id}/",
+            image=game_data.get('header_image', ''),
+            app_id=app_id,
+            currency=price_info.get('currency', 'USD')
+        )
+        self.apply_details(game, game_data)
+        return game
+    
+    def fetch_details(self, app_ids):
+        """Fetch appdetails for several apps concurrently"""
+        futures = {app_id: self.details_future(app_id) for app_id in app_ids}
+        details = {}
+        for app_id, future in futures.items():
+            with METRICS.io_wait():
+                game_data = future.result()
+            if game_data:
+                details[app_id] = game_data
+        return details
+    
+    def details_future(self, app_id):
+        """Return a future for one app's details, sharing in-flight requests"""
+        with self.details_lock:
+            game_data = self.details.get(app_id)
+            if game_data is not None:
+                self.details.move_to_end(app_id)
+                future = Future()
+                future.set_result(game_data)
+                return future
+            
+            future = self.detail_futures.get(app_id)
+            if future is not None:
+                return future
+            # Registered before the lookup starts, so even one failing at once
+            # finds it there to remove
+            future = self.detail_futures[app_id] = Future()
+        self.detail_executor.submit(self.resolve_details, app_id, future)
+        return future
+    
+    def resolve_details(self, app_id, future):
+        """Look up one app's details, keep them if found and complete its future"""
+        game_data = None
+        try:
+            game_data = self.fetch_app_details(app_id)
+        finally:
+            with self.details_lock:
+                # Failed lookups are forgotten so a later card can retry them
+                self.detail_futures.pop(app_id, None)
+                if game_data is not None:
+                    self.details[app_id] = game_data
+                    while len(self.details) > STEAM_DETAILS_CACHE:
+                        self.details.popitem(last=False)
+            future.set_result(game_data)
+    
+    def fetch_app_details(self, app_id):
+        """Fetch a single app's appdetails, or None if unavailable"""
+        try:
+            detail_url = self.api_url('store', f"/api/appdetails?appids={app_id}")
+            detail_data = self.get_json(detail_url, timeout=5)
+        except Exception as e:
+            print(f"Steam details error for {app_id}: {e}")
+            detail_data = {}
+        
+        entry = detail_data.get(str(app_id)) or {}
+        return entry['data'] if entry.get('success') else None
+    
+    def apply_details(self, game, data):
+        """Copy the lazily loaded detail fields into a Steam result"""
+        game.description = data.get('short_description', '')[:200]
+        game.release_date = data.get('release_date', {}).get('date', 'N/A')
+        game.details_loaded = True
+    
+    def load_details(self, game, on_loaded):
+        """Load a result's details in the background, then call on_loaded(data)"""
+        future = self.details_future(game.app_id)
+        
+        def done(f):
+            game_data = f.result()
+            if game_data:
+                on_loaded(game_data)
+        future.add_done_callback(done)
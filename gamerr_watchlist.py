@@ -0,0 +1,330 @@
+"""Watchlist of titles whose prices are polled in the background.
+
+Each polling interval every watched title is priced once, in batches where
+the store allows it (Steam's appdetails takes many appids at once), with the
+batches spread at random over the interval instead of sent in a burst.
+Cached responses are revalidated with conditional requests. A notification
+is raised when a price drops to a title's threshold or a discount starts:
+
+    python gamerr_watchlist.py add steam 292030 "The Witcher 3: Wild Hunt" --threshold 10
+    python gamerr_watchlist.py poll --once
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import threading
+import time
+
+from gamerr_engine import CACHE_DIR, STORES, SearchEngine, normalize_title
+from gamerr_history import PriceHistory, series_key
+from gamerr_rates import format_money
+
+# Watchlist database location
+WATCHLIST_PATH = os.path.join(CACHE_DIR, "watchlist.sqlite3")
+
+# Seconds between two polls of the same title
+WATCH_POLL_INTERVAL = 3600
+
+# Cached prices older than this (seconds) are revalidated before a poll uses them
+WATCH_MAX_AGE = 300
+
+# Titles per request for stores with batch lookups; others are polled one by one
+WATCH_BATCH_SIZE = 20
+
+
+class Watch:
+    """A watched title and the last price seen for it; prices are in cents of currency"""
+    __slots__ = ('store_id', 'app_id', 'name', 'url', 'image', 'threshold_cents',
+                 'last_cents', 'last_discount', 'checked_at', 'currency')
+    
+    def __init__(self, store_id, app_id, name, url='', image='', threshold_cents=None,
+                 last_cents=None, last_discount=None, checked_at=None, currency='USD'):
+        self.store_id = store_id
+        self.app_id = app_id
+        self.name = name
+        self.url = url
+        self.image = image
+        self.threshold_cents = threshold_cents
+        self.last_cents = last_cents
+        self.last_discount = last_discount
+        self.checked_at = checked_at
+        self.currency = currency
+    
+    def alerts(self, result):
+        """Reasons a newly polled price is worth a notification"""
+        reasons = []
+        # Subscription offers have no price to cross a threshold or drop
+        if result.included_with:
+            return reasons
+        threshold = self.threshold_cents
+        # A threshold means nothing in another currency (e.g. after a region change)
+        if threshold is not None and result.currency == self.currency and result.price_cents <= threshold:
+            # Only when crossing it, not on every poll below it
+            if self.last_cents is None or self.last_cents > threshold:
+                reasons.append(f"at or below {format_money(threshold, self.currency)}")
+        # The first poll has nothing to compare against
+        if result.discount > 0 and self.last_discount == 0:
+            reasons.append(f"on sale, -{result.discount}%")
+        return reasons
+
+
+class PriceAlert:
+    """A watched title's price change worth telling the user about"""
+    __slots__ = ('watch', 'result', 'reasons')
+    
+    def __init__(self, watch, result, reasons):
+        self.watch = watch
+        self.result = result
+        self.reasons = reasons
+    
+    def message(self):
+        price = format_money(self.result.price_cents, self.result.currency)
+        return f"{self.result.name} on {self.result.store_name}: {price}, {', '.join(self.reasons)}"
+
+
+class Watchlist:
+    """SQLite list of watched titles"""
+    
+    def __init__(self, path=WATCHLIST_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS watches ("
+            "store TEXT, app_id TEXT, name TEXT, url TEXT, image TEXT, threshold INTEGER, "
+            "last_price INTEGER, last_discount INTEGER, checked_at REAL, currency TEXT DEFAULT 'USD', "
+            "PRIMARY KEY (store, app_id))"
+        )
+        # Watchlists from before prices had a currency were all in dollars
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(watches)")}
+        if 'currency' not in columns:
+            self.conn.execute("ALTER TABLE watches ADD COLUMN currency TEXT DEFAULT 'USD'")
+        self.conn.commit()
+        
+        # Watched (store, app_id) pairs, so cards can show their watch state
+        # without a query
+        self.keys = set(self.conn.execute("SELECT store, app_id FROM watches").fetchall())
+    
+    def add(self, watch):
+        """Watch a title, keeping what was already seen of it"""
+        with self.lock:
+            self.conn.execute(
+                "INSERT INTO watches (store, app_id, name, url, image, threshold, currency) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (store, app_id) DO UPDATE SET name = excluded.name, url = excluded.url, "
+                "image = excluded.image, threshold = excluded.threshold, currency = excluded.currency",
+                (watch.store_id, watch.app_id, watch.name, watch.url, watch.image, watch.threshold_cents,
+                 watch.currency)
+            )
+            self.conn.commit()
+            self.keys.add((watch.store_id, watch.app_id))
+    
+    def add_result(self, game, threshold_cents=None):
+        """Watch the title of a search result; the threshold is in the result's currency"""
+        self.add(Watch(game.store_id, series_key(game), game.name, game.url, game.image, threshold_cents,
+                       currency=game.currency))
+    
+    def set_threshold(self, store_id, app_id, threshold_cents):
+        """Change the price a watched title notifies at, or None for sales only"""
+        with self.lock:
+            self.conn.execute(
+                "UPDATE watches SET threshold = ? WHERE store = ? AND app_id = ?", (threshold_cents, store_id, app_id)
+            )
+            self.conn.commit()
+    
+    def remove(self, store_id, app_id):
+        with self.lock:
+            self.conn.execute("DELETE FROM watches WHERE store = ? AND app_id = ?", (store_id, app_id))
+            self.conn.commit()
+            self.keys.discard((store_id, app_id))
+    
+    def contains(self, store_id, app_id):
+        with self.lock:
+            return (store_id, app_id) in self.keys
+    
+    def watches(self):
+        """Every watched title"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT store, app_id, name, url, image, threshold, last_price, last_discount, checked_at, currency "
+                "FROM watches ORDER BY store, name"
+            ).fetchall()
+        return [Watch(*row) for row in rows]
+    
+    def save_prices(self, watches):
+        """Store the last polled price of some watches"""
+        with self.lock:
+            self.conn.executemany(
+                "UPDATE watches SET last_price = ?, last_discount = ?, checked_at = ? WHERE store = ? AND app_id = ?",
+                [(w.last_cents, w.last_discount, w.checked_at, w.store_id, w.app_id) for w in watches]
+            )
+            self.conn.commit()
+
+
+class WatchlistPoller:
+    """Background thread polling the watchlist once per interval"""
+    
+    def __init__(self, engine, watchlist, notify, interval=WATCH_POLL_INTERVAL):
+        self.engine = engine
+        self.watchlist = watchlist
+        self.notify = notify  # called with each PriceAlert on the poller thread
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.thread = None
+    
+    def start(self):
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        self.stop_event.set()
+    
+    def plan(self):
+        """(offset, store_id, batch) for one interval, batches spread at random over it"""
+        by_store = {}
+        for watch in self.watchlist.watches():
+            if watch.store_id in STORES:
+                by_store.setdefault(watch.store_id, []).append(watch)
+        
+        schedule = []
+        for store_id, watches in by_store.items():
+            size = WATCH_BATCH_SIZE if self.engine.adapter(store_id).batch_lookup else 1
+            for start in range(0, len(watches), size):
+                schedule.append((random.uniform(0, self.interval), store_id, watches[start:start + size]))
+        schedule.sort(key=lambda item: item[0])
+        return schedule
+    
+    def run(self):
+        # Every request from this thread revalidates prices that aren't recent
+        self.engine.local.max_age = WATCH_MAX_AGE
+        while not self.stop_event.is_set():
+            cycle_start = time.monotonic()
+            for offset, store_id, batch in self.plan():
+                if self.stop_event.wait(max(cycle_start + offset - time.monotonic(), 0)):
+                    return
+                self.poll(store_id, batch)
+            self.stop_event.wait(max(cycle_start + self.interval - time.monotonic(), 0))
+    
+    def poll_all(self):
+        """Poll every watched title now, without spreading; return the alerts"""
+        self.engine.local.max_age = WATCH_MAX_AGE
+        alerts = []
+        for _, store_id, batch in self.plan():
+            alerts.extend(self.poll(store_id, batch))
+        return alerts
+    
+    def poll(self, store_id, batch):
+        """Price one batch of a store's watches and raise alerts; return them"""
+        adapter = self.engine.adapter(store_id)
+        # A store that is down gets its turn again next interval
+        if not adapter.breaker.available():
+            return []
+        
+        region = adapter.region_for(self.engine.region)
+        try:
+            results = adapter.price_entries(batch, region)
+            if results is None:
+                found = self.search_titles(adapter, batch, region)
+            else:
+                found = {series_key(result): result for result in results}
+        except Exception as e:
+            print(f"Watchlist poll error for {store_id}: {e}")
+            return []
+        
+        now = time.time()
+        alerts = []
+        for watch in batch:
+            result = found.get(watch.app_id)
+            if result is None:
+                continue
+            reasons = watch.alerts(result)
+            if reasons:
+                alerts.append(PriceAlert(watch, result, reasons))
+            watch.last_cents = result.price_cents
+            watch.last_discount = result.discount
+            watch.checked_at = now
+        
+        self.watchlist.save_prices(batch)
+        if self.engine.history and found:
+            self.engine.history.record(list(found.values()), self.engine.region)
+        for alert in alerts:
+            self.notify(alert)
+        return alerts
+    
+    def search_titles(self, adapter, batch, region):
+        """Find watched titles by searching for their names, for stores that can't price ids.
+        
+        Returns {watch app_id: result}.
+        """
+        found = {}
+        for watch in batch:
+            key = normalize_title(watch.name)
+            for result in adapter.search(watch.name, region):
+                if series_key(result) == watch.app_id or normalize_title(result.name) == key:
+                    found[watch.app_id] = result
+                    break
+        return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Watch game prices")
+    parser.add_argument("--path", default=WATCHLIST_PATH, help="watchlist database file")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    add_parser = commands.add_parser("add", help="watch a title")
+    add_parser.add_argument("store", choices=sorted(STORES))
+    add_parser.add_argument("app_id", help="store id of the title (app id, product id or store URL)")
+    add_parser.add_argument("name")
+    add_parser.add_argument("--threshold", type=float, help="notify at or below this price")
+    add_parser.add_argument("--currency", default='USD', help="currency of the store's prices and the threshold")
+    
+    threshold_parser = commands.add_parser("threshold", help="change the price a watched title notifies at")
+    threshold_parser.add_argument("store", choices=sorted(STORES))
+    threshold_parser.add_argument("app_id")
+    threshold_parser.add_argument("price", type=float, nargs="?", help="notify at or below this price; omit for sales only")
+    
+    remove_parser = commands.add_parser("remove", help="stop watching a title")
+    remove_parser.add_argument("store", choices=sorted(STORES))
+    remove_parser.add_argument("app_id")
+    
+    commands.add_parser("list", help="list watched titles")
+    
+    poll_parser = commands.add_parser("poll", help="poll prices and print alerts as JSON lines")
+    poll_parser.add_argument("--once", action="store_true", help="poll everything now and exit")
+    poll_parser.add_argument("--region", default="US", help="store region / country code")
+    poll_parser.add_argument("--interval", type=float, default=WATCH_POLL_INTERVAL, help="seconds between polls of a title")
+    
+    args = parser.parse_args(argv)
+    watchlist = Watchlist(args.path)
+    
+    if args.command == "add":
+        threshold = round(args.threshold * 100) if args.threshold is not None else None
+        watchlist.add(Watch(args.store, args.app_id, args.name, threshold_cents=threshold, currency=args.currency))
+    elif args.command == "threshold":
+        watchlist.set_threshold(args.store, args.app_id, round(args.price * 100) if args.price is not None else None)
+    elif args.command == "remove":
+        watchlist.remove(args.store, args.app_id)
+    elif args.command == "list":
+        for watch in watchlist.watches():
+            last = format_money(watch.last_cents, watch.currency) if watch.last_cents is not None else "-"
+            threshold = format_money(watch.threshold_cents, watch.currency) if watch.threshold_cents is not None else "-"
+            print(f"{watch.store_id}\t{watch.app_id}\t{watch.name}\tlast {last}\tthreshold {threshold}")
+    else:
+        def notify(alert):
+            print(json.dumps(dict(alert.result.to_dict(), reasons=alert.reasons), ensure_ascii=False), flush=True)
+        
+        engine = SearchEngine(region=args.region, history=PriceHistory())
+        poller = WatchlistPoller(engine, watchlist, notify, args.interval)
+        if args.once:
+            poller.poll_all()
+        else:
+            poller.run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,31 @@
+"""Test setup: the app's modules live at the repository root, not in a package"""
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeClock:
+    """time.monotonic stand-in that only moves when told to, or when slept on"""
+    
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+    
+    def __call__(self):
+        return self.now
+    
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(time, 'monotonic', clock)
+    monkeypatch.setattr(time, 'sleep', clock.sleep)
+    return clock
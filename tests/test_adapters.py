@@ -0,0 +1,253 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from bench.server import FIXTURES_DIR
+from gamerr_engine import HttpClient, SearchEngine, normalize_title
+from gamerr_stores import itch, steam
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return SearchEngine(http=HttpClient(cache=None))
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+        return f.read()
+
+
+def fields(result):
+    return {
+        'name': result.name,
+        'price_cents': result.price_cents,
+        'original_cents': result.original_cents,
+        'discount': result.discount,
+        'is_free': result.is_free,
+        'currency': result.currency,
+        'url': result.url,
+        'image': result.image,
+        'app_id': result.app_id,
+    }
+
+
+def epic_answer(*elements):
+    return {'data': {'Catalog': {'searchStore': {'elements': list(elements), 'paging': {'total': len(elements)}}}}}
+
+
+def test_epic_search_page(engine):
+    results = engine.adapter('epic').page_results(json.loads(fixture("epic_search.json")))
+    
+    assert len(results) == 10
+    assert fields(results[0]) == {
+        'name': "The Witcher 3: Wild Hunt",
+        'price_cents': 1799,
+        'original_cents': 2999,
+        'discount': 40,
+        'is_free': False,
+        'currency': 'USD',
+        'url': "https://store.epicgames.com/en-US/p/the-witcher-3-wild-hunt",
+        'image': "https://cdn1.epicgames.com/offer/0000/Thumbnail_1200x1600.jpg",
+        'app_id': "d23f0824128b2f330c5c7fd0a6a3a450",
+    }
+    # A description that only repeats the title is replaced
+    assert results[0].description == "Available on Epic Games Store"
+    assert results[0].release_date == "2023-02-15"
+    # JSON output keeps the id, e.g. for watching the title later
+    assert json.loads(json.dumps(results[0].to_dict()))['app_id'] == "d23f0824128b2f330c5c7fd0a6a3a450"
+    assert [result.name for result in results if result.is_free] == ["Hollow Knight"]
+
+
+def test_epic_prices_and_links(engine):
+    adapter = engine.adapter('epic')
+    results = adapter.page_results(epic_answer(
+        {'title': "Unreleased", 'id': "a", 'price': None},
+        {'title': "Giveaway", 'id': "b", 'catalogNs': {'mappings': [{'pageSlug': "giveaway-game"}]},
+         'price': {'totalPrice': {'discountPrice': 0, 'originalPrice': 1999, 'currencyCode': "EUR"}}},
+        {'title': "No Slug", 'id': "c", 'price': {'totalPrice': {'discountPrice': 499, 'currencyCode': "USD"}}},
+    ))
+    
+    # No price is unknown, not free
+    assert [result.name for result in results] == ["Giveaway", "No Slug"]
+    giveaway, no_slug = results
+    assert (giveaway.is_free, giveaway.discount, giveaway.currency) == (True, 100, 'EUR')
+    assert giveaway.url == "https://store.epicgames.com/en-US/p/giveaway-game"
+    assert (no_slug.is_free, no_slug.original_cents) == (False, 499)
+    assert no_slug.url == "https://store.epicgames.com/en-US/browse?q=No%20Slug"
+
+
+def test_humble_search_page(engine):
+    results = engine.adapter('humble').page_results(json.loads(fixture("humble_search.json")))
+    
+    assert len(results) == 20
+    assert fields(results[0]) == {
+        'name': "The Witcher 3: Wild Hunt",
+        'price_cents': 1000,
+        'original_cents': 3999,
+        'discount': 75,
+        'is_free': False,
+        'currency': 'USD',
+        'url': "https://www.humblebundle.com/store/thewitcher3wildhunt",
+        'image': "https://hb.imgix.net/0000.jpg?auto=compress&w=230",
+        'app_id': "thewitcher3wildhunt_storefront",
+    }
+    assert (results[7].name, results[7].price_cents, results[7].discount) == ("Into the Breach", 2499, 0)
+    assert not any(result.is_free for result in results)
+
+
+def test_humble_prices(engine):
+    results = engine.adapter('humble').page_results({'results': [
+        {'human_name': "No Price", 'human_url': "no-price"},
+        {'human_name': "Free", 'human_url': "free", 'current_price': [0, "USD"], 'full_price': [0, "USD"]},
+        {'human_name': "Euro", 'human_url': "euro", 'current_price': {'amount': 4.99, 'currency': "EUR"}},
+    ]})
+    
+    assert [(result.name, result.price_cents, result.original_cents, result.is_free, result.currency)
+            for result in results] == [("Free", 0, 0, True, 'USD'), ("Euro", 499, 499, False, 'EUR')]
+
+
+def test_gamepass_products(engine):
+    results = engine.adapter('gamepass').page_results(json.loads(fixture("gamepass_products.json")))
+    
+    assert len(results) == 20
+    # The offer is the subscription, not the purchase price
+    assert fields(results[0]) == {
+        'name': "Vampire Survivors",
+        'price_cents': 0,
+        'original_cents': 0,
+        'discount': 0,
+        'is_free': False,
+        'currency': 'USD',
+        'url': "https://www.xbox.com/en-US/games/store/-/9B489DSNZVZV",
+        'image': "https://store-images.s-microsoft.com/image/apps.04.9B489DSNZVZV.png",
+        'app_id': "9B489DSNZVZV",
+    }
+    assert all(result.included_with == 'Game Pass' and not result.is_free for result in results)
+
+
+def test_gamepass_products_without_a_price_are_kept(engine):
+    results = engine.adapter('gamepass').page_results({'Products': [
+        {'ProductId': "9NOPRICE", 'LocalizedProperties': [{'ProductTitle': "Game Pass Only"}]},
+        {'ProductId': "9PRICED", 'LocalizedProperties': [{'ProductTitle': "Priced", 'Images': [
+            {'ImagePurpose': "Tile", 'Uri': "//images/tile.png"},
+        ]}], 'DisplaySkuAvailabilities': [{'Availabilities': [
+            {'OrderManagementData': {'Price': {'ListPrice': 14.99, 'MSRP': 14.99, 'CurrencyCode': "GBP"}}},
+        ]}]},
+    ]})
+    
+    assert [(result.name, result.price_cents, result.included_with, result.image) for result in results] == [
+        ("Game Pass Only", 0, 'Game Pass', ''),
+        ("Priced", 0, 'Game Pass', "https://images/tile.png"),
+    ]
+
+
+def test_gamepass_search_matches_whole_words():
+    adapter = SearchEngine(http=HttpClient(cache=None)).adapter('gamepass')
+    results = adapter.page_results(json.loads(fixture("gamepass_products.json")))
+    adapter.libraries['US'] = (time.time(), [(frozenset(normalize_title(r.name).split()), r) for r in results])
+    
+    def search(query):
+        return [result.name for result in adapter.search(query, 'US')]
+    
+    assert search("psychonauts") == search("Psychonauts 2") == ["Psychonauts 2"]
+    assert search("rock deep") == ["Deep Rock Galactic"]
+    # Parts of words don't match
+    assert search("psycho") == search("roc") == []
+
+
+ITCH_CELL = (
+    '<div class="game_cell has_cover" data-game_id="{id}"><div class="game_thumb"><a href="{url}">'
+    '<img data-lazy_src="https://img.itch.zone/{id}.png" class="lazy_image"/></a></div>'
+    '<div class="game_cell_data"><div class="game_title"><a class="title game_link" href="{url}">{title}</a>'
+    '{price}</div><div class="game_text">{text}</div>'
+    '<div class="game_author"><a href="https://dev.itch.io">dev</a></div></div></div>'
+)
+
+
+def itch_page(*cells):
+    return ('<html><body><div class="game_grid_widget">' + "".join(cells) + '</div></body></html>').encode()
+
+
+def itch_cell(game_id, title, price='', text='A game.'):
+    return ITCH_CELL.format(id=game_id, url=f"https://dev.itch.io/{game_id}", title=title, price=price, text=text)
+
+
+ITCH_PARSERS = [itch.parse_cells_soup] + ([itch.parse_cells_lxml] if itch.lxml_html is not None else [])
+
+
+@pytest.mark.parametrize("parse", ITCH_PARSERS)
+def test_itch_search_page(engine, parse):
+    results = engine.adapter('itch').page_results(parse(fixture("itch_search.html")))
+    
+    # Cells without a price tag are left out, like unpriced items elsewhere
+    assert len(results) == 24
+    assert fields(results[1]) == {
+        'name': "Pixel Drift 2",
+        'price_cents': 1199,
+        'original_cents': 1998,
+        'discount': 40,
+        'is_free': False,
+        'currency': 'USD',
+        'url': "https://tinyfox.itch.io/pixel-drift-2",
+        'image': "https://img.itch.zone/aW1nLzEy405505.png/315x250%23c/abc.png",
+        'app_id': 405505,
+    }
+    assert results[0].description == "A short game about pixel knight 1. • by pixelforge"
+    assert not any(result.is_free for result in results)
+
+
+@pytest.mark.parametrize("parse", ITCH_PARSERS)
+def test_itch_prices(engine, parse):
+    body = itch_page(
+        itch_cell(1, "Free Game", price='<div class="price_tag"><div class="price_value">Free</div></div>'),
+        itch_cell(5, "No Price Tag"),
+        itch_cell(2, "Euro Game", price='<div class="price_tag"><div class="price_value">€4,00</div></div>'),
+        itch_cell(3, "On Sale", price='<div class="price_tag"><div class="price_value">$3.00</div>'
+                                      '<div class="sale_tag">-25%</div></div>'),
+        itch_cell(4, "Pricey", price='<div class="price_tag"><div class="price_value">$1,299.00</div></div>'),
+    )
+    results = engine.adapter('itch').page_results(parse(body))
+    
+    assert [(result.name, result.price_cents, result.original_cents, result.discount, result.is_free,
+             result.currency) for result in results] == [
+        ("Free Game", 0, 0, 0, True, 'USD'),
+        ("Euro Game", 400, 400, 0, False, 'EUR'),
+        ("On Sale", 300, 400, 25, False, 'USD'),
+        ("Pricey", 129900, 129900, 0, False, 'USD'),
+    ]
+    assert results[0].image == "https://img.itch.zone/1.png"
+    assert results[0].app_id == 1
+
+
+def test_steam_details_are_shared_bounded_and_retried(monkeypatch):
+    adapter = SearchEngine(http=HttpClient(cache=None)).adapter('steam')
+    monkeypatch.setattr(steam, 'STEAM_DETAILS_CACHE', 2)
+    release = threading.Event()
+    calls = []
+    
+    def fetch_app_details(app_id):
+        calls.append(app_id)
+        release.wait(5)
+        return None if app_id == 3 else {'name': f"App {app_id}"}
+    adapter.fetch_app_details = fetch_app_details
+    
+    # Lookups in flight are shared
+    first = adapter.details_future(1)
+    assert adapter.details_future(1) is first
+    release.set()
+    assert first.result(5) == {'name': "App 1"}
+    assert adapter.detail_futures == {}
+    
+    # Failures are forgotten, so the next request tries again
+    assert adapter.details_future(3).result(5) is None
+    assert adapter.details_future(3).result(5) is None
+    assert calls == [1, 3, 3]
+    
+    # Loaded details are answered from memory, the least recently used dropped
+    for app_id in (2, 1, 4):
+        adapter.details_future(app_id).result(5)
+    assert list(adapter.details) == [1, 4]
+    assert calls == [1, 3, 3, 2, 4]
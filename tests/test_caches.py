@@ -0,0 +1,134 @@
+import pytest
+import requests
+
+import gamerr_engine
+from gamerr_engine import DEFAULT_RESPONSE_TTL, HttpClient, ResponseCache, ResultCache
+
+
+def test_result_cache_hit_ignores_case_and_spacing():
+    cache = ResultCache()
+    cache.put("The  Witcher", 'steam', 'US', ['a', 'b'], cursor=10)
+    
+    assert cache.get("the witcher", 'steam', 'US') == ['a', 'b']
+    assert cache.get("the witcher", 'gog', 'US') is None
+    assert cache.get("the witcher", 'steam', 'GB') is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_result_cache_returns_copies():
+    cache = ResultCache()
+    cache.put("hades", 'steam', 'US', ['a'])
+    cache.get("hades", 'steam', 'US').append('b')
+    
+    assert cache.get("hades", 'steam', 'US') == ['a']
+
+
+def test_result_cache_evicts_least_recently_used():
+    cache = ResultCache(max_entries=2)
+    cache.put("a", 'steam', 'US', [1])
+    cache.put("b", 'steam', 'US', [2])
+    cache.get("a", 'steam', 'US')
+    cache.put("c", 'steam', 'US', [3])
+    
+    assert cache.get("b", 'steam', 'US') is None
+    assert cache.get("a", 'steam', 'US') == [1]
+    assert cache.get("c", 'steam', 'US') == [3]
+
+
+def test_result_cache_extends_pages_and_cursor():
+    cache = ResultCache()
+    cache.put("hades", 'gog', 'US', [1, 2], cursor=(1, 2))
+    cache.extend("hades", 'gog', 'US', [3], cursor=None)
+    
+    assert cache.get("hades", 'gog', 'US') == [1, 2, 3]
+    assert cache.count("hades", 'gog', 'US') == 3
+    assert cache.next_cursor("hades", 'gog', 'US') is None
+    
+    # Pages for a search that was never cached are dropped
+    cache.extend("portal", 'gog', 'US', [4], cursor=5)
+    assert cache.count("portal", 'gog', 'US') == 0
+
+
+def test_result_cache_expires_entries(clock):
+    cache = ResultCache(ttl=60)
+    cache.put("hades", 'steam', 'US', [1], cursor=10)
+    
+    clock.now += 59
+    cache.extend("hades", 'steam', 'US', [2], cursor=20)
+    assert cache.get("hades", 'steam', 'US') == [1, 2]
+    
+    # A later page doesn't make the first one fresh again
+    clock.now += 2
+    assert cache.next_cursor("hades", 'steam', 'US') is None
+    assert cache.get("hades", 'steam', 'US') is None
+    assert not cache.entries
+
+
+def test_response_cache_round_trip(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "responses.sqlite"))
+    cache.put("https://example.com/a", b'{"x": 1}', etag='"abc"', last_modified="Mon")
+    
+    body, etag, last_modified, age = cache.get("https://example.com/a")
+    assert (body, etag, last_modified) == (b'{"x": 1}', '"abc"', "Mon")
+    assert 0 <= age < 5
+    assert cache.get("https://example.com/b") is None
+
+
+def test_response_cache_ttl_by_path(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "responses.sqlite"))
+    
+    assert cache.ttl_for("https://store.steampowered.com/api/appdetails?appids=1&filters=price_overview") == 15 * 60
+    assert cache.ttl_for("https://store.steampowered.com/api/appdetails?appids=1") == 24 * 3600
+    assert cache.ttl_for("https://example.com/other") == DEFAULT_RESPONSE_TTL
+
+
+def test_response_cache_evicts_least_recently_used_over_cap(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "responses.sqlite"), max_bytes=25)
+    cache.put("a", b"x" * 10)
+    cache.put("b", b"x" * 10)
+    cache.get("a")
+    cache.put("c", b"x" * 10)
+    
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_response_cache_hits_write_access_times_in_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(gamerr_engine, 'RESPONSE_CACHE_ACCESS_BATCH', 3)
+    cache = ResponseCache(path=str(tmp_path / "responses.sqlite"))
+    for url in ("a", "b", "c"):
+        cache.put(url, b"x")
+    
+    def accessed_at(url):
+        return cache.conn.execute("SELECT accessed_at FROM responses WHERE url = ?", (url,)).fetchone()[0]
+    written = accessed_at("a")
+    
+    # Hits are only reads until enough have piled up
+    cache.get("a")
+    cache.get("b")
+    assert accessed_at("a") == written and set(cache.accessed) == {"a", "b"}
+    cache.get("c")
+    assert accessed_at("a") > written and not cache.accessed
+
+
+def make_response(status, body):
+    response = requests.Response()
+    response.status_code = status
+    response._content = body
+    response.url = "https://example.com/api"
+    return response
+
+
+def test_error_responses_raise_and_are_not_cached(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "responses.sqlite"))
+    client = HttpClient(cache=cache)
+    client.get = lambda url, timeout=10, **kwargs: make_response(404, b"<html>Not Found</html>")
+    
+    with pytest.raises(requests.HTTPError):
+        client.get_json("https://example.com/api")
+    assert cache.get("https://example.com/api") is None
+    
+    client.get = lambda url, timeout=10, **kwargs: make_response(200, b'{"ok": true}')
+    assert client.get_json("https://example.com/api") == {'ok': True}
+    assert cache.get("https://example.com/api")[0] == b'{"ok": true}'
@@ -0,0 +1,109 @@
+import json
+import os
+
+import pytest
+
+from gamerr_catalog import Catalog, edit_distance
+
+STEAM_APPS = [
+    (292030, "The Witcher® 3: Wild Hunt"),
+    (20900, "The Witcher: Enhanced Edition"),
+    (1145360, "Hades"),
+    (620, "Portal 2"),
+    (400, "Portal"),
+    (367520, "Hollow Knight"),
+    (1091500, "Cyberpunk 2077"),
+]
+
+
+def applist(apps):
+    return {'applist': {'apps': [{'appid': app_id, 'name': name} for app_id, name in apps]}}
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = Catalog(str(tmp_path / "catalog.sqlite3"))
+    catalog.import_data(applist(STEAM_APPS))
+    return catalog
+
+
+def names(entries):
+    return [entry.name for entry in entries]
+
+
+def test_edit_distance_counts_swaps_as_one_edit():
+    assert edit_distance("wticher", "witcher") == 1
+    assert edit_distance("hadse", "hades") == 1
+    assert edit_distance("kitten", "sitting") == 3
+    assert edit_distance("", "abc") == 3
+
+
+def test_substring_matches(catalog):
+    assert names(catalog.search("wild hunt")) == ["The Witcher® 3: Wild Hunt"]
+    # Inside a word, with a short word scanned instead of indexed
+    assert names(catalog.search("punk 2077")) == ["Cyberpunk 2077"]
+    assert names(catalog.search("hollow kn")) == ["Hollow Knight"]
+
+
+def test_exact_and_prefix_matches_come_first(catalog):
+    assert names(catalog.search("portal")) == ["Portal", "Portal 2"]
+    # Prefixes before matches inside the title, shorter titles first
+    catalog.import_data(applist([(1716740, "Starfield"), (1145350, "Hades II")]))
+    assert names(catalog.search("hades")) == ["Hades", "Hades II"]
+    assert names(catalog.search("the witcher")) == ["The Witcher® 3: Wild Hunt", "The Witcher: Enhanced Edition"]
+    assert names(catalog.search("field")) == ["Starfield"]
+
+
+def test_typos_match(catalog):
+    assert names(catalog.search("hadse")) == ["Hades"]
+    assert set(names(catalog.search("wticher"))) == {"The Witcher® 3: Wild Hunt", "The Witcher: Enhanced Edition"}
+    assert names(catalog.search("wticher 3")) == ["The Witcher® 3: Wild Hunt"]
+    assert names(catalog.search("hollow knigt")) == ["Hollow Knight"]
+    
+    [entry] = catalog.search("portla 2")
+    assert entry.name == "Portal 2" and 0 < entry.score < 1
+
+
+def test_loose_queries_dont_match(catalog):
+    assert catalog.search("xyzzy") == []
+    # Short words get no typo allowance
+    assert catalog.search("hdes 3") == []
+
+
+def test_store_filter_and_paging(catalog):
+    catalog.import_data({'products': [{'id': 1207664643, 'title': "The Witcher 3: Wild Hunt", 'url': "/game/witcher"}]})
+    
+    assert [(entry.store_id, entry.app_id) for entry in catalog.search("wild hunt", ['gog'])] == [('gog', '1207664643')]
+    assert len(catalog.search("witcher")) == 3
+    assert len(catalog.search("witcher", limit=2)) == 2
+    assert len(catalog.search("witcher", limit=2, offset=2)) == 1
+
+
+def test_import_only_rewrites_changed_titles(catalog, tmp_path):
+    assert catalog.import_data(applist(STEAM_APPS))[1] == 0
+    
+    renamed = STEAM_APPS[:-1] + [(1091500, "Cyberpunk 2077: Ultimate Edition"), (730, "Counter-Strike 2")]
+    assert catalog.import_data(applist(renamed)) == ('steam', 2)
+    assert catalog.count('steam') == len(STEAM_APPS) + 1
+    assert names(catalog.search("ultimate")) == ["Cyberpunk 2077: Ultimate Edition"]
+    # The index follows renames
+    assert names(catalog.search("counter strike")) == ["Counter-Strike 2"]
+
+
+def test_unchanged_files_are_skipped(tmp_path):
+    path = tmp_path / "steam_applist.json"
+    path.write_text(json.dumps(applist(STEAM_APPS)), encoding="utf-8")
+    catalog = Catalog(str(tmp_path / "catalog.sqlite3"))
+    
+    assert catalog.import_file(str(path)) == ('steam', len(STEAM_APPS))
+    assert catalog.import_file(str(path)) == (None, 0)
+    
+    path.write_text(json.dumps(applist(STEAM_APPS + [(730, "Counter-Strike 2")])), encoding="utf-8")
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+    assert catalog.import_file(str(path)) == ('steam', 1)
+    
+    # Reopened, the catalog is found and still knows the file
+    reopened = Catalog.open_existing(str(tmp_path / "catalog.sqlite3"))
+    assert reopened.count() == len(STEAM_APPS) + 1
+    assert reopened.import_file(str(path)) == (None, 0)
+    assert Catalog.open_existing(str(tmp_path / "missing.sqlite3")) is None
@@ -0,0 +1,79 @@
+from gamerr_engine import STORES, GameResult
+from gamerr_history import DAY, PriceHistory
+
+# Noon on a day, so same-day observations stay within it
+NOON = 20000 * DAY + DAY // 2
+
+
+def game(price_cents, app_id=292030):
+    return GameResult(name="The Witcher 3", store=STORES['steam'], price_cents=price_cents,
+                      original_cents=3999, discount=0, is_free=False, url='', app_id=app_id)
+
+
+def test_stats_of_an_unseen_game_are_none(tmp_path):
+    history = PriceHistory(str(tmp_path / "history.sqlite3"))
+    
+    assert history.stats(game(999), 'US', now=NOON) is None
+
+
+def test_first_sighting_is_not_history(tmp_path):
+    history = PriceHistory(str(tmp_path / "history.sqlite3"))
+    history.record([game(999)], 'US', now=NOON)
+    
+    stats = history.stats(game(999), 'US', now=NOON)
+    assert (stats.low_cents, stats.observations, stats.days) == (999, 1, 1)
+    assert not stats.has_history()
+    
+    # Nor are several prices seen on the same day
+    history.record([game(1299)], 'US', now=NOON + 60)
+    stats = history.stats(game(1299), 'US', now=NOON + 60)
+    assert stats.observations == 2
+    assert not stats.has_history()
+
+
+def test_stats_over_several_days(tmp_path):
+    history = PriceHistory(str(tmp_path / "history.sqlite3"))
+    history.record([game(2999)], 'US', now=NOON - 40 * DAY)
+    history.record([game(1999)], 'US', now=NOON - 2 * DAY)
+    history.record([game(3999)], 'US', now=NOON - DAY)
+    history.record([game(2999)], 'US', now=NOON)
+    
+    stats = history.stats(game(2999), 'US', now=NOON)
+    assert stats.has_history()
+    assert (stats.low_cents, stats.low_at) == (1999, NOON - 2 * DAY)
+    # The 30-day figures leave out the sighting 40 days ago
+    assert (stats.min_30_cents, stats.avg_30_cents, stats.days) == (1999, 2999, 3)
+    assert stats.observations == 4
+    assert stats.first_day == NOON - 40 * DAY - DAY // 2
+
+
+def test_unchanged_prices_are_recorded_once_an_hour(tmp_path):
+    history = PriceHistory(str(tmp_path / "history.sqlite3"))
+    
+    assert history.record([game(999)], 'US', now=NOON) == 1
+    assert history.record([game(999)], 'US', now=NOON + 60) == 0
+    assert history.record([game(899)], 'US', now=NOON + 120) == 1
+    assert history.record([game(899)], 'US', now=NOON + 120 + 3600) == 1
+
+
+def test_series_are_kept_per_region_and_game(tmp_path):
+    history = PriceHistory(str(tmp_path / "history.sqlite3"))
+    history.record([game(999), game(499, app_id=70)], 'US', now=NOON)
+    history.record([game(899)], 'GB', now=NOON)
+    
+    assert history.stats(game(0), 'US', now=NOON).low_cents == 999
+    assert history.stats(game(0), 'GB', now=NOON).low_cents == 899
+    assert history.stats(game(0, app_id=70), 'US', now=NOON).low_cents == 499
+
+
+def test_compaction_keeps_the_stats(tmp_path):
+    history = PriceHistory(str(tmp_path / "history.sqlite3"))
+    for days_ago in range(400, 0, -10):
+        history.record([game(1000 + days_ago)], 'US', now=NOON - days_ago * DAY)
+    history.compact(now=NOON)
+    
+    assert history.size()['raw'] == 0
+    assert history.size()['weekly'] > 0
+    stats = history.stats(game(1010), 'US', now=NOON)
+    assert (stats.low_cents, stats.observations) == (1010, 40)
+    assert stats.has_history()
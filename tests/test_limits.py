@@ -0,0 +1,167 @@
+from concurrent.futures import wait
+
+import pytest
+import requests
+
+from gamerr_engine import (
+    CancelToken,
+    CircuitBreaker,
+    GameResult,
+    HttpClient,
+    SearchEngine,
+    StoreUnavailable,
+    TokenBucket
+)
+
+
+def test_token_bucket_allows_a_burst_then_paces(clock):
+    bucket = TokenBucket(rate=2, capacity=3)
+    
+    assert all(bucket.acquire() for _ in range(3))
+    assert clock.slept == []
+    
+    # The bucket is empty: each further token is half a second apart
+    assert bucket.acquire()
+    assert bucket.acquire()
+    assert clock.slept == [0.5, 0.5]
+
+
+def test_token_bucket_refills_up_to_capacity(clock):
+    bucket = TokenBucket(rate=1, capacity=2)
+    bucket.acquire()
+    bucket.acquire()
+    
+    clock.now += 60
+    assert bucket.acquire() and bucket.acquire()
+    assert clock.slept == []
+    assert bucket.acquire()
+    assert clock.slept == [1.0]
+
+
+def test_token_bucket_gives_up_past_max_wait(clock):
+    bucket = TokenBucket(rate=1, capacity=1)
+    bucket.acquire()
+    
+    assert not bucket.acquire(max_wait=0.5)
+    assert clock.slept == []
+    # A refused caller doesn't keep its place in the queue
+    assert bucket.acquire(max_wait=1)
+    assert clock.slept == [1.0]
+
+
+def test_circuit_breaker_opens_after_threshold_failures(clock):
+    breaker = CircuitBreaker(threshold=3, cooldown=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.allow()
+    
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    assert not breaker.allow()
+    assert not breaker.available()
+
+
+def test_circuit_breaker_success_resets_the_count(clock):
+    breaker = CircuitBreaker(threshold=2, cooldown=30)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    
+    assert breaker.state == 'closed'
+
+
+def test_circuit_breaker_lets_one_probe_through_after_cooldown(clock):
+    breaker = CircuitBreaker(threshold=1, cooldown=30)
+    breaker.record_failure()
+    
+    clock.now += 30
+    assert breaker.available()
+    assert breaker.allow()
+    assert breaker.state == 'half-open'
+    assert not breaker.allow()
+    
+    # A failed probe reopens it for another cooldown; a good one closes it
+    breaker.record_failure()
+    assert not breaker.allow()
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == 'closed'
+    assert breaker.allow()
+
+
+def test_store_limits_trip_the_breaker_on_request_errors(clock):
+    adapter = SearchEngine(http=HttpClient(cache=None)).adapter('steam')
+    adapter.breaker = CircuitBreaker(threshold=2, cooldown=30)
+    
+    for _ in range(2):
+        with pytest.raises(requests.ConnectionError):
+            with adapter.limited():
+                raise requests.ConnectionError("refused")
+    
+    with pytest.raises(StoreUnavailable):
+        with adapter.limited():
+            pass
+
+
+class RecordingHttp:
+    """Answers every request with an empty object, recording the URLs that got past the store's limits"""
+    
+    def __init__(self):
+        self.urls = []
+    
+    def get_json(self, url, timeout=None, limiter=None, max_age=None, store=None, decoder=None):
+        with limiter():
+            self.urls.append(url)
+        return {}
+
+
+def test_background_lookups_have_their_own_slots():
+    engine = SearchEngine(http=RecordingHttp())
+    adapter = engine.adapter('steam')
+    # Searches hold every slot of the store
+    for _ in range(adapter.max_concurrency):
+        adapter.slots.acquire()
+    
+    engine.local.background = True
+    with adapter.limited():
+        pass
+    assert adapter.background_slots.acquire(blocking=False)
+
+
+def test_regional_lookups_of_a_cancelled_search_are_dropped():
+    http = RecordingHttp()
+    engine = SearchEngine(http=http, compare_regions=['GB'])
+    game = GameResult(name="Portal", store=engine.stores['steam'], price_cents=999, original_cents=999,
+                      discount=0, is_free=False, url='', app_id=400)
+    
+    cancel = CancelToken()
+    wait(engine.compare_prices([game], cancel=cancel))
+    assert len(http.urls) == 1 and "cc=GB" in http.urls[0]
+    
+    game.regional = None
+    cancel.cancel()
+    wait(engine.compare_prices([game], cancel=cancel))
+    assert len(http.urls) == 1
+    assert game.regional_errors == {'GB': "cancelled"}
+
+
+def test_regional_lookups_note_why_prices_are_missing():
+    engine = SearchEngine(http=RecordingHttp(), compare_regions=['GB', 'DE'])
+    adapter = engine.adapter('steam')
+    game = GameResult(name="Portal", store=engine.stores['steam'], price_cents=999, original_cents=999,
+                      discount=0, is_free=False, url='', app_id=400)
+    
+    # The background budget is spent; search priority isn't
+    def regional_prices(results, region):
+        if engine.local.background:
+            raise StoreUnavailable("Steam rate limit reached")
+        return {}
+    adapter.regional_prices = regional_prices
+    
+    wait(engine.compare_prices([game]))
+    assert game.regional == {}
+    assert game.regional_errors == {'GB': "Steam rate limit reached", 'DE': "Steam rate limit reached"}
+    
+    wait(engine.compare_prices([game], background=False))
+    assert game.to_dict()['regional_errors'] == {'GB': "not sold there", 'DE': "not sold there"}
@@ -0,0 +1,50 @@
+from gamerr_engine import GameResult, TitleMatcher, normalize_title, title_markers
+
+STORE = {'id': 'steam', 'name': 'Steam'}
+
+
+def offer(name):
+    return GameResult(name=name, store=STORE, price_cents=999, original_cents=999, discount=0,
+                      is_free=False, url='')
+
+
+def grouped(*names):
+    matcher = TitleMatcher()
+    matcher.add([offer(name) for name in names])
+    return [[result.name for result in group.offers] for group in matcher.groups]
+
+
+def test_roman_numerals_are_sequel_numbers():
+    assert title_markers(normalize_title("Heroes of Might and Magic III").split())[1] == {'3'}
+    assert title_markers(normalize_title("Final Fantasy XIV Online").split())[1] == {'14'}
+    assert title_markers(normalize_title("Final Fantasy VII Remake").split())[1] == {'7', 'remake'}
+    # "I" is too often the pronoun to count
+    assert title_markers(normalize_title("I Am Bread").split())[1] == set()
+
+
+def test_sequels_and_remakes_stay_apart():
+    pairs = [
+        ("Age of Empires", "Age of Empires II: Definitive Edition"),
+        ("Heroes of Might and Magic", "Heroes of Might and Magic III"),
+        ("Call of Duty: Black Ops", "Call of Duty: Black Ops III"),
+        ("Final Fantasy VII", "Final Fantasy VII Remake"),
+        ("Portal", "Portal 2"),
+        ("Age of Empires II", "Age of Empires III"),
+    ]
+    for first, second in pairs:
+        assert grouped(first, second) == [[first], [second]], (first, second)
+
+
+def test_editions_of_one_game_merge():
+    assert grouped("The Witcher 3: Wild Hunt", "The Witcher® 3: Wild Hunt - Game of the Year Edition") == [
+        ["The Witcher 3: Wild Hunt", "The Witcher® 3: Wild Hunt - Game of the Year Edition"]
+    ]
+    assert grouped("Age of Empires II: Definitive Edition", "Age of Empires II") == [
+        ["Age of Empires II: Definitive Edition", "Age of Empires II"]
+    ]
+
+
+def test_arabic_and_roman_numbers_merge():
+    assert grouped("Heroes of Might and Magic III", "Heroes of Might & Magic 3") == [
+        ["Heroes of Might and Magic III", "Heroes of Might & Magic 3"]
+    ]
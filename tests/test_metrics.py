@@ -0,0 +1,77 @@
+import json
+import time
+from urllib.request import urlopen
+
+from gamerr_metrics import STAGE_BUCKETS, Metrics, serve_metrics
+
+
+def test_timer_observes_one_stage_per_store(clock, monkeypatch):
+    monkeypatch.setattr(time, 'perf_counter', clock)
+    metrics = Metrics()
+    with metrics.timer('decode', 'steam'):
+        time.sleep(0.02)
+    with metrics.timer('decode', 'steam'):
+        time.sleep(0.2)
+    
+    stage = metrics.snapshot()['stages']['decode']['steam']
+    assert stage['count'] == 2
+    assert stage['mean_ms'] == 110.0
+    assert metrics.summary() == "decode 110 ms"
+
+
+def test_snapshot_is_json_with_buckets_and_events():
+    metrics = Metrics()
+    metrics.observe('request', 0.003, 'gog')
+    metrics.observe('request', 0.3, 'gog')
+    metrics.count('error', 'gog')
+    metrics.count('error', 'gog')
+    
+    snapshot = json.loads(json.dumps(metrics.snapshot()))
+    request = snapshot['stages']['request']['gog']
+    assert request['count'] == 2 and request['total_seconds'] == 0.303
+    # Each observation lands in the first bucket that holds it
+    assert request['buckets'] == {str(bound): int(bound in (0.005, 0.5)) for bound in STAGE_BUCKETS}
+    assert snapshot['events'] == {'error': {'gog': 2}}
+
+
+def test_prometheus_histograms_are_cumulative():
+    metrics = Metrics()
+    metrics.observe('queue', 0.003, 'steam')
+    metrics.observe('queue', 0.3, 'steam')
+    metrics.observe('queue', 30, 'steam')
+    metrics.count('degraded', 'steam')
+    
+    lines = metrics.prometheus().splitlines()
+    assert lines[:2] == [
+        "# HELP gamerr_stage_seconds Time spent per search stage and store",
+        "# TYPE gamerr_stage_seconds histogram",
+    ]
+    labels = 'stage="queue",store="steam"'
+    assert f'gamerr_stage_seconds_bucket{{{labels},le="0.001"}} 0' in lines
+    assert f'gamerr_stage_seconds_bucket{{{labels},le="0.005"}} 1' in lines
+    assert f'gamerr_stage_seconds_bucket{{{labels},le="10"}} 2' in lines
+    # Past the last bound only +Inf counts it
+    assert f'gamerr_stage_seconds_bucket{{{labels},le="+Inf"}} 3' in lines
+    assert f"gamerr_stage_seconds_sum{{{labels}}} 30.303000" in lines
+    assert f"gamerr_stage_seconds_count{{{labels}}} 3" in lines
+    assert lines[-3:] == [
+        "# HELP gamerr_events_total Search failures and other events per store",
+        "# TYPE gamerr_events_total counter",
+        'gamerr_events_total{event="degraded",store="steam"} 1',
+    ]
+
+
+def test_endpoint_serves_both_formats():
+    metrics = Metrics()
+    metrics.observe('sort', 0.002)
+    server = serve_metrics(metrics, port=0)
+    try:
+        base = f"http://127.0.0.1:{server.server_port}"
+        with urlopen(f"{base}/metrics") as response:
+            assert response.headers['Content-Type'].startswith("text/plain")
+            assert response.read().decode("utf-8") == metrics.prometheus()
+        with urlopen(f"{base}/metrics.json") as response:
+            assert json.load(response)['stages']['sort']['all']['count'] == 1
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,76 @@
+from gamerr_engine import RESULT_CACHE_TTL, GameResult, HttpClient, SearchEngine
+
+TITLES = [f"Portal {i}" for i in range(5)]
+
+
+def paged_engine(page_size=2):
+    """An engine whose GOG adapter pages through TITLES, recording the cursors it's asked for"""
+    engine = SearchEngine(http=HttpClient(cache=None))
+    adapter = engine.adapter('gog')
+    cursors = []
+    
+    def search_page(query, region, cursor=None):
+        cursors.append(cursor)
+        offset = cursor or 0
+        results = [
+            GameResult(name=name, store=adapter.store, price_cents=999, original_cents=999, discount=0,
+                       is_free=False, url='', app_id=offset + i)
+            for i, name in enumerate(TITLES[offset:offset + page_size])
+        ]
+        return results, offset + page_size if offset + page_size < len(TITLES) else None
+    adapter.search_page = search_page
+    return engine, cursors
+
+
+def names(results):
+    return [result.name for result in results]
+
+
+def test_search_more_continues_from_the_cursor(clock):
+    engine, cursors = paged_engine()
+    pages = []
+    
+    results, status = engine.search("portal", ['gog'])
+    assert names(results) == ["Portal 0", "Portal 1"] and status == {'gog': 'done'}
+    assert engine.has_more("portal", ['gog'])
+    
+    while engine.has_more("portal", ['gog']):
+        engine.search_more("portal", ['gog'], on_results=lambda batch, status: pages.append(names(batch)))
+    assert pages == [["Portal 2", "Portal 3"], ["Portal 4"]]
+    assert cursors == [None, 2, 4]
+    
+    # Nothing is left to ask for
+    assert engine.search_more("portal", ['gog']) == ([], {})
+    assert cursors == [None, 2, 4]
+
+
+def test_later_pages_continue_the_store_ranking(clock):
+    engine, _ = paged_engine()
+    first, _ = engine.search("portal", ['gog'])
+    more, _ = engine.search_more("portal", ['gog'])
+    
+    relevance = [result.relevance for result in first + more]
+    assert relevance == sorted(relevance, reverse=True) and len(set(relevance)) == 4
+
+
+def test_repeat_searches_get_every_page_so_far(clock):
+    engine, cursors = paged_engine()
+    engine.search("portal", ['gog'])
+    engine.search_more("portal", ['gog'])
+    
+    # Case and spacing don't make a new search
+    results, _ = engine.search("  Portal ", ['gog'])
+    assert names(results) == TITLES[:4]
+    assert cursors == [None, 2]
+    assert engine.result_cache.next_cursor("portal", 'gog', 'US') == 4
+
+
+def test_cursors_expire_with_their_first_page(clock):
+    engine, cursors = paged_engine()
+    engine.search("portal", ['gog'])
+    
+    clock.now += RESULT_CACHE_TTL + 1
+    assert not engine.has_more("portal", ['gog'])
+    results, _ = engine.search("portal", ['gog'])
+    assert names(results) == TITLES[:2]
+    assert cursors == [None, None]
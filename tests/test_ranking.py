@@ -0,0 +1,76 @@
+import gamerr_engine
+from gamerr_engine import GameResult, RelevanceRanker, sort_results
+
+STORE = {'id': 'steam', 'name': 'Steam'}
+
+
+def offer(name):
+    return GameResult(name=name, store=STORE, price_cents=999, original_cents=999, discount=0,
+                      is_free=False, url='')
+
+
+def ranked(query, names, store_id='steam'):
+    results = [offer(name) for name in names]
+    RelevanceRanker().score(query, results, store_id)
+    return [result.name for result in sort_results(results, "relevance")]
+
+
+def test_exact_before_prefix_before_fuzzy():
+    # Whatever order the store listed them in
+    names = ["Hollow Knigt Fan Remix", "Hollow Knight: Silksong", "Knight of the Hollow", "Hollow Knight"]
+    assert ranked("hollow knight", names) == [
+        "Hollow Knight", "Hollow Knight: Silksong", "Knight of the Hollow", "Hollow Knigt Fan Remix",
+    ]
+    # A leading "the" and editions don't make a title less exact
+    assert ranked("witcher 3", ["The Witcher 3: Wild Hunt", "The Witcher® 3 - Game of the Year Edition"])[0] == (
+        "The Witcher® 3 - Game of the Year Edition"
+    )
+
+
+def test_typos_still_score_above_unrelated_titles():
+    assert ranked("hollow knigt", ["Stardew Valley", "Hollow Knight", "Night in the Woods"])[0] == "Hollow Knight"
+
+
+def test_add_ons_rank_low_unless_asked_for():
+    names = ["Hades Original Soundtrack", "Hades"]
+    assert ranked("hades", names) == ["Hades", "Hades Original Soundtrack"]
+    assert ranked("hades soundtrack", names) == ["Hades Original Soundtrack", "Hades"]
+
+
+def test_store_order_weighs_by_store_trust():
+    ranker = RelevanceRanker(store_trust={'steam': 1.0, 'gamepass': 0.0})
+    steam = [offer(f"Portal {i}") for i in range(5)]
+    gamepass = [offer(f"Portal {i}") for i in range(5)]
+    ranker.score("portal", steam, 'steam')
+    ranker.score("portal", gamepass, 'gamepass')
+    
+    # A trusted store's order counts; an untrusted one's adds nothing
+    assert [result.relevance for result in steam] == sorted((result.relevance for result in steam), reverse=True)
+    assert steam[0].relevance > steam[-1].relevance
+    assert len({result.relevance for result in gamepass}) == 1
+    assert gamepass[0].relevance < steam[-1].relevance
+    
+    # Later pages carry on where the earlier ones ended
+    page = [offer("Portal 4")]
+    ranker.score("portal", page, 'steam', first_rank=4)
+    assert page[0].relevance == steam[4].relevance
+
+
+def test_features_are_cached_per_title_and_per_word(monkeypatch):
+    ranker = RelevanceRanker(cache_size=3)
+    first = ranker.features(["Hollow Knight", "Hades"])
+    assert ranker.features(["Hades", "Hollow Knight"]) == first[::-1]
+    assert all(a is b for a, b in zip(ranker.features(["Hollow Knight", "Hades"]), first))
+    
+    # A new title made of known words computes no word features
+    calls = []
+    original = gamerr_engine.word_features
+    monkeypatch.setattr(gamerr_engine, 'word_features', lambda word: calls.append(word) or original(word))
+    ranker.features(["Knight Hades", "Hollow Knight II"])
+    assert calls == ["ii"]
+    
+    # Only the newest titles are kept
+    assert len(ranker.cache) == 3 and {"Knight Hades", "Hollow Knight II"} <= set(ranker.cache)
+    
+    # Word bits make up the title's, so cached and fresh features agree
+    assert ranker.features(["Hollow Knight"])[0] == RelevanceRanker().features(["Hollow Knight"])[0]
@@ -0,0 +1,87 @@
+import json
+import time
+
+import pytest
+
+from gamerr_rates import RATES_MAX_AGE, RATES_URL, ExchangeRates, currency_for, format_money
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+    
+    def raise_for_status(self):
+        pass
+    
+    def json(self):
+        return self.data
+
+
+class FakeHttp:
+    def __init__(self, data):
+        self.data = data
+        self.requests = []
+    
+    def get(self, url, timeout=10):
+        self.requests.append(url)
+        return FakeResponse(self.data)
+
+
+RATES = {'result': "success", 'rates': {'USD': 1, 'EUR': 0.8, 'PLN': 4.0, 'JPY': 150}}
+
+
+def test_conversions_go_through_us_dollars(tmp_path):
+    rates = ExchangeRates(path=str(tmp_path / "rates.json"), http=FakeHttp(RATES))
+    assert rates.convert(1000, 'EUR', 'USD') is None
+    
+    rates.refresh()
+    assert rates.convert(1000, 'USD', 'EUR') == 800
+    assert rates.convert(800, 'EUR', 'PLN') == 4000
+    assert rates.convert(1999, 'EUR', 'EUR') == 1999
+    assert rates.convert(1000, 'USD', 'XYZ') is None
+
+
+def test_money_formats():
+    assert format_money(1999) == "$19.99"
+    assert format_money(123456, 'EUR') == "€1,234.56"
+    assert format_money(4999, 'PLN') == "zł 49.99"
+    assert format_money(598000, 'JPY') == "¥5,980"
+    assert format_money(1999, 'SEK') == "19.99 SEK"
+    assert currency_for('PL') == 'PLN'
+    assert currency_for('ZZ') == 'USD'
+
+
+def test_refresh_is_daily_and_survives_a_restart(tmp_path, monkeypatch):
+    now = [1_700_000_000.0]
+    monkeypatch.setattr(time, 'time', lambda: now[0])
+    path = str(tmp_path / "cache" / "rates.json")
+    http = FakeHttp(RATES)
+    
+    rates = ExchangeRates(path=path, http=http)
+    assert rates.stale()
+    assert rates.refresh()
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == {'updated': now[0], 'source': RATES_URL, 'rates': RATES['rates']}
+    
+    restarted = ExchangeRates(path=path, http=http)
+    assert restarted.convert(1000, 'USD', 'EUR') == 800
+    assert not restarted.refresh()
+    assert restarted.refresh(force=True)
+    assert len(http.requests) == 2
+    
+    now[0] += RATES_MAX_AGE + 1
+    assert restarted.stale()
+    assert restarted.refresh()
+    assert len(http.requests) == 3
+
+
+def test_a_failed_refresh_keeps_the_old_table(tmp_path):
+    path = str(tmp_path / "rates.json")
+    ExchangeRates(path=path, http=FakeHttp(RATES)).refresh()
+    
+    rates = ExchangeRates(path=path, http=FakeHttp({'result': "error", 'error-type': "invalid-key"}))
+    with pytest.raises(ValueError):
+        rates.refresh(force=True)
+    assert rates.convert(1000, 'USD', 'EUR') == 800
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)['rates'] == RATES['rates']
@@ -0,0 +1,79 @@
+import hashlib
+import os
+from io import BytesIO
+
+from PIL import Image
+
+from Gamerr import ThumbnailLoader
+
+
+class FakeResponse:
+    def __init__(self, content):
+        self.content = content
+    
+    def raise_for_status(self):
+        pass
+
+
+class FakeHttp:
+    def __init__(self):
+        self.requests = []
+    
+    def get(self, url, timeout=10):
+        self.requests.append(url)
+        # Noise, so every thumbnail compresses to a similar, non-trivial size
+        image = Image.frombytes("RGB", (184, 100), os.urandom(184 * 100 * 3))
+        buffer = BytesIO()
+        image.save(buffer, "PNG")
+        return FakeResponse(buffer.getvalue())
+
+
+def file_name(url):
+    return hashlib.sha1(url.encode('utf-8')).hexdigest() + ".png"
+
+
+def set_mtime(loader, url, mtime):
+    path = os.path.join(loader.cache_dir, file_name(url))
+    os.utime(path, (mtime, mtime))
+
+
+def test_thumbnails_are_read_back_from_disk(tmp_path):
+    http = FakeHttp()
+    loader = ThumbnailLoader(http, workers=0, cache_dir=str(tmp_path))
+    first = loader.load("https://example.com/a.jpg")
+    again = loader.load("https://example.com/a.jpg")
+    
+    assert http.requests == ["https://example.com/a.jpg"]
+    assert again.size == first.size == (184, 100)
+
+
+def test_disk_cache_prunes_least_recently_used(tmp_path):
+    http = FakeHttp()
+    loader = ThumbnailLoader(http, workers=0, cache_dir=str(tmp_path))
+    for name in "abc":
+        loader.load(f"https://example.com/{name}.jpg")
+    sizes = {os.path.basename(path): size for _, path, size in loader.disk_files()}
+    assert len(sizes) == 3
+    
+    # "a" is the oldest file, "b" was read most recently
+    set_mtime(loader, "https://example.com/a.jpg", 1000)
+    set_mtime(loader, "https://example.com/b.jpg", 3000)
+    set_mtime(loader, "https://example.com/c.jpg", 2000)
+    
+    loader.max_disk_bytes = sum(sizes.values()) - 1
+    loader.prune_disk()
+    
+    remaining = {os.path.basename(path) for _, path, _ in loader.disk_files()}
+    assert remaining == {file_name("https://example.com/b.jpg"), file_name("https://example.com/c.jpg")}
+    assert loader.disk_bytes == sum(sizes[name] for name in remaining)
+
+
+def test_disk_cache_is_pruned_when_opened_over_cap(tmp_path):
+    http = FakeHttp()
+    loader = ThumbnailLoader(http, workers=0, cache_dir=str(tmp_path))
+    loader.load("https://example.com/a.jpg")
+    loader.load("https://example.com/b.jpg")
+    
+    reopened = ThumbnailLoader(http, workers=0, cache_dir=str(tmp_path), max_disk_bytes=1)
+    assert reopened.disk_files() == []
+    assert reopened.disk_bytes == 0
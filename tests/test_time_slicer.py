@@ -0,0 +1,73 @@
+import time
+
+from Gamerr import TimeSlicer
+
+
+class FakeRoot:
+    """Tk root stand-in that records after() calls instead of running a loop"""
+    
+    def __init__(self):
+        self.scheduled = []
+    
+    def after(self, ms, callback):
+        self.scheduled.append((ms, callback))
+
+
+def slow_steps(clock, log, name, count, seconds=0.0015):
+    for i in range(count):
+        clock.sleep(seconds)
+        log.append((name, i))
+        yield
+
+
+def run_tick(root):
+    _, tick = root.scheduled.pop(0)
+    tick()
+
+
+def test_a_tick_stops_at_the_budget(clock, monkeypatch):
+    monkeypatch.setattr(time, 'perf_counter', clock)
+    root, log = FakeRoot(), []
+    slicer = TimeSlicer(root, budget_ms=4)
+    slicer.start(slow_steps(clock, log, 'rows', 10))
+    assert len(root.scheduled) == 1
+    
+    # 1.5 ms steps: the third ends at 4.5 ms, past the 4 ms budget, so the tick yields
+    start = clock.now
+    run_tick(root)
+    assert log == [('rows', 0), ('rows', 1), ('rows', 2)]
+    assert clock.now - start < 0.004 + 0.0015
+    assert len(root.scheduled) == 1
+    
+    while root.scheduled:
+        run_tick(root)
+    assert [i for _, i in log] == list(range(10))
+    assert not slicer.scheduled
+
+
+def test_jobs_run_in_order_and_keys_replace_pending_ones(clock, monkeypatch):
+    monkeypatch.setattr(time, 'perf_counter', clock)
+    root, log = FakeRoot(), []
+    slicer = TimeSlicer(root, budget_ms=4)
+    slicer.start(slow_steps(clock, log, 'old grid', 2), key='grid')
+    slicer.start(slow_steps(clock, log, 'status', 2))
+    slicer.call(lambda: log.append('done'))
+    slicer.start(slow_steps(clock, log, 'new grid', 2), key='grid')
+    # Only the first start schedules a tick
+    assert len(root.scheduled) == 1
+    
+    while root.scheduled:
+        run_tick(root)
+    assert log == [('new grid', 0), ('new grid', 1), ('status', 0), ('status', 1), 'done']
+
+
+def test_a_failing_job_doesnt_stop_the_rest(clock, monkeypatch):
+    monkeypatch.setattr(time, 'perf_counter', clock)
+    root, log = FakeRoot(), []
+    slicer = TimeSlicer(root)
+    slicer.call(lambda: 1 / 0)
+    slicer.call(lambda: log.append('after'))
+    
+    while root.scheduled:
+        run_tick(root)
+    assert log == ['after']
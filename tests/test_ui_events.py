@@ -0,0 +1,73 @@
+import threading
+
+from Gamerr import UiEventQueue
+
+
+class FakeRoot:
+    """Tk root stand-in that records after() calls instead of running a loop"""
+    
+    def __init__(self):
+        self.scheduled = []
+    
+    def after(self, ms, callback):
+        self.scheduled.append((ms, callback))
+
+
+def test_keyed_updates_replace_pending_ones():
+    ran = []
+    queue = UiEventQueue(FakeRoot())
+    queue.post(lambda: ran.append("status 1"), key='status')
+    queue.post(lambda: ran.append("result a"))
+    queue.post(lambda: ran.append("status 2"), key='status')
+    queue.post(lambda: ran.append("result b"))
+    
+    queue.drain()
+    # The superseded status never runs; the latest keeps the first one's place
+    assert ran == ["status 2", "result a", "result b"]
+    
+    queue.drain()
+    assert ran == ["status 2", "result a", "result b"]
+
+
+def test_each_frame_drains_then_schedules_the_next():
+    root = FakeRoot()
+    frames = []
+    queue = UiEventQueue(root, on_frame=lambda: frames.append(len(root.scheduled)), frame_ms=16)
+    queue.start()
+    assert root.scheduled == [(16, queue.drain)]
+    
+    queue.post(lambda: None)
+    root.scheduled[-1][1]()
+    assert len(root.scheduled) == 2 and root.scheduled[-1][0] == 16
+    assert frames == [2]
+
+
+def test_a_failing_update_doesnt_stop_the_frame():
+    ran = []
+    queue = UiEventQueue(FakeRoot())
+    queue.post(lambda: 1 / 0)
+    queue.post(lambda: ran.append("after"))
+    
+    queue.drain()
+    assert ran == ["after"]
+
+
+def test_posts_from_many_threads_all_arrive():
+    ran = []
+    queue = UiEventQueue(FakeRoot())
+    
+    def worker(n):
+        for i in range(100):
+            queue.post(lambda i=i: ran.append((n, i)))
+            queue.post(lambda: ran.append("progress"), key='progress')
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    queue.drain()
+    assert ran.count("progress") == 1
+    assert sorted(entry for entry in ran if entry != "progress") == [(n, i) for n in range(4) for i in range(100)]
+    # Each thread's own updates stay in order
+    assert [i for n, i in (entry for entry in ran if entry != "progress") if n == 0] == list(range(100))
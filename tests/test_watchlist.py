@@ -0,0 +1,128 @@
+import sqlite3
+import threading
+
+from gamerr_engine import STORES, CircuitBreaker, GameResult
+from gamerr_watchlist import PriceAlert, Watch, Watchlist, WatchlistPoller
+
+
+def result(price_cents, discount=0, currency='USD', app_id=292030):
+    return GameResult(name="The Witcher 3", store=STORES['steam'], price_cents=price_cents,
+                      original_cents=3999, discount=discount, is_free=False, url='', app_id=app_id,
+                      currency=currency)
+
+
+def test_alert_when_crossing_the_threshold():
+    watch = Watch('steam', '292030', "The Witcher 3", threshold_cents=1000, last_cents=1999, last_discount=0)
+    
+    assert watch.alerts(result(999)) == ["at or below $10.00"]
+    # Staying below it isn't news
+    watch.last_cents = 999
+    assert watch.alerts(result(899)) == []
+
+
+def test_alert_when_a_sale_starts():
+    watch = Watch('steam', '292030', "The Witcher 3", last_cents=3999, last_discount=0)
+    
+    assert watch.alerts(result(1999, discount=50)) == ["on sale, -50%"]
+    # The first poll has nothing to compare against
+    assert Watch('steam', '292030', "The Witcher 3").alerts(result(1999, discount=50)) == []
+
+
+def test_threshold_only_applies_in_its_currency():
+    watch = Watch('steam', '292030', "The Witcher 3", threshold_cents=1000, last_cents=1999, last_discount=0,
+                  currency='EUR')
+    
+    assert watch.alerts(result(999, currency='EUR')) == ["at or below €10.00"]
+    assert watch.alerts(result(999, currency='GBP')) == []
+
+
+def test_alert_message_uses_the_result_currency():
+    watch = Watch('steam', '292030', "The Witcher 3", currency='EUR')
+    alert = PriceAlert(watch, result(1499, currency='EUR'), ["on sale, -60%"])
+    
+    assert alert.message() == "The Witcher 3 on Steam: €14.99, on sale, -60%"
+
+
+def test_watchlist_add_threshold_and_remove(tmp_path):
+    watchlist = Watchlist(str(tmp_path / "watchlist.sqlite3"))
+    watchlist.add_result(result(1999, currency='EUR'), threshold_cents=1500)
+    
+    assert watchlist.contains('steam', '292030')
+    [watch] = watchlist.watches()
+    assert (watch.name, watch.threshold_cents, watch.currency) == ("The Witcher 3", 1500, 'EUR')
+    
+    watchlist.set_threshold('steam', '292030', None)
+    assert watchlist.watches()[0].threshold_cents is None
+    
+    watchlist.remove('steam', '292030')
+    assert not watchlist.contains('steam', '292030')
+    assert watchlist.watches() == []
+    
+    # What's watched is read back when the list is opened again
+    watchlist.add_result(result(1999))
+    assert Watchlist(str(tmp_path / "watchlist.sqlite3")).contains('steam', '292030')
+
+
+def test_watchlist_upgrades_lists_without_currency(tmp_path):
+    path = str(tmp_path / "watchlist.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE watches (store TEXT, app_id TEXT, name TEXT, url TEXT, image TEXT, threshold INTEGER, "
+        "last_price INTEGER, last_discount INTEGER, checked_at REAL, PRIMARY KEY (store, app_id))"
+    )
+    conn.execute("INSERT INTO watches (store, app_id, name, threshold) VALUES ('steam', '70', 'Half-Life', 500)")
+    conn.commit()
+    conn.close()
+    
+    [watch] = Watchlist(path).watches()
+    assert (watch.name, watch.threshold_cents, watch.currency) == ("Half-Life", 500, 'USD')
+
+
+class FakeAdapter:
+    batch_lookup = True
+    
+    def __init__(self, prices):
+        self.prices = prices
+        self.breaker = CircuitBreaker()
+    
+    def region_for(self, region):
+        return region
+    
+    def price_entries(self, watches, region):
+        return [result(self.prices[watch.app_id], app_id=int(watch.app_id)) for watch in watches]
+
+
+class FakeEngine:
+    region = 'US'
+    history = None
+    
+    def __init__(self, adapter):
+        self.fake_adapter = adapter
+        self.local = threading.local()
+    
+    def adapter(self, store_id):
+        return self.fake_adapter
+
+
+def test_poll_raises_alerts_and_saves_prices(tmp_path):
+    watchlist = Watchlist(str(tmp_path / "watchlist.sqlite3"))
+    watchlist.add(Watch('steam', '292030', "The Witcher 3", threshold_cents=1000))
+    adapter = FakeAdapter({'292030': 1999})
+    alerts = []
+    poller = WatchlistPoller(FakeEngine(adapter), watchlist, alerts.append)
+    
+    assert poller.poll_all() == []
+    assert watchlist.watches()[0].last_cents == 1999
+    
+    adapter.prices['292030'] = 999
+    [alert] = poller.poll_all()
+    assert alerts == [alert]
+    assert alert.reasons == ["at or below $10.00"]
+    assert watchlist.watches()[0].last_cents == 999
+    
+    # A store whose breaker is open waits for the next interval
+    adapter.breaker.state = 'open'
+    adapter.breaker.opened_at = float('inf')
+    adapter.prices['292030'] = 499
+    assert poller.poll_all() == []
+    assert watchlist.watches()[0].last_cents == 999